@@ -0,0 +1,51 @@
+"""
+Compares a lazily loaded CircleHexBoard with a ChunkedHexBoard holding at most 64 chunks in memory: the time to walk
+every square of a band across the board, putting something on every tenth, and the memory in use afterwards. The
+chunks paged out are in the file of the store, which is not counted.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_chunked_hex_board [radius]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from src.agent_world.board.hex.chunked_hex_board import ChunkedHexBoard
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+
+
+def main(radius):
+    # A band 100 squares wide through the middle of the board
+    squares = [(x, y, -x - y) for x in range(-50, 50) for y in range(max(-radius, -x - radius),
+                                                                      min(radius, -x + radius) + 1)]
+    print(f"Walking {len(squares)} squares of a board of radius {radius}")
+    for label, build in [("CircleHexBoard", lambda: CircleHexBoard(radius)),
+                         ("ChunkedHexBoard", lambda: ChunkedHexBoard(radius, chunk_size=32, max_resident=64))]:
+        gc.collect()
+        tracemalloc.start()
+        board = _walk(build(), squares)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del board
+        # Timed separately, as tracing slows allocations down
+        gc.collect()
+        start = time.perf_counter()
+        board = _walk(build(), squares)
+        elapsed = time.perf_counter() - start
+        print(f"  {label}: {elapsed * 1000:.0f} ms, {memory / 2 ** 20:.1f} MiB in memory")
+        del board
+
+
+def _walk(board, squares):
+    for i, (x, y, z) in enumerate(squares):
+        square = board.get_coordinate(x, y, z)
+        if i % 10 == 0:
+            square.add("tree")
+        else:
+            square.get_content()
+    return board
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,72 @@
+"""
+Measures the cost of advancing a Clock with many subscribed schedulers, each of which has a few events spread over
+a day, when the schedulers tell the clock when they wake compared to when every scheduler has its time set on every
+change of time. Also times subscribing and unsubscribing all schedulers.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_clock_fan_out [number of schedulers]
+"""
+import random
+import sys
+import time
+
+from src.agent_world.clock.clock import Clock
+from src.agent_world.global_params import day, minute
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.driver import SimulationDriver
+
+
+class EagerScheduler(Scheduler):
+    """
+    A Scheduler which has its time set on every change of time of the clock
+    """
+
+    def attach_clock(self, clock):
+        return False
+
+
+def clock_with(scheduler_type, schedulers, events=3, seed=0):
+    """
+    Returns a clock with the given number of schedulers subscribed, each with events at random minutes of a day
+    :param scheduler_type: type
+    :param schedulers: int
+    :param events: int
+    :param seed: int
+    :return: Clock
+    """
+    rng = random.Random(seed)
+    clock = Clock()
+    for _ in range(schedulers):
+        scheduler = scheduler_type()
+        clock.subscribe(scheduler)
+        for _ in range(events):
+            scheduler.schedule_event(ScheduledEvent(lambda: None, rng.randrange(1, day // minute) * minute))
+    return clock
+
+
+def main(schedulers):
+    for label, scheduler_type in [("every change", EagerScheduler), ("wake heap", Scheduler)]:
+        clock = clock_with(scheduler_type, schedulers)
+        start = time.perf_counter()
+        for tick in range(1, day // minute + 1):
+            clock.set_time_to(tick * minute)
+        ticking = time.perf_counter() - start
+        clock = clock_with(scheduler_type, schedulers)
+        start = time.perf_counter()
+        steps = SimulationDriver(clock).run_until(day)
+        driving = time.perf_counter() - start
+        subscribers = clock.subscribers()
+        start = time.perf_counter()
+        for subscriber in subscribers:
+            clock.unsubscribe(subscriber)
+        for subscriber in subscribers:
+            clock.subscribe(subscriber)
+        churn = time.perf_counter() - start
+        print(f"  {label}: {ticking * 1000:.0f} ms per day ticked by minute, "
+              f"{driving * 1000:.0f} ms driving {steps} steps, {churn * 1000:.1f} ms to unsubscribe and resubscribe")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
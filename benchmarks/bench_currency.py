@@ -0,0 +1,95 @@
+"""
+Micro-benchmarks of the hot paths of Currency and Wallet: creating currencies, depositing, withdrawing, checking
+affordability with dict prices and with Prices, and comparing and hashing currencies. Also checks one Price against
+the wallets of every agent of a WalletBank at once. Reports the throughput of each in operations per second.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_currency [number of operations]
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.agent_world.currency.currency import Wallet, Currency, Price
+from src.agent_world.currency.wallet_bank import WalletBank
+
+PRICE = {"gold": 3, "wood": 1}
+COMPILED_PRICE = Price(PRICE)
+
+
+def create(operations):
+    for _ in range(operations):
+        Currency(5, "gold")
+
+
+def deposit(operations):
+    wallet = Wallet()
+    for _ in range(operations):
+        wallet.deposit_currency(Currency(5, "gold"))
+
+
+def withdraw(operations):
+    wallet = Wallet()
+    wallet.deposit_currency(Currency(operations, "gold"))
+    for _ in range(operations):
+        wallet.withdraw(1, "gold")
+
+
+def can_afford(operations, price=PRICE):
+    wallet = Wallet()
+    wallet.deposit_currency(Currency(10, "gold"))
+    wallet.deposit_currency(Currency(10, "wood"))
+    for _ in range(operations):
+        wallet.can_afford(price)
+
+
+def subtract(operations, price=PRICE):
+    wallet = Wallet()
+    wallet.deposit_currency(Currency(3 * operations, "gold"))
+    wallet.deposit_currency(Currency(operations, "wood"))
+    for _ in range(operations):
+        wallet.subtract(price)
+
+
+def bank_can_afford(operations):
+    bank = WalletBank(operations)
+    agents = np.arange(operations)
+    bank.deposit(agents, agents % 5, "gold")
+    bank.deposit(agents, 1, "wood")
+    start = time.perf_counter()
+    bank.can_afford(agents, COMPILED_PRICE)
+    return time.perf_counter() - start
+
+
+def compare(operations):
+    first, second = Currency(5, "gold"), Currency(5, "gold")
+    for _ in range(operations):
+        first == second
+
+
+def hash_(operations):
+    currencies = [Currency(amount % 100, "gold") for amount in range(operations)]
+    start = time.perf_counter()
+    set(currencies)
+    return time.perf_counter() - start
+
+
+def main(operations):
+    for name, benchmark in [("create", create), ("deposit", deposit), ("withdraw", withdraw),
+                            ("can_afford", can_afford), ("subtract", subtract),
+                            ("can_afford Price", lambda n: can_afford(n, COMPILED_PRICE)),
+                            ("subtract Price", lambda n: subtract(n, COMPILED_PRICE)),
+                            ("WalletBank.can_afford Price", bank_can_afford), ("compare", compare), ("hash", hash_)]:
+        start = time.perf_counter()
+        try:
+            elapsed = benchmark(operations) or time.perf_counter() - start
+        except TypeError:
+            print(f"  {name}: unsupported")
+            continue
+        print(f"  {name}: {operations / elapsed / 10 ** 6:.2f} M ops/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6)
@@ -0,0 +1,54 @@
+"""
+Measures the memory held per pending event by each scheduler queue, including the events themselves, the queue
+entries and the identifier index.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_event_memory [number of events]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from src.agent_world.global_params import day
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from src.agent_world.scheduler.scheduler import Scheduler, _SchedulerQueue
+from src.agent_world.scheduler.timing_wheel import TimingWheelScheduler
+
+
+def _empty_function():
+    pass
+
+
+def bench_memory(make_scheduler, num, seed=0):
+    """
+    Returns the number of bytes allocated per event when scheduling num events with unique identifiers at random
+    times within 30 days
+    :param make_scheduler: () -> Scheduler
+    :param num: int
+    :param seed: int
+    :return: float
+    """
+    rng = random.Random(seed)
+    times = [rng.randrange(30 * day) for _ in range(num)]
+    gc.collect()
+    tracemalloc.start()
+    scheduler = make_scheduler()
+    scheduler.schedule_events([ScheduledEvent(_empty_function, time, i) for i, time in enumerate(times)])
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del scheduler
+    return allocated / num
+
+
+def main(num):
+    print(f"Memory per pending event, {num} events")
+    for label, make_scheduler in [("heap", Scheduler),
+                                  ("timing wheel", TimingWheelScheduler),
+                                  ("linked list", lambda: Scheduler(queue=_SchedulerQueue()))]:
+        print(f"  {label}: {bench_memory(make_scheduler, num):.0f} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5)
@@ -0,0 +1,89 @@
+"""
+Compares spawning branches of a warmed up world with World.fork, which shares state copy on write, with spawning
+them with copy.deepcopy. Reports the time and memory per branch when spawning, and the time to advance every branch
+to its next event, which is where forked schedulers copy their queue.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_fork [number of branches]
+"""
+import copy
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.global_params import day, hour
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.actions import Action, action_registry
+from src.agent_world.simulation.driver import SimulationDriver
+from src.agent_world.simulation.world import World
+
+
+@action_registry.action("bench_fork.pay")
+def _pay(wallet, amount):
+    wallet.deposit_currency(Currency(amount, "gold"))
+
+
+def warmed_world(wallets=100, events=10 ** 4, radius=30, seed=0):
+    """
+    Returns a world with the given number of wallets, a preloaded board and a scheduler with the given number of
+    pending payments, advanced by one day
+    :param wallets: int
+    :param events: int
+    :param radius: int
+    :param seed: int
+    :return: World
+    """
+    rng = random.Random(seed)
+    world = World(wallets={i: Wallet() for i in range(wallets)}, boards={"map": CircleHexBoard(radius, False)})
+    scheduler = Scheduler()
+    world.clock.subscribe(scheduler)
+    scheduler.schedule_events([ScheduledEvent(Action("bench_fork.pay", world.wallets[rng.randrange(wallets)], 1),
+                                              rng.randrange(30 * day), i) for i in range(events)])
+    for i in range(wallets):
+        scheduler.schedule_event(PeriodicEvent(Action("bench_fork.pay", world.wallets[i], 1), hour, phase=hour))
+    SimulationDriver(world.clock).run_until(day)
+    return world
+
+
+def bench_spawn(world, branches, spawn):
+    """
+    Returns the time and bytes per branch of spawning the branches, and the time per branch of advancing every
+    branch to its next event
+    :param world: World
+    :param branches: int
+    :param spawn: (World) -> World
+    :return: (float, float, float)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    spawned = [spawn(world) for _ in range(branches)]
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for branch in spawned:
+        SimulationDriver(branch.clock).step()
+    stepped = time.perf_counter() - start
+    return elapsed / branches, allocated / branches, stepped / branches
+
+
+def main(branches):
+    world = warmed_world()
+    print(f"Spawning {branches} branches")
+    for label, spawn, count in [("fork", World.fork, branches),
+                                # deepcopy is far slower, so it is only run on a sample
+                                ("deepcopy", copy.deepcopy, min(branches, 20))]:
+        spawn_time, spawn_memory, step_time = bench_spawn(world, count, spawn)
+        print(f"  {label}: {spawn_time * 1000:.3f}ms and {spawn_memory / 1024:.1f}KiB per branch, "
+              f"first step {step_time * 1000:.3f}ms per branch")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,42 @@
+"""
+Compares a preloaded CircleHexBoard with a DenseCircleHexBoard of the same radius: the time to create the board, the
+memory it takes, and the time to put something on every tenth square.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_hex_board [radius]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from src.agent_world.board.hex.dense_hex_board import DenseCircleHexBoard, HexIndexer
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+
+
+def main(radius):
+    coordinates = list(zip(*(axis.tolist() for axis in HexIndexer(radius).all_coordinates())))[::10]
+    for label, build in [("CircleHexBoard", lambda: CircleHexBoard(radius, lazy_loading=False)),
+                         ("DenseCircleHexBoard", lambda: DenseCircleHexBoard(radius))]:
+        gc.collect()
+        tracemalloc.start()
+        build()
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # Timed separately, as tracing slows allocations down
+        gc.collect()
+        start = time.perf_counter()
+        board = build()
+        creating = time.perf_counter() - start
+        start = time.perf_counter()
+        for x, y, z in coordinates:
+            board.get_coordinate(x, y, z).add("tree")
+        filling = time.perf_counter() - start
+        print(f"  {label}: created in {creating * 1000:.0f} ms, {memory / 2 ** 20:.1f} MiB, "
+              f"{len(coordinates)} squares filled in {filling * 1000:.0f} ms")
+        del board
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,53 @@
+"""
+Times the batched hex geometry against the same queries square by square: converting every square of a board to
+cartesian coordinates, and finding the squares within a few steps of many centers.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_hex_geometry [radius]
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.dense_hex_board import HexIndexer
+from src.agent_world.board.hex.hex_board import hex_to_cartesian
+
+
+def _scalar_to_cartesian(x, y, z):
+    # hex_to_cartesian as it was, computing cos and sin on every call
+    return x + z * np.cos(np.pi * (1 / 3)), z * np.sin(np.pi * (1 / 3))
+
+
+def _scalar_spiral(center, radius):
+    x0, y0, z0 = center
+    return [(x0 + x, y0 + y, z0 - x - y) for x in range(-radius, radius + 1)
+            for y in range(max(-radius, -x - radius), min(radius, -x + radius) + 1)]
+
+
+def main(radius):
+    xs, ys, zs = HexIndexer(radius).all_coordinates()
+    print(f"Converting {len(xs)} squares to cartesian coordinates")
+    start = time.perf_counter()
+    for x, y, z in zip(xs.tolist(), ys.tolist(), zs.tolist()):
+        _scalar_to_cartesian(x, y, z)
+    print(f"  square by square: {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    hex_to_cartesian(xs, ys, zs)
+    print(f"  in one call: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    centers = np.stack([xs, ys, zs], axis=-1)[::max(1, len(xs) // 10000)]
+    print(f"Squares within 3 steps of {len(centers)} centers")
+    start = time.perf_counter()
+    for center in centers.tolist():
+        _scalar_spiral(center, 3)
+    print(f"  square by square: {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    hex_geometry.spiral(centers[:, None, :], 3)
+    print(f"  in one call: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 577)
@@ -0,0 +1,55 @@
+"""
+Times the queries of the occupancy index of a CircleHexBoard against probing the squares one by one with
+get_coordinate and get_content: finding the nearest free square around many centers on a crowded board, and counting
+the occupied squares within a few steps of them.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_occupancy [radius]
+"""
+import random
+import sys
+import time
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+
+
+def _probe_nearest_free(board, radius, center):
+    for distance in range(2 * radius + 1):
+        for x, y, z in hex_geometry.ring(center, distance).tolist():
+            if max(abs(x), abs(y), abs(z)) <= radius and board.get_coordinate(x, y, z).get_content() is None:
+                return x, y, z
+    return None
+
+
+def _probe_count(board, radius, center, distance):
+    return sum(1 for x, y, z in hex_geometry.spiral(center, distance).tolist()
+               if max(abs(x), abs(y), abs(z)) <= radius and board.get_coordinate(x, y, z).get_content() is not None)
+
+
+def main(radius):
+    for share in [0.9, 0.999]:
+        _compare(radius, share)
+
+
+def _compare(radius, share):
+    rng = random.Random(0)
+    board = CircleHexBoard(radius, lazy_loading=False)
+    squares = hex_geometry.spiral((0, 0, 0), radius).tolist()
+    for coordinates in rng.sample(squares, int(len(squares) * share)):
+        board.get_coordinate(*coordinates).add("agent")
+    centers = [tuple(coordinates) for coordinates in rng.sample(squares, 1000)]
+    print(f"Board of {len(squares)} squares, {share:.1%} occupied, {len(centers)} centers")
+    for label, query in [("nearest free, probing", lambda c: _probe_nearest_free(board, radius, c)),
+                         ("nearest free, index", lambda c: board.nearest_free(*c)),
+                         ("occupied within 8, probing", lambda c: _probe_count(board, radius, c, 8)),
+                         ("occupied within 8, index", lambda c: board.count_occupied(*c, 8))]:
+        start = time.perf_counter()
+        for center in centers:
+            query(center)
+        print(f"  {label}: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
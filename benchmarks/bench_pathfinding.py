@@ -0,0 +1,83 @@
+"""
+Compares agents heading for a shared target, a market, on a board with scattered rocks: every agent running its own
+breadth first search, every agent running A*, and all agents sharing one flow field and stepping in one batched call.
+Then times a tick in which one rock far from the market is moved, after which the flow field is only computed again if
+the move affects it.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_pathfinding [radius]
+"""
+import random
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+from src.agent_world.board.hex.pathfinding import Pathfinder
+
+
+def _bfs_next_step(board, radius, start, goal):
+    # The ad hoc search agents ran before, square by square through get_coordinate
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        square = queue.popleft()
+        if square == goal:
+            while previous[square] != start:
+                square = previous[square]
+            return square
+        for neighbor in hex_geometry.neighbors(square).tolist():
+            neighbor = tuple(neighbor)
+            if neighbor in previous or max(map(abs, neighbor)) > radius:
+                continue
+            if neighbor != goal and board.get_coordinate(*neighbor).get_content() is not None:
+                continue
+            previous[neighbor] = square
+            queue.append(neighbor)
+    return None
+
+
+def main(radius):
+    rng = random.Random(0)
+    board = CircleHexBoard(radius)
+    squares = [tuple(square) for square in hex_geometry.spiral((0, 0, 0), radius).tolist()]
+    market = (0, 0, 0)
+    board.get_coordinate(*market).add("market")
+    rocks = rng.sample(squares[7:], len(squares) // 10)
+    for square in rocks:
+        board.get_coordinate(*square).add("rock")
+    free = [square for square in squares if board.get_coordinate(*square).get_content() is None]
+    agents = rng.sample(free, 200)
+    pathfinder = Pathfinder(board)
+    print(f"{len(agents)} agents heading for the market on a board of {len(squares)} squares")
+
+    start = time.perf_counter()
+    for agent in agents:
+        _bfs_next_step(board, radius, agent, market)
+    print(f"  breadth first search per agent: {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    for agent in agents:
+        pathfinder.path(agent, market)
+    print(f"  A* per agent: {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    pathfinder.flow_field([market]).next_steps(np.array(agents))
+    print(f"  shared flow field: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # A rock at the edge, which no square steps through, is moved
+    field = pathfinder.flow_field([market])
+    corner = next(square for square in rocks if max(map(abs, square)) == radius)
+    start = time.perf_counter()
+    board.get_coordinate(*corner).remove("rock")
+    board.get_coordinate(*corner).add("rock")
+    pathfinder.flow_field([market]).next_steps(np.array(agents))
+    recomputed = pathfinder.flow_field([market]) is not field
+    print(f"  tick after a rock at the edge moved: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"field {'recomputed' if recomputed else 'kept'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,68 @@
+"""
+Measures the throughput of ReplicaRunner for every number of workers up to the number of cores, and the size of the
+statistics sent back per replica in columnar form compared to a pickled MaxStatisticsHandler log.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_runner [number of replicas]
+"""
+import os
+import pickle
+import random
+import sys
+import time
+
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.global_params import day, minute
+from src.agent_world.scheduler.IScheduler import PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.actions import Action, action_registry
+from src.agent_world.simulation.runner import ReplicaRunner, run_replica
+from src.agent_world.simulation.world import World
+from src.agent_world.statistics.columnar_log import ColumnarLog
+from src.agent_world.statistics.handler.max_statistics_handler import MaxStatisticsHandler
+
+
+@action_registry.action("bench_runner.trade")
+def _trade(world, name):
+    amount = world.data["rng"].randrange(100)
+    world.wallets[name].deposit_currency(Currency(amount, "gold"))
+    world.statistics.log({"time": world.clock.current_time(), "trader": name, "amount": amount})
+
+
+def market(seed, rng, traders=10):
+    """
+    A world in which every trader trades every ten minutes for a day
+    :param seed: int
+    :param rng: random.Random
+    :param traders: int
+    :return: World
+    """
+    world = World(wallets={f"trader {i}": Wallet() for i in range(traders)}, statistics=MaxStatisticsHandler(),
+                  data={"rng": rng})
+    scheduler = Scheduler()
+    world.clock.subscribe(scheduler)
+    for name in world.wallets:
+        scheduler.schedule_event(PeriodicEvent(Action("bench_runner.trade", world, name), 10 * minute,
+                                               phase=rng.randrange(10 * minute)))
+    return world
+
+
+def main(replicas):
+    seeds = list(range(replicas))
+    single = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        ReplicaRunner(market, day, max_workers=workers).run(seeds)
+        elapsed = time.perf_counter() - start
+        single = single or elapsed
+        print(f"  {workers} workers: {replicas / elapsed:.1f} replicas/s ({single / elapsed:.2f}x)")
+    world = market(0, random.Random(0))
+    result = run_replica(lambda seed, rng: world, day, None, 0)
+    full = len(pickle.dumps(world.statistics.query_keys([]), pickle.HIGHEST_PROTOCOL))
+    compact = len(pickle.dumps(result.statistics, pickle.HIGHEST_PROTOCOL))
+    print(f"  statistics per replica: {compact} bytes columnar, {full} bytes as a pickled log")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,95 @@
+"""
+Compares scheduling a batch of events through Scheduler.schedule_events with scheduling them one at a time through
+Scheduler.schedule_event, for the heap queue and for the linked list reference queue.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_schedule_events [number of events]
+"""
+import random
+import sys
+import time
+
+from src.agent_world.global_params import day
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from src.agent_world.scheduler.scheduler import Scheduler, _HeapSchedulerQueue, _SchedulerQueue
+
+
+def _empty_function():
+    pass
+
+
+def _generate_events(num, seed=0):
+    """
+    Generates num events at random times within 30 days
+    :param num: int
+    :param seed: int
+    :return: [ScheduledEvent]
+    """
+    rng = random.Random(seed)
+    return [ScheduledEvent(_empty_function, rng.randrange(30 * day)) for _ in range(num)]
+
+
+def _loaded_scheduler(queue_type, preloaded):
+    """
+    Returns a scheduler which already contains the given number of events
+    :param queue_type: type
+    :param preloaded: int
+    :return: Scheduler
+    """
+    scheduler = Scheduler(queue=queue_type())
+    scheduler.schedule_events(_generate_events(preloaded, seed=1))
+    return scheduler
+
+
+def bench_per_event(events, queue_type=_HeapSchedulerQueue, preloaded=0):
+    """
+    Returns the time taken to schedule the events one at a time
+    :param events: [ScheduledEvent]
+    :param queue_type: type
+    :param preloaded: int
+        Number of events already in the scheduler
+    :return: float
+    """
+    scheduler = _loaded_scheduler(queue_type, preloaded)
+    start = time.perf_counter()
+    for event in events:
+        scheduler.schedule_event(event)
+    return time.perf_counter() - start
+
+
+def bench_batch(events, queue_type=_HeapSchedulerQueue, preloaded=0):
+    """
+    Returns the time taken to schedule the events as one batch
+    :param events: [ScheduledEvent]
+    :param queue_type: type
+    :param preloaded: int
+        Number of events already in the scheduler
+    :return: float
+    """
+    scheduler = _loaded_scheduler(queue_type, preloaded)
+    start = time.perf_counter()
+    scheduler.schedule_events(events)
+    return time.perf_counter() - start
+
+
+def _report(label, events, queue_type, preloaded):
+    per_event = bench_per_event(events, queue_type, preloaded)
+    batch = bench_batch(events, queue_type, preloaded)
+    print(f"  {label}, {preloaded} events already scheduled: schedule_event {per_event:.3f}s, "
+          f"schedule_events {batch:.3f}s ({per_event / batch:.1f}x)")
+
+
+def main(num):
+    events = _generate_events(num)
+    print(f"Scheduling {num} events")
+    for preloaded in [0, num]:
+        _report("heap", events, _HeapSchedulerQueue, preloaded)
+    # The linked list is quadratic when adding one event at a time, so it is only run on a small sample
+    sample = events[:min(num, 5000)]
+    print(f"Scheduling {len(sample)} events")
+    _report("linked list", sample, _SchedulerQueue, 0)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5)
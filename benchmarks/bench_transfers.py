@@ -0,0 +1,58 @@
+"""
+Compares ways of moving currency between agents: withdrawing a Currency and depositing it for every transfer, a
+single Transaction of all transfers, and WalletBank.transact over arrays of transfers.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_transfers [number of transfers]
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.currency.transaction import Transaction
+from src.agent_world.currency.wallet_bank import WalletBank
+
+AGENTS = 1000
+
+
+def main(transfers):
+    rng = np.random.default_rng(0)
+    sources = rng.integers(0, AGENTS, transfers)
+    targets = rng.integers(0, AGENTS, transfers)
+    amounts = rng.integers(1, 10, transfers).astype(float)
+    legs = list(zip(sources.tolist(), targets.tolist(), amounts.tolist()))
+
+    wallets = [Wallet() for _ in range(AGENTS)]
+    for wallet in wallets:
+        wallet.deposit_currency(Currency(10 ** 6, "gold"))
+    start = time.perf_counter()
+    for source, target, amount in legs:
+        wallets[target].deposit_currency(wallets[source].withdraw(amount, "gold"))
+    report("withdraw and deposit", time.perf_counter() - start, transfers)
+
+    wallets = [Wallet() for _ in range(AGENTS)]
+    for wallet in wallets:
+        wallet.deposit_currency(Currency(10 ** 6, "gold"))
+    start = time.perf_counter()
+    transaction = Transaction()
+    for source, target, amount in legs:
+        transaction.transfer(wallets[source], wallets[target], "gold", amount)
+    transaction.commit()
+    report("Transaction", time.perf_counter() - start, transfers)
+
+    bank = WalletBank(AGENTS)
+    bank.deposit(np.arange(AGENTS), 10 ** 6, "gold")
+    start = time.perf_counter()
+    bank.transact(sources, targets, "gold", amounts)
+    report("WalletBank.transact", time.perf_counter() - start, transfers)
+
+
+def report(label, elapsed, transfers):
+    print(f"  {label}: {elapsed * 1000:.1f} ms, {elapsed / transfers * 10 ** 6:.2f} us per transfer")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5)
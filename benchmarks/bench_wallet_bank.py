@@ -0,0 +1,61 @@
+"""
+Compares a Wallet per agent with a single WalletBank for many agents: the memory taken by their balances, and the time
+to pay every agent, check which agents can afford a price and charge those that can.
+
+Run from the repository root with
+
+    python -m benchmarks.bench_wallet_bank [number of agents]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.currency.wallet_bank import WalletBank
+
+TICKERS = ["gold", "wood", "stone", "food"]
+PRICE = {"gold": 30, "wood": 2, "food": 1}
+
+
+def with_wallets(agents, amounts):
+    wallets = [Wallet() for _ in range(agents)]
+    for ticker in TICKERS:
+        for wallet, amount in zip(wallets, amounts.tolist()):
+            wallet.deposit_currency(Currency(amount, ticker))
+    start = time.perf_counter()
+    affordable = [wallet for wallet in wallets if wallet.can_afford(PRICE)]
+    for wallet in affordable:
+        wallet.subtract(PRICE)
+    return wallets, time.perf_counter() - start
+
+
+def with_bank(agents, amounts):
+    bank = WalletBank(agents)
+    ids = np.arange(agents)
+    for ticker in TICKERS:
+        bank.deposit(ids, amounts, ticker)
+    start = time.perf_counter()
+    bank.subtract(ids[bank.can_afford(ids, PRICE)], PRICE)
+    return bank, time.perf_counter() - start
+
+
+def main(agents):
+    amounts = np.random.default_rng(0).integers(0, 60, agents).astype(float)
+    for label, build in [("Wallet per agent", with_wallets), ("WalletBank", with_bank)]:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        state, charging = build(agents, amounts)
+        elapsed = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  {label}: {memory / agents:.0f} bytes per agent, {elapsed * 1000:.0f} ms to fill and charge, "
+              f"{charging * 1000:.1f} ms to charge")
+        del state
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5)
@@ -1,4 +1,6 @@
 class IBoardSquare:
+    # Empty, so that squares which declare slots have no instance dictionary
+    __slots__ = ()
 
     def get_content(self):
         raise NotImplementedError
@@ -0,0 +1,564 @@
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from src.agent_world.board.exceptions import InvalidCoordinateException
+from src.agent_world.board.game_square import IBoardSquare
+from src.agent_world.board.hex.hex_board import IHexBoard, SquareAlreadyHasContentException
+
+
+class ChunkStore:
+    """
+    A temporary file, memory mapped, of slots each holding the squares of one chunk of a ChunkedHexBoard. Boards keep
+    track of which slot holds which of their chunks. A slot can hold a chunk of several forks of a board at once, so
+    slots are reference counted: a slot is written only by a board which is its only user, and reused once no board
+    uses it. The file grows by doubling, and is deleted when the store is garbage collected.
+
+    Attributes
+
+        dtype: np.dtype
+            The type of a square
+
+        squares: int
+            Number of squares of a chunk
+
+        _file: file
+            The file, None until a chunk is first written
+
+        _map: np.memmap
+            The slots, of shape (capacity, squares)
+
+        _references: [int]
+            Number of boards using every slot
+
+        _free: [int]
+            Slots no board uses
+
+    Methods
+
+        read(slot: int) -> np.ndarray
+            Returns a copy of the chunk in the slot
+
+        write(slot: int?, chunk: np.ndarray) -> int
+            Writes the chunk to the slot, or to a new one if the slot is None or used by other boards
+
+        share(slot: int) -> None
+            Adds a board using the slot
+
+        release(slot: int) -> None
+            Removes a board using the slot
+
+        used() -> int
+            Returns the number of slots in use
+    """
+
+    def __init__(self, dtype, squares, directory=None):
+        """
+        :param dtype: np.dtype
+        :param squares: int
+        :param directory: str? Directory of the file, by default that of tempfile
+        """
+        self.dtype = np.dtype(dtype)
+        self.squares = squares
+        self._directory = directory
+        self._file = None
+        self._map = None
+        self._references = []
+        self._free = []
+
+    def read(self, slot):
+        """
+        Returns a copy of the chunk in the slot
+        :param slot: int
+        :return: np.ndarray
+        """
+        return np.array(self._map[slot])
+
+    def write(self, slot, chunk):
+        """
+        Writes the chunk to the slot if this board is its only user, otherwise to a new slot, releasing the old one
+        :param slot: int? None for a chunk not yet in the store
+        :param chunk: np.ndarray
+        :return: int The slot written to
+        """
+        if slot is None or self._references[slot] > 1:
+            if slot is not None:
+                self.release(slot)
+            slot = self._allocate()
+        self._map[slot] = chunk
+        return slot
+
+    def share(self, slot):
+        """
+        Adds a board using the slot
+        :param slot: int
+        :return: None
+        """
+        self._references[slot] += 1
+
+    def release(self, slot):
+        """
+        Removes a board using the slot, freeing it if none is left
+        :param slot: int
+        :return: None
+        """
+        self._references[slot] -= 1
+        if self._references[slot] == 0:
+            self._free.append(slot)
+
+    def used(self):
+        """
+        Returns the number of slots in use
+        :return: int
+        """
+        return len(self._references) - len(self._free)
+
+    def _allocate(self):
+        """
+        Returns a free slot, used by one board, growing the file if there is none
+        :return: int
+        """
+        if self._free:
+            slot = self._free.pop()
+            self._references[slot] = 1
+            return slot
+        slot = len(self._references)
+        if self._map is None or slot == len(self._map):
+            self._grow(max(1, 2 * slot))
+        self._references.append(1)
+        return slot
+
+    def _grow(self, capacity):
+        """
+        Extends the file to hold the given number of slots, and maps it again
+        :param capacity: int
+        :return: None
+        """
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self._directory, suffix=".chunks")
+        if self._map is not None:
+            self._map.flush()
+        self._file.truncate(capacity * self.squares * self.dtype.itemsize)
+        self._map = np.memmap(self._file, dtype=self.dtype, mode="r+", shape=(capacity, self.squares))
+
+
+class ChunkedHexBoard(IHexBoard):
+    """
+    A hex board, circular or unbounded, split into chunks of chunk_size by chunk_size squares which are created when
+    a square of them is first used. At most max_resident chunks are kept in memory; when one more is needed, the
+    least recently used is paged out to a memory mapped ChunkStore, and it is paged back in when it is used again, so
+    a board can be far larger than the memory of the machine.
+
+    Chunks are parallelograms in axial coordinates (x, z), so the chunk of a square and its place in it follow from
+    dividing its coordinates by chunk_size, also for negative coordinates. Every square is a record of the content id
+    of the square, -1 for none, and the attributes the board was created with, such as terrain. The contents
+    themselves are kept in a table in memory, as Python objects can not be paged out, so boards with sparse content
+    gain the most.
+
+    Extends
+
+        IHexBoard
+
+    Attributes
+
+        chunk_size: int
+            Width and height of a chunk in squares
+
+        max_resident: int
+            Number of chunks kept in memory
+
+        store: ChunkStore
+            Where chunks are paged out to, shared with forks of the board
+
+        _radius: int?
+            Radius of the board, None for an unbounded board
+
+        _resident: OrderedDict
+            Chunks in memory, by key, least recently used first
+
+        _dirty: set
+            Keys of resident chunks changed since they were last paged out
+
+        _slots: dict
+            Slot in the store of every chunk which has been paged out, by key
+
+        _owned: set?
+            Keys of the resident chunks not shared with forks of this board, None if no chunks are shared
+
+        _contents: [Any]
+            Content of every id, None for ids which are free
+
+        _free_ids: [int]
+            Ids which can be reused
+
+        _contents_shared: bool
+            Whether the table of contents is shared with forks of this board
+
+    Methods
+
+        radius() -> int?
+            Returns the radius of the board, None if it is unbounded
+
+        get_coordinate(x: int, y: int, z: int) -> ChunkedHexSquare
+            Inherited from IHexBoard, returns a view of the square
+
+        attribute(x: int, y: int, z: int, name: str) -> Any
+            Returns an attribute of the square
+
+        set_attribute(x: int, y: int, z: int, name: str, value: Any) -> None
+            Sets an attribute of the square
+
+        chunks() -> int
+            Returns the number of chunks which have been created
+
+        resident_chunks() -> int
+            Returns the number of chunks in memory
+
+        fork(memo: dict?) -> ChunkedHexBoard
+            Returns a copy of this board which shares the chunks until either of them changes them
+    """
+
+    def __init__(self, radius=None, chunk_size=32, max_resident=1024, attributes=None, directory=None):
+        """
+        :param radius: int? None for an unbounded board
+        :param chunk_size: int
+        :param max_resident: int
+        :param attributes: dict? Type of every attribute of the squares, by name
+        :param directory: str? Directory of the file of the store
+        """
+        self.chunk_size = chunk_size
+        self.max_resident = max_resident
+        dtype = np.dtype([("content", np.int32)] + list((attributes or {}).items()))
+        self.store = ChunkStore(dtype, chunk_size * chunk_size, directory)
+        self._radius = radius
+        self._resident = OrderedDict()
+        self._dirty = set()
+        self._slots = {}
+        self._owned = None
+        self._contents = []
+        self._free_ids = []
+        self._contents_shared = False
+
+    def radius(self):
+        """
+        Returns the radius of the board, None if it is unbounded
+        :return: int?
+        """
+        return self._radius
+
+    def get_coordinate(self, x, y, z):
+        """
+        Inherited from IHexBoard
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: ChunkedHexSquare
+        :raises: InvalidCoordinateException
+        """
+        self._validate(x, y, z)
+        return ChunkedHexSquare(self, x, y, z)
+
+    def attribute(self, x, y, z, name):
+        """
+        Returns an attribute of the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :param name: str
+        :return: Any
+        :raises: InvalidCoordinateException
+        :raises: ValueError If the board has no such attribute
+        """
+        self._validate(x, y, z)
+        chunk, index = self._locate(x, z, False)
+        return chunk[name][index].item()
+
+    def set_attribute(self, x, y, z, name, value):
+        """
+        Sets an attribute of the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :param name: str
+        :param value: Any
+        :return: None
+        :raises: InvalidCoordinateException
+        :raises: ValueError If the board has no such attribute
+        """
+        self._validate(x, y, z)
+        chunk, index = self._locate(x, z, True)
+        chunk[name][index] = value
+
+    def chunks(self):
+        """
+        Returns the number of chunks which have been created, in memory or paged out
+        :return: int
+        """
+        return len(self._slots.keys() | self._resident.keys())
+
+    def resident_chunks(self):
+        """
+        Returns the number of chunks in memory
+        :return: int
+        """
+        return len(self._resident)
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this board. The two share their chunks, in memory and in the store, until either of them
+        changes a chunk, at which point that board copies it (copy on write).
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: ChunkedHexBoard
+        """
+        if memo is not None and id(self) in memo:
+            return memo[id(self)]
+        fork = ChunkedHexBoard.__new__(ChunkedHexBoard)
+        fork.__dict__.update(self.__dict__)
+        fork._resident = OrderedDict(self._resident)
+        fork._dirty = set(self._dirty)
+        fork._slots = dict(self._slots)
+        for slot in self._slots.values():
+            self.store.share(slot)
+        fork._owned = set()
+        self._owned = set()
+        fork._contents_shared = self._contents_shared = True
+        if memo is not None:
+            memo[id(self)] = fork
+        return fork
+
+    def __del__(self):
+        # Slots used by nothing else are given back to the store, which may be shared with forks
+        for slot in getattr(self, "_slots", {}).values():
+            self.store.release(slot)
+
+    def __getstate__(self):
+        """
+        Saves every chunk, paging in those which are paged out, rather than the store
+        :return: dict
+        """
+        state = {name: value for name, value in self.__dict__.items()
+                 if name not in ("store", "_resident", "_dirty", "_slots", "_owned", "_contents_shared")}
+        state["dtype"] = self.store.dtype
+        chunks = {key: self.store.read(slot) for key, slot in self._slots.items()}
+        chunks.update(self._resident)
+        state["chunks"] = chunks
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the board from the state returned by __getstate__, with all chunks paged out to a new store
+        :param state: dict
+        :return: None
+        """
+        state = dict(state)
+        dtype = state.pop("dtype")
+        chunks = state.pop("chunks")
+        self.__dict__.update(state)
+        self.store = ChunkStore(dtype, self.chunk_size * self.chunk_size)
+        self._resident = OrderedDict()
+        self._dirty = set()
+        self._slots = {key: self.store.write(None, chunk) for key, chunk in chunks.items()}
+        self._owned = None
+        self._contents_shared = False
+
+    def _validate(self, x, y, z):
+        """
+        Raises an InvalidCoordinateException if the coordinates are not those of a square of the board
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: None
+        """
+        radius = self._radius
+        if x + y + z != 0 or radius is not None and max(abs(x), abs(y), abs(z)) > radius:
+            raise InvalidCoordinateException
+
+    def _locate(self, x, z, write):
+        """
+        Returns the chunk of the square, paging it in or creating it if needed, and the index of the square in it
+        :param x: int
+        :param z: int
+        :param write: bool Whether the chunk is about to be changed, in which case it is copied if it is shared
+        :return: (np.ndarray, int)
+        """
+        size = self.chunk_size
+        key = (x // size, z // size)
+        chunk = self._resident.get(key)
+        if chunk is None:
+            chunk = self._page_in(key)
+        else:
+            self._resident.move_to_end(key)
+        if write:
+            if self._owned is not None and key not in self._owned:
+                chunk = self._resident[key] = chunk.copy()
+                self._owned.add(key)
+            self._dirty.add(key)
+        return chunk, (x % size) * size + z % size
+
+    def _page_in(self, key):
+        """
+        Makes the chunk resident, reading it from the store or creating it, and pages out the least recently used
+        chunk if there are too many
+        :param key: (int, int)
+        :return: np.ndarray
+        """
+        if len(self._resident) >= self.max_resident:
+            self._page_out()
+        slot = self._slots.get(key)
+        if slot is None:
+            chunk = np.zeros(self.store.squares, dtype=self.store.dtype)
+            chunk["content"] = -1
+            # Never written, so it has to be written when paged out
+            self._dirty.add(key)
+        else:
+            chunk = self.store.read(slot)
+        self._resident[key] = chunk
+        if self._owned is not None:
+            # A chunk read from the store is a copy of its own
+            self._owned.add(key)
+        return chunk
+
+    def _page_out(self):
+        """
+        Writes the least recently used chunk to the store, if it changed since it was last written, and drops it
+        :return: None
+        """
+        key, chunk = self._resident.popitem(last=False)
+        if key in self._dirty:
+            self._slots[key] = self.store.write(self._slots.get(key), chunk)
+            self._dirty.discard(key)
+        if self._owned is not None:
+            self._owned.discard(key)
+
+    def _own_contents(self):
+        """
+        Copies the table of contents if it is shared with forks of this board
+        :return: None
+        """
+        if self._contents_shared:
+            self._contents = list(self._contents)
+            self._free_ids = list(self._free_ids)
+            self._contents_shared = False
+
+    def _content(self, x, z):
+        """
+        Returns the content of the square
+        :param x: int
+        :param z: int
+        :return: Any
+        """
+        chunk, index = self._locate(x, z, False)
+        content_id = int(chunk["content"][index])
+        return self._contents[content_id] if content_id >= 0 else None
+
+    def _add(self, x, z, thing):
+        """
+        Puts the thing on the square
+        :param x: int
+        :param z: int
+        :param thing: Any
+        :return: None
+        :raises: SquareAlreadyHasContentException
+        """
+        chunk, index = self._locate(x, z, False)
+        if chunk["content"][index] >= 0:
+            raise SquareAlreadyHasContentException
+        chunk, index = self._locate(x, z, True)
+        self._own_contents()
+        if self._free_ids:
+            content_id = self._free_ids.pop()
+            self._contents[content_id] = thing
+        else:
+            content_id = len(self._contents)
+            self._contents.append(thing)
+        chunk["content"][index] = content_id
+
+    def _remove(self, x, z):
+        """
+        Clears the square
+        :param x: int
+        :param z: int
+        :return: None
+        """
+        chunk, index = self._locate(x, z, False)
+        content_id = int(chunk["content"][index])
+        if content_id < 0:
+            return
+        chunk, index = self._locate(x, z, True)
+        self._own_contents()
+        chunk["content"][index] = -1
+        self._contents[content_id] = None
+        self._free_ids.append(content_id)
+
+
+class ChunkedHexSquare(IBoardSquare):
+    """
+    A square of a ChunkedHexBoard, as a view of its chunk. Views hold no state of their own, and their chunk is looked
+    up on every use, so a view stays valid when the chunk is paged out and in again.
+
+    Extends
+
+        IBoardSquare
+
+    Attributes
+
+        board: ChunkedHexBoard
+            The board of the square
+
+        x: int
+        y: int
+        z: int
+            Coordinates of the square
+
+    Methods
+
+        coordinates() -> (int, int, int)
+            Returns the coordinates of the square
+    """
+
+    __slots__ = ("board", "x", "y", "z")
+
+    def __init__(self, board, x, y, z):
+        """
+        :param board: ChunkedHexBoard
+        :param x: int
+        :param y: int
+        :param z: int
+        """
+        self.board = board
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __eq__(self, other):
+        return isinstance(other, ChunkedHexSquare) and self.board is other.board and \
+            self.coordinates() == other.coordinates()
+
+    def __hash__(self):
+        return hash((id(self.board), self.x, self.y, self.z))
+
+    def coordinates(self):
+        """
+        Returns the coordinates of the square
+        :return: (int, int, int)
+        """
+        return self.x, self.y, self.z
+
+    def get_content(self):
+        """
+        Inherited from IBoardSquare
+        """
+        return self.board._content(self.x, self.z)
+
+    def add(self, thing):
+        """
+        Inherited from IBoardSquare
+        """
+        self.board._add(self.x, self.z, thing)
+
+    def remove(self, thing):
+        """
+        Inherited from IBoardSquare
+        """
+        self.board._remove(self.x, self.z)
@@ -0,0 +1,343 @@
+import numpy as np
+
+from src.agent_world.board.exceptions import InvalidCoordinateException
+from src.agent_world.board.game_square import IBoardSquare
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_geometry import HexIndexer
+from src.agent_world.board.hex.hex_board import IHexBoard, SquareAlreadyHasContentException
+
+
+class DenseCircleHexBoard(IHexBoard):
+    """
+    A circular hex board, as CircleHexBoard, stored in flat numpy arrays indexed through a HexIndexer rather than in
+    a dictionary of square objects. What is on a square is kept as an id into a table of contents, -1 for an empty
+    square, and further per square attributes, such as terrain, are arrays of their own. Square objects are only
+    created when asked for, as views of the arrays, so a board of radius 500 takes a few megabytes and is created in
+    the time it takes to allocate its arrays.
+
+    Extends
+
+        IHexBoard
+
+    Attributes
+
+        indexer: HexIndexer
+            Maps coordinates to indices into the arrays
+
+        _content_ids: np.ndarray
+            Id of the content of every square, -1 for none
+
+        _contents: [Any]
+            Content of every id, None for ids which are free
+
+        _free_ids: [int]
+            Ids which can be reused
+
+        _attributes: dict
+            Array of every attribute, by name
+
+        _shared: bool
+            Whether the arrays are shared with forks of this board, in which case they are copied before they are
+            changed
+
+    Methods
+
+        radius() -> int
+            Returns the radius of the board
+
+        size() -> int
+            Returns the number of squares
+
+        get_coordinate(x: int, y: int, z: int) -> DenseHexSquare
+            Inherited from IHexBoard, returns a view of the square
+
+        square(index: int) -> DenseHexSquare
+            Returns a view of the square with the given index
+
+        occupancy() -> np.ndarray
+            Returns a mask of the squares which have content
+
+        occupied(coordinates: np.ndarray) -> np.ndarray
+            Returns a mask of the given squares which have content or are off the board
+
+        nearest_free(x: int, y: int, z: int, max_distance: int?) -> (int, int, int) | None
+            Returns the closest square without content
+
+        content_ids() -> np.ndarray
+            Returns the content id of every square, as a read only array
+
+        content(content_id: int) -> Any
+            Returns the content with the given id
+
+        add_attribute(name: str, dtype: np.dtype, fill: Any) -> np.ndarray
+            Adds an array holding an attribute of every square
+
+        attribute(name: str) -> np.ndarray
+            Returns the array of an attribute, to be read or changed in place
+
+        fork(memo: dict?) -> DenseCircleHexBoard
+            Returns a copy of this board which shares the arrays until either of them changes them
+    """
+
+    def __init__(self, radius):
+        """
+        :param radius: int
+        """
+        self.indexer = HexIndexer(radius)
+        self._content_ids = np.full(self.indexer.size, -1, dtype=np.int32)
+        self._contents = []
+        self._free_ids = []
+        self._attributes = {}
+        self._shared = False
+
+    def radius(self):
+        """
+        Returns the radius of the board
+        :return: int
+        """
+        return self.indexer.radius
+
+    def size(self):
+        """
+        Returns the number of squares
+        :return: int
+        """
+        return self.indexer.size
+
+    def __len__(self):
+        return self.indexer.size
+
+    def __iter__(self):
+        """
+        Allows for iteration over the squares, in order of index
+        """
+        return (DenseHexSquare(self, index) for index in range(self.indexer.size))
+
+    def get_coordinate(self, x, y, z):
+        """
+        Inherited from IHexBoard
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: DenseHexSquare
+        :raises: InvalidCoordinateException
+        """
+        return DenseHexSquare(self, self.indexer.index(x, y, z))
+
+    def square(self, index):
+        """
+        Returns a view of the square with the given index
+        :param index: int
+        :return: DenseHexSquare
+        :raises: InvalidCoordinateException
+        """
+        if not 0 <= index < self.indexer.size:
+            raise InvalidCoordinateException
+        return DenseHexSquare(self, index)
+
+    def occupancy(self):
+        """
+        Returns a mask of the squares which have content
+        :return: np.ndarray
+        """
+        return self._content_ids >= 0
+
+    def occupied(self, coordinates):
+        """
+        Returns a mask of the given squares which have content, squares off the board counting as occupied
+        :param coordinates: np.ndarray Cube coordinates, shape (..., 3)
+        :return: np.ndarray
+        """
+        indices = self.indexer.indices(coordinates)
+        return (indices < 0) | (self._content_ids[np.maximum(indices, 0)] >= 0)
+
+    def nearest_free(self, x, y, z, max_distance=None):
+        """
+        Returns the coordinates of the closest square without content, searching ring by ring outwards from the given
+        square, or None if there is none within max_distance steps. Of squares at the same distance, the first in
+        the order of hex_geometry.ring is returned.
+        :param x: int
+        :param y: int
+        :param z: int
+        :param max_distance: int? Defaults to searching the whole board
+        :return: (int, int, int) | None
+        """
+        radius = self.indexer.radius
+        limit = 2 * radius if max_distance is None else max_distance
+        for distance in range(limit + 1):
+            squares = hex_geometry.ring((x, y, z), distance)
+            free = np.flatnonzero(~self.occupied(squares))
+            if len(free):
+                return tuple(int(c) for c in squares[free[0]])
+        return None
+
+    def content_ids(self):
+        """
+        Returns the content id of every square, -1 for empty squares, as a read only array
+        :return: np.ndarray
+        """
+        content_ids = self._content_ids.view()
+        content_ids.flags.writeable = False
+        return content_ids
+
+    def content(self, content_id):
+        """
+        Returns the content with the given id
+        :param content_id: int
+        :return: Any
+        """
+        return self._contents[content_id] if content_id >= 0 else None
+
+    def add_attribute(self, name, dtype=np.int32, fill=0):
+        """
+        Adds an array holding an attribute of every square, e.g. terrain, filled with fill
+        :param name: str
+        :param dtype: np.dtype
+        :param fill: Any
+        :return: np.ndarray
+        """
+        self._own()
+        self._attributes[name] = np.full(self.indexer.size, fill, dtype=dtype)
+        return self._attributes[name]
+
+    def attribute(self, name):
+        """
+        Returns the array of an attribute, to be read or changed in place
+        :param name: str
+        :return: np.ndarray
+        :raises: KeyError
+        """
+        self._own()
+        return self._attributes[name]
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this board. The two share their arrays until either of them changes them, at which point
+        that board copies them (copy on write). Arrays returned by attribute() before the fork are those of this
+        board until then, so they should be fetched again.
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: DenseCircleHexBoard
+        """
+        if memo is not None and id(self) in memo:
+            return memo[id(self)]
+        fork = DenseCircleHexBoard.__new__(DenseCircleHexBoard)
+        fork.__dict__.update(self.__dict__)
+        fork._shared = self._shared = True
+        if memo is not None:
+            memo[id(self)] = fork
+        return fork
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_shared"] = False
+        return state
+
+    def _own(self):
+        """
+        Copies the arrays and the table of contents if they are shared with forks of this board
+        :return: None
+        """
+        if self._shared:
+            self._content_ids = self._content_ids.copy()
+            self._contents = list(self._contents)
+            self._free_ids = list(self._free_ids)
+            self._attributes = {name: values.copy() for name, values in self._attributes.items()}
+            self._shared = False
+
+    def _add(self, index, thing):
+        """
+        Puts the thing on the square with the given index
+        :param index: int
+        :param thing: Any
+        :return: None
+        :raises: SquareAlreadyHasContentException
+        """
+        if self._content_ids[index] >= 0:
+            raise SquareAlreadyHasContentException
+        self._own()
+        if self._free_ids:
+            content_id = self._free_ids.pop()
+            self._contents[content_id] = thing
+        else:
+            content_id = len(self._contents)
+            self._contents.append(thing)
+        self._content_ids[index] = content_id
+
+    def _remove(self, index):
+        """
+        Clears the square with the given index
+        :param index: int
+        :return: None
+        """
+        content_id = int(self._content_ids[index])
+        if content_id < 0:
+            return
+        self._own()
+        self._content_ids[index] = -1
+        self._contents[content_id] = None
+        self._free_ids.append(content_id)
+
+
+class DenseHexSquare(IBoardSquare):
+    """
+    A square of a DenseCircleHexBoard, as a view of its arrays. Views are created on demand and hold no state of
+    their own, so two views of the same square are equal and see the same content.
+
+    Extends
+
+        IBoardSquare
+
+    Attributes
+
+        board: DenseCircleHexBoard
+            The board of the square
+
+        index: int
+            Index of the square in the arrays of the board
+
+    Methods
+
+        coordinates() -> (int, int, int)
+            Returns the coordinates of the square
+    """
+
+    __slots__ = ("board", "index")
+
+    def __init__(self, board, index):
+        """
+        :param board: DenseCircleHexBoard
+        :param index: int
+        """
+        self.board = board
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, DenseHexSquare) and self.board is other.board and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.board), self.index))
+
+    def coordinates(self):
+        """
+        Returns the coordinates of the square
+        :return: (int, int, int)
+        """
+        return self.board.indexer.coordinates(self.index)
+
+    def get_content(self):
+        """
+        Inherited from IBoardSquare
+        """
+        return self.board.content(int(self.board._content_ids[self.index]))
+
+    def add(self, thing):
+        """
+        Inherited from IBoardSquare
+        """
+        self.board._add(self.index, thing)
+
+    def remove(self, thing):
+        """
+        Inherited from IBoardSquare
+        """
+        self.board._remove(self.index)
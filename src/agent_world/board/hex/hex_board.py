@@ -1,18 +1,30 @@
+import weakref
+
 from src.agent_world.board.exceptions import InvalidCoordinateException
 from src.agent_world.board.game_square import IBoardSquare
+from src.agent_world.board.hex.occupancy_index import OccupancyIndex
 import numpy as np
 
 
+# cos and sin of the 60 degrees between the x axis and the z axis, computed once
+_COS_60 = float(np.cos(np.pi / 3))
+_SIN_60 = float(np.sin(np.pi / 3))
+
+
 def hex_to_cartesian(x, y, z):
     """
     Todo: Swap to tuple argument?
-    Converts hex coordinates to cartesian coordinates
-    :param x: int
-    :param y: int
-    :param z: int
-    :return: float
+    Converts hex coordinates to cartesian coordinates. The coordinates can be ints, or arrays of the coordinates of
+    many squares, in which case arrays of their cartesian coordinates are returned, e.g. as
+    hex_to_cartesian(*HexIndexer(radius).all_coordinates())
+    :param x: int | np.ndarray
+    :param y: int | np.ndarray
+    :param z: int | np.ndarray
+    :return: (float, float) | (np.ndarray, np.ndarray)
     """
-    return x + z * np.cos(np.pi * (1 / 3)), z * np.sin(np.pi * (1 / 3))
+    if isinstance(x, (list, tuple)):
+        x, z = np.asarray(x), np.asarray(z)
+    return x + z * _COS_60, z * _SIN_60
 
 
 class IHexBoard:
@@ -39,14 +51,27 @@ class SquareAlreadyHasContentException(Exception):
 
 class HexSquare(IBoardSquare):
     """
-    Implementation of IBoardSquare with no actual hex specific functionality
+    Implementation of IBoardSquare with no actual hex specific functionality. A square of a CircleHexBoard tells
+    the board before it changes, so that forks of the board sharing the square keep it as it was, and reports what is
+    added to and removed from it to the occupancy index of the board, unless it lies outside the circle and has no
+    number in the index.
 
     Extends:
         IBoardSquare
     """
 
-    def __init__(self):
+    __slots__ = ("__content", "__board", "__coordinates", "__position")
+
+    def __init__(self, board=None, coordinates=None, position=None):
+        """
+        :param board: CircleHexBoard? The board the square belongs to
+        :param coordinates: (int, int, int)? Coordinates of the square on the board
+        :param position: int? Number of the square in the occupancy index of the board
+        """
         self.__content = None
+        self.__board = board
+        self.__coordinates = coordinates
+        self.__position = position
 
     def get_content(self):
         """
@@ -59,7 +84,12 @@ class HexSquare(IBoardSquare):
         Inherited from IBoardSquare
         """
         if self.__content is None:
+            board = self.__board
+            if board is not None:
+                board._square_changing(self.__coordinates, self)
             self.__content = thing
+            if self.__position is not None and thing is not None:
+                board.occupancy().add(self.__position, thing)
         else:
             raise SquareAlreadyHasContentException
 
@@ -68,8 +98,24 @@ class HexSquare(IBoardSquare):
         Inherited from IBoardSquare
         """
         #  I have to think a bit harder about this interface
+        board = self.__board
+        if board is not None and self.__content is not None:
+            board._square_changing(self.__coordinates, self)
+            if self.__position is not None:
+                board.occupancy().remove(self.__position, self.__content)
         self.__content = None
 
+    def _copy(self, board):
+        """
+        Returns a copy of the square belonging to the given board, a fork of the board of this square, whose
+        occupancy index already has its content
+        :param board: CircleHexBoard
+        :return: HexSquare
+        """
+        square = HexSquare(board, self.__coordinates, self.__position)
+        square.__content = self.__content
+        return square
+
 
 class CircleHexBoard(IHexBoard):
     """
@@ -78,6 +124,22 @@ class CircleHexBoard(IHexBoard):
     Extends:
         IHexBoard
 
+    Methods:
+        fork(memo: dict?) -> CircleHexBoard
+            Returns a copy of this board which shares the squares until either of them accesses them
+
+        occupancy() -> OccupancyIndex
+            Returns the index of the occupied squares, kept up to date by the squares
+
+        nearest_free(x: int, y: int, z: int, max_distance: int?) -> (int, int, int) | None
+            Returns the closest square without content
+
+        count_occupied(x: int, y: int, z: int, radius: int) -> int
+            Returns the number of occupied squares within radius steps of the square
+
+        squares_with(content_type: type) -> [(int, int, int)]
+            Returns the squares holding content of the type
+
     """
 
     def __iter__(self):
@@ -85,11 +147,23 @@ class CircleHexBoard(IHexBoard):
         Allows for iteration over the squares
         """
         # Todo: 2d iter over both coords and squares
+        if self.__owned is not None:
+            # Squares may be changed through the iterator, so they have to be copied first
+            for coordinates in list(self.__squares):
+                self.get_coordinate(*coordinates)
         return self.__squares.values().__iter__()
 
     def __init__(self, radius, lazy_loading=True):
         self.__radius = radius
         self.__squares = {}
+        # Coordinates of the squares this board has copied from the board it was forked from, None if it was not
+        # forked from one, in which case all its squares are its own
+        self.__owned = None
+        # Whether __squares is shared with forks, in which case it is copied before squares are added
+        self.__shares_squares = False
+        # The boards forked from this one, None until there are any
+        self.__forks = None
+        self.__occupancy = OccupancyIndex(radius)
         if lazy_loading is False:
             self.__preload()
 
@@ -99,11 +173,130 @@ class CircleHexBoard(IHexBoard):
         """
         self.__validate_coordinates(x, y, z)
         try:
-            return self.__squares[(x, y, z)]
+            square = self.__squares[(x, y, z)]
         except KeyError:
-            new_square = HexSquare()
-            self.__squares[(x, y, z)] = new_square
-            return new_square
+            square = HexSquare(self, (x, y, z), self.__position(x, y, z))
+            self.__own_square((x, y, z), square)
+            return square
+        if self.__owned is not None and (x, y, z) not in self.__owned:
+            # Squares are changed through the returned object, so a shared square is copied when it is accessed
+            square = square._copy(self)
+            self.__own_square((x, y, z), square)
+        return square
+
+    def occupancy(self):
+        """
+        Returns the index of the occupied squares, which the squares keep up to date as things are added and removed
+        :return: OccupancyIndex
+        """
+        return self.__occupancy
+
+    def nearest_free(self, x, y, z, max_distance=None):
+        """
+        Returns the coordinates of the closest square without content, or None if there is none within max_distance
+        steps, without visiting the squares
+        :param x: int
+        :param y: int
+        :param z: int
+        :param max_distance: int? Defaults to searching the whole board
+        :return: (int, int, int) | None
+        """
+        return self.__occupancy.nearest_free(x, y, z, max_distance)
+
+    def count_occupied(self, x, y, z, radius):
+        """
+        Returns the number of occupied squares within radius steps of the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :param radius: int
+        :return: int
+        """
+        return self.__occupancy.count_occupied(x, y, z, radius)
+
+    def squares_with(self, content_type):
+        """
+        Returns the coordinates of the squares holding content of the type, or of a subclass of it
+        :param content_type: type
+        :return: [(int, int, int)]
+        """
+        return self.__occupancy.squares_with(content_type)
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this board. The fork shares the squares of this board until it accesses a square through
+        get_coordinate or iteration, at which point it copies the square (copy on access). This board keeps its
+        squares, so squares got from it before the fork stay its own, and before one of them changes, the forks still
+        sharing it are given a copy of it as it was.
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: CircleHexBoard
+        """
+        if memo is not None and id(self) in memo:
+            return memo[id(self)]
+        fork = CircleHexBoard.__new__(CircleHexBoard)
+        fork.__radius = self.__radius
+        fork.__squares = self.__squares
+        fork.__owned = set()
+        fork.__shares_squares = self.__shares_squares = True
+        fork.__forks = None
+        fork.__occupancy = self.__occupancy.fork()
+        if self.__forks is None:
+            self.__forks = weakref.WeakSet()
+        self.__forks.add(fork)
+        if memo is not None:
+            memo[id(self)] = fork
+        return fork
+
+    def _square_changing(self, coordinates, square):
+        """
+        Called by a square of this board before it changes, gives the forks which still share it a copy
+        :param coordinates: (int, int, int)
+        :param square: HexSquare
+        :return: None
+        """
+        if self.__forks:
+            for fork in list(self.__forks):
+                fork.__keep(coordinates, square)
+
+    def __keep(self, coordinates, square):
+        """
+        Replaces the square, which is about to change, by a copy if this board shares it, and has the forks of this
+        board do the same, as they may share it too
+        :param coordinates: (int, int, int)
+        :param square: HexSquare
+        :return: None
+        """
+        if coordinates not in self.__owned and self.__squares.get(coordinates) is square:
+            self.__own_square(coordinates, square._copy(self))
+        if self.__forks:
+            for fork in list(self.__forks):
+                fork.__keep(coordinates, square)
+
+    def __own_square(self, coordinates, square):
+        """
+        Adds the square to the squares of this board, copying the dictionary of squares first if it is shared
+        :param coordinates: (int, int, int)
+        :param square: HexSquare
+        :return: None
+        """
+        if self.__shares_squares:
+            self.__squares = dict(self.__squares)
+            self.__shares_squares = False
+        if self.__owned is not None:
+            self.__owned.add(coordinates)
+        self.__squares[coordinates] = square
+
+    def __position(self, x, y, z):
+        """
+        Returns the number of the square in the occupancy index, None for squares which pass validation but lie
+        outside the circle, and are therefore not indexed
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: int?
+        """
+        indexer = self.__occupancy.indexer
+        return indexer.index(x, y, z) if indexer.contains(x, y, z) else None
 
     def __validate_coordinates(self, x, y, z):
         """
@@ -118,15 +311,45 @@ class CircleHexBoard(IHexBoard):
         if x + y + z != 0 or max([x, y, z]) > self.__radius:
             raise InvalidCoordinateException
 
+    def __getstate__(self):
+        """
+        Saves the radius, the coordinates of the squares which have been loaded and the contents of the occupied
+        squares, rather than every square object. A fully loaded board saves no coordinates at all.
+        :return: tuple
+        """
+        contents = {coordinates: square.get_content() for coordinates, square in self.__squares.items()
+                    if square.get_content() is not None}
+        if len(self.__squares) == 3 * self.__radius * (self.__radius + 1) + 1 and \
+                all(max(map(abs, coordinates)) <= self.__radius for coordinates in self.__squares):
+            return self.__radius, None, contents
+        return self.__radius, tuple(self.__squares), contents
+
+    def __setstate__(self, state):
+        """
+        Restores the board from the state returned by __getstate__
+        :param state: tuple
+        :return: None
+        """
+        radius, loaded, contents = state
+        self.__init__(radius, lazy_loading=loaded is not None)
+        for coordinates in loaded or ():
+            self.get_coordinate(*coordinates)
+        for coordinates, content in contents.items():
+            self.get_coordinate(*coordinates).add(content)
+
     def __preload(self):
         """
         Initialises all board squares to avoid having to do so in a 'lazy' manner
         :return: None
         """
-        # This is really dumb
-        # Todo: Make this less dumb :)
-        for i in range(-self.__radius, self.__radius + 1):
-            for j in range(-self.__radius, self.__radius + 1):
-                for k in range(-self.__radius, self.__radius + 1):
-                    if i + j + k == 0:
-                        self.get_coordinate(i, j, k)
+        # Only the valid j of every row are visited, and k follows from i + j + k == 0, so this is O(radius²)
+        # Squares are visited in the order the occupancy index numbers them, so their number is counted along
+        radius = self.__radius
+        squares = self.__squares
+        position = 0
+        for i in range(-radius, radius + 1):
+            for j in range(max(-radius, -i - radius), min(radius, -i + radius) + 1):
+                coordinates = (i, j, -i - j)
+                if coordinates not in squares:
+                    squares[coordinates] = HexSquare(self, coordinates, position)
+                position += 1
@@ -0,0 +1,305 @@
+"""
+Batched geometry on hex boards. Coordinates are cube coordinates (x, y, z) with x + y + z == 0, as used by the
+boards, given as numpy arrays of shape (..., 3) of ints, and the functions return arrays in the same form. A single
+square can be passed as a tuple. Axial coordinates are (x, z), as in hex_to_cartesian.
+
+Offsets of rings, spirals and ranges are computed once per radius and broadcast onto the centers, so the squares
+around many centers are found in one call by passing the centers as an array of shape (n, 1, 3).
+"""
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+from src.agent_world.board.exceptions import InvalidCoordinateException
+
+# The six directions to the neighbours of a square, in counter clockwise order
+DIRECTIONS = np.array([(1, -1, 0), (1, 0, -1), (0, 1, -1), (-1, 1, 0), (-1, 0, 1), (0, -1, 1)])
+DIRECTIONS.flags.writeable = False
+
+# Nudges lines off the edges between squares, so that they are rounded to the same side consistently
+_EPSILON = np.array([1e-6, 2e-6, -3e-6])
+
+
+def as_cube(coordinates):
+    """
+    Returns the coordinates as an int array of shape (..., 3)
+    :param coordinates: np.ndarray | (int, int, int) | [(int, int, int)]
+    :return: np.ndarray
+    """
+    return np.asarray(coordinates, dtype=np.int64)
+
+
+def axial_to_cube(q, r):
+    """
+    Converts axial coordinates to cube coordinates
+    :param q: np.ndarray | int The x coordinate
+    :param r: np.ndarray | int The z coordinate
+    :return: np.ndarray
+    """
+    q = np.asarray(q, dtype=np.int64)
+    r = np.asarray(r, dtype=np.int64)
+    return np.stack([q, -q - r, r], axis=-1)
+
+
+def cube_to_axial(coordinates):
+    """
+    Converts cube coordinates to axial coordinates
+    :param coordinates: np.ndarray
+    :return: (np.ndarray, np.ndarray) q and r
+    """
+    coordinates = as_cube(coordinates)
+    return coordinates[..., 0], coordinates[..., 2]
+
+
+def distance(a, b):
+    """
+    Returns the number of steps between the squares a and b, pairwise, broadcasting as numpy does
+    :param a: np.ndarray
+    :param b: np.ndarray
+    :return: np.ndarray
+    """
+    return np.abs(as_cube(a) - as_cube(b)).max(axis=-1)
+
+
+def neighbors(coordinates):
+    """
+    Returns the six neighbours of every square, in the order of DIRECTIONS
+    :param coordinates: np.ndarray Shape (..., 3)
+    :return: np.ndarray Shape (..., 6, 3)
+    """
+    return as_cube(coordinates)[..., None, :] + DIRECTIONS
+
+
+def ring(center, radius):
+    """
+    Returns the squares at exactly radius steps from the center, going counter clockwise
+    :param center: np.ndarray | (int, int, int)
+    :param radius: int
+    :return: np.ndarray Shape (max(1, 6 * radius), 3)
+    """
+    return as_cube(center) + _ring_offsets(radius)
+
+
+def spiral(center, radius):
+    """
+    Returns the squares within radius steps of the center, ring by ring from the center outwards, so that the
+    squares come in order of distance
+    :param center: np.ndarray | (int, int, int)
+    :param radius: int
+    :return: np.ndarray Shape (3 * radius * (radius + 1) + 1, 3)
+    """
+    return as_cube(center) + _spiral_offsets(radius)
+
+
+def hex_range(center, radius):
+    """
+    Returns the squares within radius steps of the center, row by row in order of x and then y, as numbered by a
+    HexIndexer
+    :param center: np.ndarray | (int, int, int)
+    :param radius: int
+    :return: np.ndarray Shape (3 * radius * (radius + 1) + 1, 3)
+    """
+    return as_cube(center) + _range_offsets(radius)
+
+
+def line(a, b):
+    """
+    Returns the squares on the straight line from a to b, both included
+    :param a: np.ndarray | (int, int, int)
+    :param b: np.ndarray | (int, int, int)
+    :return: np.ndarray Shape (distance(a, b) + 1, 3)
+    """
+    a = as_cube(a)
+    b = as_cube(b)
+    steps = int(distance(a, b))
+    if steps == 0:
+        return a[None, :].copy()
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    return cube_round(a + _EPSILON + (b - a) * t)
+
+
+def cube_round(fractional):
+    """
+    Rounds fractional cube coordinates to the square they are in
+    :param fractional: np.ndarray Shape (..., 3)
+    :return: np.ndarray
+    """
+    fractional = np.asarray(fractional, dtype=np.float64)
+    rounded = np.rint(fractional)
+    error = np.abs(rounded - fractional)
+    # The coordinate with the largest rounding error is recomputed from the other two
+    worst = error.argmax(axis=-1)[..., None]
+    others = rounded.sum(axis=-1, keepdims=True) - np.take_along_axis(rounded, worst, axis=-1)
+    np.put_along_axis(rounded, worst, -others, axis=-1)
+    return rounded.astype(np.int64)
+
+
+def line_of_sight(a, b, blocked):
+    """
+    Returns true if no square strictly between a and b on the line from a to b is blocked
+    :param a: np.ndarray | (int, int, int)
+    :param b: np.ndarray | (int, int, int)
+    :param blocked: (np.ndarray) -> np.ndarray Returns a mask of the given squares which block the line, e.g. their
+        occupancy on a DenseCircleHexBoard
+    :return: bool
+    """
+    between = line(a, b)[1:-1]
+    return len(between) == 0 or not np.any(blocked(between))
+
+
+@lru_cache(maxsize=64)
+def _ring_offsets(radius):
+    """
+    Returns the offsets from the center of a ring, as a read only array
+    :param radius: int
+    :return: np.ndarray
+    """
+    if radius == 0:
+        offsets = np.zeros((1, 3), dtype=np.int64)
+    else:
+        # Side i runs from the corner in direction i - 2 towards direction i
+        corners = np.roll(DIRECTIONS, 2, axis=0) * radius
+        steps = np.arange(radius)[None, :, None]
+        offsets = (corners[:, None, :] + DIRECTIONS[:, None, :] * steps).reshape(-1, 3)
+    offsets.flags.writeable = False
+    return offsets
+
+
+@lru_cache(maxsize=64)
+def _spiral_offsets(radius):
+    """
+    Returns the offsets from the center of a spiral, as a read only array
+    :param radius: int
+    :return: np.ndarray
+    """
+    offsets = np.concatenate([_ring_offsets(distance) for distance in range(radius + 1)])
+    offsets.flags.writeable = False
+    return offsets
+
+
+@lru_cache(maxsize=64)
+def _range_offsets(radius):
+    """
+    Returns the offsets from the center of a range, as a read only array
+    :param radius: int
+    :return: np.ndarray
+    """
+    offsets = np.stack(HexIndexer(radius).all_coordinates(), axis=-1)
+    offsets.flags.writeable = False
+    return offsets
+
+
+class HexIndexer:
+    """
+    Maps the cube coordinates of the squares of a circular hex board to flat indices, 0 to size - 1, and back. The
+    squares are numbered row by row, in order of x and then y, so the index of a square is the start of its row plus
+    its position in the row, which is O(1).
+
+    Attributes
+
+        radius: int
+            Radius of the board
+
+        size: int
+            Number of squares, 3 * radius * (radius + 1) + 1
+
+        _row_starts: [int]
+            Index of the first square of every row, from x = -radius to radius
+
+    Methods
+
+        contains(x: int, y: int, z: int) -> bool
+            Returns true if the coordinates are on the board
+
+        index(x: int, y: int, z: int) -> int
+            Returns the index of the square
+
+        indices(coordinates: np.ndarray) -> np.ndarray
+            Returns the index of every square, -1 for those off the board
+
+        coordinates(index: int) -> (int, int, int)
+            Returns the coordinates of the square with the given index
+
+        all_coordinates() -> (np.ndarray, np.ndarray, np.ndarray)
+            Returns the coordinates of every square, in order of index
+    """
+
+    def __init__(self, radius):
+        """
+        :param radius: int
+        """
+        self.radius = radius
+        self._row_starts = []
+        start = 0
+        for x in range(-radius, radius + 1):
+            self._row_starts.append(start)
+            start += 2 * radius + 1 - abs(x)
+        self.size = start
+
+    def contains(self, x, y, z):
+        """
+        Returns true if the coordinates are on the board
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: bool
+        """
+        radius = self.radius
+        return x + y + z == 0 and -radius <= x <= radius and -radius <= y <= radius and -radius <= z <= radius
+
+    def index(self, x, y, z):
+        """
+        Returns the index of the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: int
+        :raises: InvalidCoordinateException
+        """
+        if not self.contains(x, y, z):
+            raise InvalidCoordinateException
+        radius = self.radius
+        return self._row_starts[x + radius] + y - max(-radius, -x - radius)
+
+    def indices(self, coordinates):
+        """
+        Returns the index of every square, -1 for squares which are not on the board
+        :param coordinates: np.ndarray Cube coordinates, shape (..., 3)
+        :return: np.ndarray
+        """
+        coordinates = np.asarray(coordinates, dtype=np.int64)
+        radius = self.radius
+        xs, ys = coordinates[..., 0], coordinates[..., 1]
+        valid = (coordinates.sum(axis=-1) == 0) & (np.abs(coordinates) <= radius).all(axis=-1)
+        rows = np.clip(xs + radius, 0, 2 * radius)
+        indices = np.asarray(self._row_starts)[rows] + ys - np.maximum(-radius, -xs - radius)
+        return np.where(valid, indices, -1)
+
+    def coordinates(self, index):
+        """
+        Returns the coordinates of the square with the given index
+        :param index: int
+        :return: (int, int, int)
+        :raises: InvalidCoordinateException
+        """
+        if not 0 <= index < self.size:
+            raise InvalidCoordinateException
+        radius = self.radius
+        row = bisect_right(self._row_starts, index) - 1
+        x = row - radius
+        y = max(-radius, -x - radius) + index - self._row_starts[row]
+        return x, y, -x - y
+
+    def all_coordinates(self):
+        """
+        Returns the x, y and z coordinates of every square, in order of index, built row by row in O(radius²)
+        :return: (np.ndarray, np.ndarray, np.ndarray)
+        """
+        radius = self.radius
+        rows = np.arange(-radius, radius + 1)
+        lengths = 2 * radius + 1 - np.abs(rows)
+        xs = np.repeat(rows, lengths)
+        starts = np.repeat(np.asarray(self._row_starts), lengths)
+        ys = np.maximum(-radius, -xs - radius) + np.arange(self.size) - starts
+        return xs, ys, -xs - ys
@@ -0,0 +1,319 @@
+import numpy as np
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_geometry import HexIndexer
+
+# Number of squares, in order of index, whose occupied squares are counted together
+CHUNK_SIZE = 64
+
+# Distance within which nearest_free reads squares one by one rather than counting regions
+NEAR_DISTANCE = 2
+_NEAR_OFFSETS = [(int(hex_geometry.distance(offset, (0, 0, 0))), *offset)
+                 for offset in hex_geometry.spiral((0, 0, 0), NEAR_DISTANCE).tolist()]
+
+
+class IOccupancyListener:
+    """
+    Interface for objects told when squares of an OccupancyIndex become occupied or empty
+
+    Methods
+
+        occupancy_changed(index: int, occupied: bool) -> None
+            Called after the square with the given number became occupied or empty
+    """
+
+    def occupancy_changed(self, index, occupied):
+        """
+        :param index: int
+        :param occupied: bool
+        :return: None
+        """
+        raise NotImplementedError
+
+
+class OccupancyIndex:
+    """
+    Keeps track of which squares of a circular hex board have content, so that the board can answer spatial queries
+    without visiting its squares. Squares are numbered as by a HexIndexer. Which squares are occupied is kept in a
+    mask over these numbers, the number of occupied squares in every chunk of CHUNK_SIZE consecutive numbers in an
+    array of counts, and the numbers of the squares holding content of every type in a set per type.
+
+    A hex region around a square crosses every row of the board in a run of consecutive numbers, so the occupied
+    squares in it are counted from the counts of the chunks the runs cover, and only the ends of the runs are read
+    from the mask.
+
+    Attributes
+
+        indexer: HexIndexer
+            Numbers the squares
+
+        _occupied: np.ndarray
+            Whether every square has content
+
+        _chunk_counts: np.ndarray
+            Number of occupied squares in every chunk
+
+        _by_type: dict
+            Numbers of the squares holding content of every type
+
+        _shared: bool
+            Whether the arrays and sets are shared with forks of this index, in which case they are copied before
+            they are changed
+
+        _listeners: [IOccupancyListener]
+            Told about every change, not carried over to forks
+
+    Methods
+
+        subscribe(listener: IOccupancyListener) -> None
+            Tells the listener about every change from now on
+
+        unsubscribe(listener: IOccupancyListener) -> None
+            Stops telling the listener about changes
+
+        add(index: int, thing: Any) -> None
+            Records that the square with the given number holds the thing
+
+        remove(index: int, thing: Any) -> None
+            Records that the square with the given number, which held the thing, is empty
+
+        is_occupied(x: int, y: int, z: int) -> bool
+            Returns true if the square has content
+
+        occupancy() -> np.ndarray
+            Returns a mask of the squares which have content
+
+        count_on_board(x: int, y: int, z: int, radius: int) -> int
+            Returns the number of squares of the board within radius steps of the square
+
+        count_occupied(x: int, y: int, z: int, radius: int) -> int
+            Returns the number of occupied squares within radius steps of the square
+
+        nearest_free(x: int, y: int, z: int, max_distance: int?) -> (int, int, int) | None
+            Returns the closest square without content
+
+        squares_with(content_type: type) -> [(int, int, int)]
+            Returns the squares holding content of the type
+
+        fork() -> OccupancyIndex
+            Returns a copy of this index which shares its arrays until either of them changes
+    """
+
+    def __init__(self, radius):
+        """
+        :param radius: int
+        """
+        self.indexer = HexIndexer(radius)
+        self._occupied = np.zeros(self.indexer.size, dtype=bool)
+        self._chunk_counts = np.zeros(-(-self.indexer.size // CHUNK_SIZE), dtype=np.int32)
+        self._by_type = {}
+        self._shared = False
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """
+        Tells the listener about every change from now on
+        :param listener: IOccupancyListener
+        :return: None
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """
+        Stops telling the listener about changes
+        :param listener: IOccupancyListener
+        :return: None
+        """
+        self._listeners.remove(listener)
+
+    def add(self, index, thing):
+        """
+        Records that the square with the given number holds the thing
+        :param index: int
+        :param thing: Any
+        :return: None
+        """
+        self._own()
+        self._occupied[index] = True
+        self._chunk_counts[index // CHUNK_SIZE] += 1
+        self._by_type.setdefault(type(thing), set()).add(index)
+        for listener in self._listeners:
+            listener.occupancy_changed(index, True)
+
+    def remove(self, index, thing):
+        """
+        Records that the square with the given number, which held the thing, is empty
+        :param index: int
+        :param thing: Any
+        :return: None
+        """
+        if not self._occupied[index]:
+            return
+        self._own()
+        self._occupied[index] = False
+        self._chunk_counts[index // CHUNK_SIZE] -= 1
+        indices = self._by_type[type(thing)]
+        indices.discard(index)
+        if not indices:
+            del self._by_type[type(thing)]
+        for listener in self._listeners:
+            listener.occupancy_changed(index, False)
+
+    def is_occupied(self, x, y, z):
+        """
+        Returns true if the square has content
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: bool
+        :raises: InvalidCoordinateException
+        """
+        return bool(self._occupied[self.indexer.index(x, y, z)])
+
+    def occupancy(self):
+        """
+        Returns a mask of the squares which have content, in order of number, as a read only array
+        :return: np.ndarray
+        """
+        occupied = self._occupied.view()
+        occupied.flags.writeable = False
+        return occupied
+
+    def count_occupied(self, x, y, z, radius):
+        """
+        Returns the number of occupied squares within radius steps of the square, which may be off the board
+        :param x: int
+        :param y: int
+        :param z: int
+        :param radius: int
+        :return: int
+        """
+        return sum(self._count_run(start, stop) for start, stop in self._runs(x, y, radius))
+
+    def count_on_board(self, x, y, z, radius):
+        """
+        Returns the number of squares of the board within radius steps of the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :param radius: int
+        :return: int
+        """
+        return sum(stop - start for start, stop in self._runs(x, y, radius))
+
+    def nearest_free(self, x, y, z, max_distance=None):
+        """
+        Returns the coordinates of the closest square without content, or None if there is none within max_distance
+        steps. Of squares at the same distance, the first in the order of hex_geometry.ring is returned. The squares
+        within NEAR_DISTANCE steps are read one by one; beyond them, regions of doubling radius are counted, so that
+        only the rings beyond the largest full region are searched.
+        :param x: int
+        :param y: int
+        :param z: int
+        :param max_distance: int? Defaults to searching the whole board
+        :return: (int, int, int) | None
+        """
+        limit = 2 * self.indexer.radius if max_distance is None else max_distance
+        # Close by, reading the squares one by one is cheaper than counting regions
+        indexer = self.indexer
+        occupied = self._occupied
+        for distance, dx, dy, dz in _NEAR_OFFSETS:
+            if distance > limit:
+                return None
+            if indexer.contains(x + dx, y + dy, z + dz) and not occupied[indexer.index(x + dx, y + dy, z + dz)]:
+                return x + dx, y + dy, z + dz
+        if limit <= NEAR_DISTANCE:
+            return None
+        # All squares closer than first are occupied
+        first = NEAR_DISTANCE + 1
+        bound = first
+        while bound <= limit and self._is_full(x, y, z, bound):
+            if bound == limit:
+                return None
+            first = bound + 1
+            bound = min(2 * bound, limit)
+        # The rings from first to bound, which are consecutive in the spiral
+        squares = hex_geometry.spiral((x, y, z), bound)[3 * first * (first - 1) + 1:]
+        indices = self.indexer.indices(squares)
+        free = np.flatnonzero(indices >= 0)
+        free = free[~self._occupied[indices[free]]]
+        return tuple(int(c) for c in squares[free[0]])
+
+    def squares_with(self, content_type):
+        """
+        Returns the coordinates of the squares holding content of the type, or of a subclass of it, in order of number
+        :param content_type: type
+        :return: [(int, int, int)]
+        """
+        indices = sorted(index for stored_type, indices in self._by_type.items()
+                         if issubclass(stored_type, content_type) for index in indices)
+        return [self.indexer.coordinates(index) for index in indices]
+
+    def fork(self):
+        """
+        Returns a copy of this index. The two share their arrays and sets until either of them changes, at which
+        point that index copies them.
+        :return: OccupancyIndex
+        """
+        fork = OccupancyIndex.__new__(OccupancyIndex)
+        fork.__dict__.update(self.__dict__)
+        fork._shared = self._shared = True
+        fork._listeners = []
+        return fork
+
+    def _own(self):
+        """
+        Copies the arrays and sets if they are shared with forks of this index
+        :return: None
+        """
+        if self._shared:
+            self._occupied = self._occupied.copy()
+            self._chunk_counts = self._chunk_counts.copy()
+            self._by_type = {content_type: set(indices) for content_type, indices in self._by_type.items()}
+            self._shared = False
+
+    def _runs(self, x, y, radius):
+        """
+        Yields the runs of numbers, start included and stop excluded, of the squares of the board within radius steps
+        of the square, one per row
+        :param x: int
+        :param y: int
+        :param radius: int
+        :return: generator
+        """
+        board_radius = self.indexer.radius
+        row_starts = self.indexer._row_starts
+        for row in range(max(-board_radius, x - radius), min(board_radius, x + radius) + 1):
+            dx = row - x
+            # Within the region, y - dy runs over max(-radius, -dx - radius) .. min(radius, -dx + radius)
+            low = max(y + max(-radius, -dx - radius), -board_radius, -row - board_radius)
+            high = min(y + min(radius, -dx + radius), board_radius, -row + board_radius)
+            if low <= high:
+                start = row_starts[row + board_radius] + low - max(-board_radius, -row - board_radius)
+                yield start, start + high - low + 1
+
+    def _is_full(self, x, y, z, radius):
+        """
+        Returns true if every square of the board within radius steps of the square is occupied
+        :param x: int
+        :param y: int
+        :param z: int
+        :param radius: int
+        :return: bool
+        """
+        return all(self._count_run(start, stop) == stop - start for start, stop in self._runs(x, y, radius))
+
+    def _count_run(self, start, stop):
+        """
+        Returns the number of occupied squares numbered from start to stop, stop excluded
+        :param start: int
+        :param stop: int
+        :return: int
+        """
+        first = -(-start // CHUNK_SIZE)
+        last = stop // CHUNK_SIZE
+        if first >= last:
+            return int(np.count_nonzero(self._occupied[start:stop]))
+        return int(self._chunk_counts[first:last].sum()) + \
+            int(np.count_nonzero(self._occupied[start:first * CHUNK_SIZE])) + \
+            int(np.count_nonzero(self._occupied[last * CHUNK_SIZE:stop]))
@@ -0,0 +1,422 @@
+"""
+Pathfinding over circular hex boards whose squares are numbered by a HexIndexer, with a cost for entering every
+square. Squares with content can be reached, e.g. to find where an agent standing on one should go, but paths do not
+pass through them; only the sources and targets of a search are passed through when occupied. A square with an
+infinite cost can not be entered at all.
+"""
+import heapq
+from collections import OrderedDict
+from functools import lru_cache
+from math import inf
+
+import numpy as np
+
+from src.agent_world.board.exceptions import InvalidCoordinateException
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_geometry import HexIndexer
+from src.agent_world.board.hex.occupancy_index import IOccupancyListener
+
+
+class InvalidCostException(Exception):
+    pass
+
+
+class FlowField:
+    """
+    The cheapest way from every square of a board to the nearest of a set of targets, computed once and shared by all
+    agents heading for the targets. Every square knows its cost to reach a target and the neighbour to step to next.
+
+    Attributes
+
+        indexer: HexIndexer
+            Numbers the squares
+
+        targets: frozenset
+            Numbers of the target squares
+
+        distances: np.ndarray
+            Cost of reaching a target from every square, inf for squares which can not reach one
+
+        next_indices: np.ndarray
+            Number of the square to step to from every square, -1 for targets and squares which can not reach one
+
+        _children: np.ndarray
+            Number of squares stepping to every square
+
+        stale: bool
+            Whether the board changed so that the field may no longer be the cheapest way, or the field was dropped
+            from the cache of its Pathfinder, which then no longer follows the board for it
+
+    Methods
+
+        distance(x: int, y: int, z: int) -> float
+            Returns the cost of reaching a target from the square
+
+        next_step(x: int, y: int, z: int) -> (int, int, int) | None
+            Returns the square to step to
+
+        next_steps(coordinates: np.ndarray) -> np.ndarray
+            Returns the squares to step to from many squares at once
+
+        path(x: int, y: int, z: int) -> [(int, int, int)] | None
+            Returns the squares from the square to a target
+    """
+
+    def __init__(self, indexer, targets, distances, next_indices):
+        """
+        :param indexer: HexIndexer
+        :param targets: frozenset
+        :param distances: np.ndarray
+        :param next_indices: np.ndarray
+        """
+        self.indexer = indexer
+        self.targets = targets
+        self.distances = distances
+        self.next_indices = next_indices
+        self._children = np.bincount(next_indices[next_indices >= 0], minlength=indexer.size)
+        self.stale = False
+
+    def distance(self, x, y, z):
+        """
+        Returns the cost of reaching a target from the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: float
+        :raises: InvalidCoordinateException
+        """
+        return float(self.distances[self.indexer.index(x, y, z)])
+
+    def next_step(self, x, y, z):
+        """
+        Returns the square to step to from the square, None for targets and squares which can not reach one
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: (int, int, int) | None
+        :raises: InvalidCoordinateException
+        """
+        index = int(self.next_indices[self.indexer.index(x, y, z)])
+        return self.indexer.coordinates(index) if index >= 0 else None
+
+    def next_steps(self, coordinates):
+        """
+        Returns the squares to step to from many squares at once. Targets, and squares which can not reach one, step
+        to themselves.
+        :param coordinates: np.ndarray Cube coordinates, shape (n, 3)
+        :return: np.ndarray Shape (n, 3)
+        :raises: InvalidCoordinateException
+        """
+        coordinates = hex_geometry.as_cube(coordinates)
+        indices = self.indexer.indices(coordinates)
+        if np.any(indices < 0):
+            raise InvalidCoordinateException
+        steps = self.next_indices[indices]
+        moving = steps >= 0
+        result = coordinates.copy()
+        result[moving] = _all_coordinates(self.indexer.radius)[steps[moving]]
+        return result
+
+    def path(self, x, y, z):
+        """
+        Returns the squares from the square to a target, both included, or None if no target can be reached
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: [(int, int, int)] | None
+        :raises: InvalidCoordinateException
+        """
+        index = self.indexer.index(x, y, z)
+        if self.distances[index] == inf:
+            return None
+        indices = [index]
+        while indices[-1] not in self.targets:
+            indices.append(int(self.next_indices[indices[-1]]))
+        return [self.indexer.coordinates(index) for index in indices]
+
+
+class Pathfinder(IOccupancyListener):
+    """
+    Finds paths over a CircleHexBoard, with a cost for entering every square, 1 by default. Single paths are found with
+    A*, costs from a set of sources with Dijkstra, and the way to a set of targets from every square as a FlowField.
+    Flow fields are cached by their targets, so agents heading for the same place share a single computation, and the
+    pathfinder listens to the occupancy index of the board so that only the fields a change can affect are computed
+    again: a square becoming occupied affects the fields which step through it, and a square becoming empty those in
+    which it offers a cheaper way to a neighbour.
+
+    Extends
+
+        IOccupancyListener
+
+    Attributes
+
+        indexer: HexIndexer
+            Numbers the squares
+
+        max_fields: int
+            Number of flow fields kept, least recently used first out, marked stale as they are dropped
+
+        _occupancy: OccupancyIndex
+            Occupancy index of the board
+
+        _costs: np.ndarray
+            Cost of entering every square
+
+        _min_cost: float
+            Lowest cost of entering a square, which makes the A* heuristic admissible
+
+        _fields: OrderedDict
+            Cached flow fields, by targets
+
+    Methods
+
+        cost(x: int, y: int, z: int) -> float
+            Returns the cost of entering the square
+
+        set_cost(x: int, y: int, z: int, cost: float) -> None
+            Sets the cost of entering the square
+
+        path(start: (int, int, int), goal: (int, int, int)) -> [(int, int, int)] | None
+            Returns the cheapest path between two squares, using A*
+
+        dijkstra(sources: [(int, int, int)]) -> np.ndarray
+            Returns the cost of reaching every square from the nearest source
+
+        flow_field(targets: [(int, int, int)]) -> FlowField
+            Returns the flow field towards the targets, from the cache if it is up to date
+
+        occupancy_changed(index: int, occupied: bool) -> None
+            Inherited from IOccupancyListener
+
+        close() -> None
+            Stops listening to the board
+    """
+
+    def __init__(self, board, costs=None, max_fields=64):
+        """
+        :param board: CircleHexBoard
+        :param costs: np.ndarray? Cost of entering every square, in order of number, all 1 by default
+        :param max_fields: int
+        :raises: InvalidCostException
+        """
+        self._occupancy = board.occupancy()
+        self.indexer = self._occupancy.indexer
+        self.max_fields = max_fields
+        if costs is None:
+            self._costs = np.ones(self.indexer.size)
+        else:
+            self._costs = np.array(costs, dtype=np.float64)
+            if self._costs.shape != (self.indexer.size,) or not np.all(self._costs > 0):
+                raise InvalidCostException
+        self._min_cost = float(self._costs.min())
+        self._fields = OrderedDict()
+        self._occupancy.subscribe(self)
+
+    def close(self):
+        """
+        Stops listening to the board
+        :return: None
+        """
+        self._occupancy.unsubscribe(self)
+
+    def cost(self, x, y, z):
+        """
+        Returns the cost of entering the square
+        :param x: int
+        :param y: int
+        :param z: int
+        :return: float
+        :raises: InvalidCoordinateException
+        """
+        return float(self._costs[self.indexer.index(x, y, z)])
+
+    def set_cost(self, x, y, z, cost):
+        """
+        Sets the cost of entering the square, inf for a square which can not be entered
+        :param x: int
+        :param y: int
+        :param z: int
+        :param cost: float
+        :return: None
+        :raises: InvalidCoordinateException
+        :raises: InvalidCostException
+        """
+        if not cost > 0:
+            raise InvalidCostException
+        index = self.indexer.index(x, y, z)
+        previous = self._costs[index]
+        self._costs[index] = cost
+        if cost <= self._min_cost:
+            self._min_cost = cost
+        elif previous == self._min_cost:
+            self._min_cost = float(self._costs.min())
+        self._invalidate(index, True)
+
+    def path(self, start, goal):
+        """
+        Returns the cheapest path from start to goal, both included, or None if there is none, using A* with the
+        distance in steps times the lowest cost of a square as heuristic
+        :param start: (int, int, int)
+        :param goal: (int, int, int)
+        :return: [(int, int, int)] | None
+        :raises: InvalidCoordinateException
+        """
+        start_index = self.indexer.index(*start)
+        goal_index = self.indexer.index(*goal)
+        neighbors = _neighbor_lists(self.indexer.radius)
+        costs = self._costs.tolist()
+        occupied = self._occupancy.occupancy()
+        coordinates = _coordinate_lists(self.indexer.radius)
+        goal_x, goal_y, goal_z = goal
+        min_cost = self._min_cost
+        distances = {start_index: 0.0}
+        previous = {}
+        done = set()
+        heap = [(0.0, start_index)]
+        while heap:
+            _, index = heapq.heappop(heap)
+            if index == goal_index:
+                path = [index]
+                while path[-1] != start_index:
+                    path.append(previous[path[-1]])
+                return [self.indexer.coordinates(index) for index in reversed(path)]
+            if index in done:
+                continue
+            done.add(index)
+            distance = distances[index]
+            for neighbor in neighbors[index]:
+                if neighbor != goal_index and occupied[neighbor]:
+                    continue
+                candidate = distance + costs[neighbor]
+                if candidate < distances.get(neighbor, inf):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = index
+                    x, y, z = coordinates[neighbor]
+                    steps = max(abs(x - goal_x), abs(y - goal_y), abs(z - goal_z))
+                    heapq.heappush(heap, (candidate + steps * min_cost, neighbor))
+        return None
+
+    def dijkstra(self, sources):
+        """
+        Returns the cost of reaching every square from the nearest of the sources, inf for squares which can not be
+        reached
+        :param sources: [(int, int, int)]
+        :return: np.ndarray
+        :raises: InvalidCoordinateException
+        """
+        distances, _ = self._search([self.indexer.index(*source) for source in sources], False)
+        return distances
+
+    def flow_field(self, targets):
+        """
+        Returns the flow field towards the targets, computing it only if it is not cached or may be out of date
+        :param targets: [(int, int, int)]
+        :return: FlowField
+        :raises: InvalidCoordinateException
+        """
+        key = frozenset(self.indexer.index(*target) for target in targets)
+        field = self._fields.get(key)
+        if field is not None and not field.stale:
+            self._fields.move_to_end(key)
+            return field
+        distances, next_indices = self._search(list(key), True)
+        field = FlowField(self.indexer, key, distances, next_indices)
+        self._fields[key] = field
+        self._fields.move_to_end(key)
+        if len(self._fields) > self.max_fields:
+            _, evicted = self._fields.popitem(last=False)
+            evicted.stale = True
+        return field
+
+    def occupancy_changed(self, index, occupied):
+        """
+        Inherited from IOccupancyListener
+        """
+        self._invalidate(index, False)
+
+    def _invalidate(self, index, cost_changed):
+        """
+        Marks the cached flow fields which a change of the square may have made out of date as stale, and drops them
+        :param index: int
+        :param cost_changed: bool Whether the cost of the square changed, rather than whether it is occupied
+        :return: None
+        """
+        neighbors = _neighbor_lists(self.indexer.radius)[index]
+        passable = not self._occupancy.occupancy()[index]
+        cost = self._costs[index]
+        for key, field in list(self._fields.items()):
+            # Targets are passed through whether they are occupied or not
+            if index in field.targets and not cost_changed:
+                continue
+            distances = field.distances
+            # Squares stepping through it may have to go around it, or it may be a shorter way for a neighbour
+            if field._children[index] or passable and distances[index] + cost < distances[neighbors].max(initial=0):
+                field.stale = True
+                del self._fields[key]
+
+    def _search(self, sources, towards):
+        """
+        Dijkstra from the sources. Outwards, the cost of a square is that of reaching it from a source; towards the
+        sources, that of reaching a source from it, along with the square to step to.
+        :param sources: [int]
+        :param towards: bool
+        :return: (np.ndarray, np.ndarray)
+        """
+        neighbors = _neighbor_lists(self.indexer.radius)
+        costs = self._costs.tolist()
+        occupied = self._occupancy.occupancy().tolist()
+        distances = [inf] * self.indexer.size
+        next_indices = [-1] * self.indexer.size
+        expand = set(sources)
+        heap = []
+        for source in sources:
+            distances[source] = 0.0
+            heap.append((0.0, source))
+        heapq.heapify(heap)
+        while heap:
+            distance, index = heapq.heappop(heap)
+            if distance > distances[index] or occupied[index] and index not in expand:
+                continue
+            # Towards the sources, stepping from a neighbour to this square costs entering this square
+            step = costs[index]
+            for neighbor in neighbors[index]:
+                candidate = distance + (step if towards else costs[neighbor])
+                if candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    next_indices[neighbor] = index
+                    heapq.heappush(heap, (candidate, neighbor))
+        return np.array(distances), np.array(next_indices)
+
+
+@lru_cache(maxsize=8)
+def _neighbor_lists(radius):
+    """
+    Returns the numbers of the neighbours on the board of every square of a board of the radius
+    :param radius: int
+    :return: [[int]]
+    """
+    indexer = HexIndexer(radius)
+    table = indexer.indices(hex_geometry.neighbors(_all_coordinates(radius)))
+    return [[int(neighbor) for neighbor in row if neighbor >= 0] for row in table.tolist()]
+
+
+@lru_cache(maxsize=8)
+def _coordinate_lists(radius):
+    """
+    Returns the coordinates of every square of a board of the radius, in order of number, as lists
+    :param radius: int
+    :return: [[int]]
+    """
+    return _all_coordinates(radius).tolist()
+
+
+@lru_cache(maxsize=8)
+def _all_coordinates(radius):
+    """
+    Returns the coordinates of every square of a board of the radius, in order of number, as a read only array
+    :param radius: int
+    :return: np.ndarray
+    """
+    coordinates = np.stack(HexIndexer(radius).all_coordinates(), axis=-1)
+    coordinates.flags.writeable = False
+    return coordinates
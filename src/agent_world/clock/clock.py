@@ -1,3 +1,7 @@
+import copy
+import heapq
+
+
 class InvalidTimeException(Exception):
     pass
 
@@ -6,6 +10,10 @@ class AlreadySubscribedToClockException(Exception):
     pass
 
 
+class UnforkableDelegateException(Exception):
+    pass
+
+
 class IClockDelegate:
     """
     Delegate for the IClock interface
@@ -19,6 +27,39 @@ class IClockDelegate:
         raise NotImplementedError  # pragma: no cover
 
 
+class IWakingClockDelegate(IClockDelegate):
+    """
+    A delegate which tells the clock when it next has work to do, so that the clock only sets its time when that
+    time has come rather than on every change of time. In between, the delegate is expected to take the time of the
+    clock as its current time.
+
+    Extends
+
+        IClockDelegate
+
+    Methods:
+        next_wake_time(self) -> int?
+            Returns the earliest time this delegate has work to do at, None if it has none
+
+        attach_clock(self, clock: Clock) -> bool
+            Called when the delegate is subscribed to a clock. From then on, whenever the delegate gets work to do
+            earlier than its last wake time, it calls clock.wake_at(self, time). Returns False if the delegate
+            should instead have its time set on every change of time.
+
+        detach_clock(self, clock: Clock) -> None
+            Called when the delegate is unsubscribed from the clock
+    """
+
+    def next_wake_time(self):
+        raise NotImplementedError  # pragma: no cover
+
+    def attach_clock(self, clock):
+        raise NotImplementedError  # pragma: no cover
+
+    def detach_clock(self, clock):
+        raise NotImplementedError  # pragma: no cover
+
+
 class IClock:
     # todo: This is essentially a listener pattern and could be abstracted further
     # Todo: Make current_time() a property?
@@ -101,10 +142,34 @@ class Clock(IClock):
 
         IClock
 
+    Subscribers are kept in a dict, in the order they subscribed, so subscribing and unsubscribing are O(1).
+    Delegates are told the time on every change of time, except IWakingClockDelegates, such as Schedulers, which
+    are kept in a heap by the time they next have work to do and are only told the time once it is due. Setting the
+    time thus costs O(log n) per delegate with work due rather than O(n).
+
+    Delegates are told the time in the order they subscribed, whether they are told every change or only woken, as
+    if every delegate was told. A waking delegate which becomes due at the current time only once its turn has
+    passed, e.g. through an event of a delegate subscribed after it, is left for the next change of time, as its
+    time would already have been set.
+
+    Delegates which can not be hashed, such as those defining __eq__ but not __hash__, are told apart by identity.
+
     Attributes
 
-        _subscribers: [IClockDelegate]
-            Subscribers to the time defined by the clock
+        _subscribers: {IClockDelegate: int}
+            Subscribers to the time defined by the clock, by the order they subscribed in
+
+        _eager: {IClockDelegate: int}
+            Subscribers which have their time set on every change of time, by the order they subscribed in
+
+        _wakes: {IWakingClockDelegate: int?}
+            Wake time of every waking subscriber, None if it has no work to do
+
+        _wake_heap: [(int, int, IWakingClockDelegate)]
+            Heap of wake times, order of subscription and waking subscribers. Entries whose wake time no longer
+            matches _wakes are stale and skipped.
+
+        The keys of these, and the delegates of _wake_heap, are wrapped in an _Identity for unhashable delegates.
 
         _current_time: Int
             The current time
@@ -124,6 +189,27 @@ class Clock(IClock):
     unsubscribe_all(self): -> None
         Removes all subscribers
 
+    subscribers(self): -> [IClockDelegate]
+        Returns the subscribers of this clock
+
+    eager_subscribers(self): -> [IClockDelegate]
+        Returns the subscribers which have their time set on every change of time
+
+    wake_at(self, delegate: IWakingClockDelegate, time: int): -> None
+        Tells the clock that the delegate has work to do at time
+
+    next_wake_time(self): -> int?
+        Returns the earliest time a waking subscriber has work to do at
+
+    add_wake_listener(self, listener: () -> None): -> None
+        Calls listener whenever work is announced which may be due before the earliest wake time known so far
+
+    remove_wake_listener(self, listener: () -> None): -> None
+        Stops calling listener
+
+    notify_wake(self): -> None
+        Calls the wake listeners, e.g. when work arrives which the clock is not told the time of
+
     advance_time_by(self, delta_time): -> None
         Advances time to _current_time + delta_time
         Throws InvalidTimeException
@@ -132,12 +218,28 @@ class Clock(IClock):
         Sets _current_time to time.
         Throws InvalidTimeException
 
+    set_time_to_async(self, time): -> None
+        Coroutine setting _current_time to time, awaiting subscribers which can be awaited
+        Throws InvalidTimeException
+
+    advance_time_by_async(self, delta_time): -> None
+        Coroutine advancing time to _current_time + delta_time as per set_time_to_async
+        Throws InvalidTimeException
+
+    fork(self, memo: dict?): -> Clock
+        Returns a copy of this clock with forks of its subscribers subscribed
+        Throws UnforkableDelegateException
 
     """
 
     # Todo: Subscribers should never be subscribed to more than one clock
     def __init__(self, starting_time=0):
-        self._subscribers = []
+        self._subscribers = {}
+        self._eager = {}
+        self._wakes = {}
+        self._wake_heap = []
+        self._subscriptions = 0
+        self._wake_listeners = []
         self._current_time = starting_time
 
     def current_time(self):
@@ -153,10 +255,17 @@ class Clock(IClock):
         :param delegate: IClockDelegate
         :return: None
         """
-        if delegate not in self._subscribers:
-            self._subscribers.append(delegate)
-        else:
+        key = _key(delegate)
+        if key in self._subscribers:
             raise AlreadySubscribedToClockException
+        subscription = self._subscriptions
+        self._subscribers[key] = subscription
+        self._subscriptions += 1
+        if isinstance(delegate, IWakingClockDelegate) and delegate.attach_clock(self):
+            self._wakes[key] = None
+            self.wake_at(delegate, delegate.next_wake_time())
+        else:
+            self._eager[key] = subscription
 
     def unsubscribe(self, delegate: IClockDelegate):
         """
@@ -164,14 +273,111 @@ class Clock(IClock):
         :param delegate: IClockDelegate
         :return: None
         """
-        self._subscribers.remove(delegate)
+        key = _key(delegate)
+        del self._subscribers[key]
+        if key in self._wakes:
+            del self._wakes[key]
+            delegate.detach_clock(self)
+        else:
+            del self._eager[key]
 
     def unsubscribe_all(self):
         """
         Inherited from IClock
         :return: None
         """
+        for key in self._wakes:
+            _delegate(key).detach_clock(self)
         self._subscribers.clear()
+        self._eager.clear()
+        self._wakes.clear()
+        self._wake_heap.clear()
+
+    def subscribers(self):
+        """
+        Returns the subscribers of this clock, in the order they subscribed
+        :return: [IClockDelegate]
+        """
+        return [_delegate(key) for key in self._subscribers]
+
+    def eager_subscribers(self):
+        """
+        Returns the subscribers which have their time set on every change of time, i.e. which are not waking
+        delegates, in the order they subscribed
+        :return: [IClockDelegate]
+        """
+        return [_delegate(key) for key in self._eager]
+
+    def wake_at(self, delegate: IWakingClockDelegate, time):
+        """
+        Tells the clock that the delegate has work to do at time, so that the clock sets the time of the delegate
+        once it gets there. Nothing is done if the delegate is already due to wake at or before time, or if it is
+        not a waking subscriber of this clock.
+        :param delegate: IWakingClockDelegate
+        :param time: int? None for no work
+        :return: None
+        """
+        key = _key(delegate)
+        if time is None or key not in self._wakes:
+            return
+        wake = self._wakes[key]
+        if wake is not None and wake <= time:
+            return
+        self._wakes[key] = time
+        heap = self._wake_heap
+        heapq.heappush(heap, (time, self._subscribers[key], key))
+        if self._wake_listeners and heap[0][0] == time:
+            self.notify_wake()
+        if len(heap) > 2 * len(self._wakes) + 64:
+            self._compact_wakes()
+
+    def add_wake_listener(self, listener):
+        """
+        Calls listener whenever work is announced which may be due before the earliest wake time known so far, so
+        that e.g. a driver sleeping until then can wake up. Listeners may be called from any thread.
+        :param listener: () -> None
+        :return: None
+        """
+        self._wake_listeners.append(listener)
+
+    def remove_wake_listener(self, listener):
+        """
+        Stops calling listener
+        :param listener: () -> None
+        :return: None
+        """
+        self._wake_listeners.remove(listener)
+
+    def notify_wake(self):
+        """
+        Calls the wake listeners. Subscribers which are told every change of time, and so are not asked for their
+        wake time, call this when they get work from outside the execution of the clock, e.g. from another thread.
+        :return: None
+        """
+        for listener in list(self._wake_listeners):
+            listener()
+
+    def next_wake_time(self):
+        """
+        Returns the earliest time a waking subscriber has work to do at, or None if none of them has. Wake times
+        which have moved, e.g. because the event they were for was cancelled, are refreshed on the way.
+        :return: int?
+        """
+        heap = self._wake_heap
+        wakes = self._wakes
+        while heap:
+            wake, _, key = heap[0]
+            if wakes.get(key) != wake:
+                heapq.heappop(heap)
+                continue
+            delegate = _delegate(key)
+            actual = delegate.next_wake_time()
+            if actual == wake:
+                return wake
+            heapq.heappop(heap)
+            wakes[key] = None
+            self.wake_at(delegate, actual)
+        return None
 
     def advance_time_by(self, delta_time):
         """
@@ -189,7 +395,192 @@ class Clock(IClock):
         """
         if time > self._current_time:
             self._current_time = time
-            for subscriber in self._subscribers:
-                subscriber.set_time(self._current_time)
+            if not self._wakes:
+                # Without waking subscribers, every subscriber is told in the order they subscribed
+                for key in list(self._eager):
+                    (key.delegate if type(key) is _Identity else key).set_time(time)
+                return
+            due = self._due_delegates(time)
+            try:
+                for subscriber in due:
+                    subscriber.set_time(time)
+            finally:
+                due.close()
+        else:
+            raise InvalidTimeException
+
+    async def set_time_to_async(self, time):
+        """
+        Sets the time as per set_time_to, but awaits the set_time_async coroutine of every subscriber which has one,
+        such as an AsyncScheduler, before informing the next subscriber
+        :param time: int
+        :return: None
+        """
+        if time > self._current_time:
+            self._current_time = time
+            due = self._due_delegates(time)
+            try:
+                for subscriber in due:
+                    await _set_time_async(subscriber, time)
+            finally:
+                due.close()
         else:
             raise InvalidTimeException
+
+    async def advance_time_by_async(self, delta_time):
+        """
+        Advances the time as per advance_time_by, awaiting subscribers as per set_time_to_async
+        :param delta_time: int
+        :return: None
+        """
+        await self.set_time_to_async(self._current_time + delta_time)
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this clock at the same time, with forks of its subscribers subscribed in the same order.
+        Every subscriber has to have a fork(memo) method, such as Scheduler.fork.
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: Clock
+        :raises: UnforkableDelegateException
+        """
+        memo = {} if memo is None else memo
+        if id(self) in memo:
+            return memo[id(self)]
+        subscribers = self.subscribers()
+        for subscriber in subscribers:
+            if getattr(subscriber, "fork", None) is None:
+                raise UnforkableDelegateException
+        fork = copy.copy(self)
+        memo[id(self)] = fork
+        fork._subscribers = {}
+        fork._eager = {}
+        fork._wakes = {}
+        fork._wake_heap = []
+        fork._subscriptions = 0
+        fork._wake_listeners = []
+        for subscriber in subscribers:
+            fork.subscribe(subscriber.fork(memo))
+        return fork
+
+    def _due_delegates(self, time):
+        """
+        Generator yielding the subscribers to set the time of, in the order they subscribed: every subscriber told
+        every change of time, and the waking subscribers due at or before time, which are popped off the heap as they
+        come up and put back with their next wake time once their time is set. Every subscriber is yielded at most
+        once. Work a waking subscriber gets for the current time once its turn has passed is left for the next change
+        of time, as it would be for a subscriber told every change.
+        :param time: int
+        :return: Iterator[IClockDelegate]
+        """
+        heap = self._wake_heap
+        wakes = self._wakes
+        eager = list(self._eager.items())
+        next_eager = 0
+        # Heap of the waking subscribers which are due, by order of subscription
+        due = []
+        pending = set()
+        deferred = []
+        # Order of subscription of the subscriber yielded last
+        turn = -1
+        try:
+            while True:
+                while heap and heap[0][0] <= time:
+                    entry = heapq.heappop(heap)
+                    key = entry[2]
+                    if wakes.get(key) != entry[0] or key in pending:
+                        continue
+                    if entry[1] <= turn:
+                        deferred.append(entry)
+                        continue
+                    pending.add(key)
+                    heapq.heappush(due, (entry[1], entry))
+                if next_eager < len(eager) and (not due or eager[next_eager][1] < due[0][0]):
+                    key, turn = eager[next_eager]
+                    next_eager += 1
+                    yield key.delegate if type(key) is _Identity else key
+                    continue
+                if not due:
+                    break
+                turn, entry = heapq.heappop(due)
+                key = entry[2]
+                pending.discard(key)
+                if key not in wakes:
+                    continue
+                wakes[key] = None
+                delegate = _delegate(key)
+                try:
+                    yield delegate
+                finally:
+                    if key in wakes:
+                        self.wake_at(delegate, delegate.next_wake_time())
+        finally:
+            # Subscribers left when a subscriber raises are due at the next change of time
+            for _, entry in due:
+                heapq.heappush(heap, entry)
+            for entry in deferred:
+                heapq.heappush(heap, entry)
+
+    def _compact_wakes(self):
+        """
+        Rebuilds the heap of wake times without stale entries, in place, as it may be being popped by
+        _due_delegates
+        :return: None
+        """
+        heap = self._wake_heap
+        heap[:] = [(wake, self._subscribers[key], key) for key, wake in self._wakes.items() if wake is not None]
+        heapq.heapify(heap)
+
+
+class _Identity:
+    """
+    Stands in for an unhashable delegate as the key of the subscriptions of a clock, hashing and comparing by the
+    identity of the delegate
+    """
+
+    __slots__ = ("delegate",)
+
+    def __init__(self, delegate):
+        """
+        :param delegate: IClockDelegate
+        """
+        self.delegate = delegate
+
+    def __hash__(self):
+        return id(self.delegate)
+
+    def __eq__(self, other):
+        return type(other) is _Identity and other.delegate is self.delegate
+
+
+def _key(delegate):
+    """
+    Returns the key of the delegate in the subscriptions of a clock, the delegate itself unless it is unhashable
+    :param delegate: IClockDelegate
+    :return: Hashable
+    """
+    if type(delegate).__hash__ is None:
+        return _Identity(delegate)
+    return delegate
+
+
+def _delegate(key):
+    """
+    Returns the delegate of a key returned by _key
+    :param key: Hashable
+    :return: IClockDelegate
+    """
+    return key.delegate if type(key) is _Identity else key
+
+
+async def _set_time_async(subscriber, time):
+    """
+    Awaits the set_time_async coroutine of the subscriber if it has one, otherwise calls its set_time
+    :param subscriber: IClockDelegate
+    :param time: int
+    :return: None
+    """
+    set_time_async = getattr(subscriber, "set_time_async", None)
+    if set_time_async is not None:
+        await set_time_async(time)
+    else:
+        subscriber.set_time(time)
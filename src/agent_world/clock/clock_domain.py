@@ -0,0 +1,183 @@
+from src.agent_world.clock.clock import Clock, IWakingClockDelegate, _key
+
+
+class InvalidPeriodException(Exception):
+    pass
+
+
+class ClockDomain(Clock, IWakingClockDelegate):
+    """
+    A clock which follows a master clock at a coarser rate. The time of the domain only moves in whole periods,
+    from phase onwards: whenever the master passes one or more boundaries, the domain is set to the latest of them
+    once, however many smaller steps the master took in between. Subsystems subscribed to the domain thus run once
+    per period at most.
+
+    The domain subscribes itself to the master as a waking delegate. It wakes at the first boundary at or after the
+    wake time of any of its waking subscribers, such as Schedulers, and at every boundary if it has subscribers which
+    are told every change of time. Events scheduled in the domain are executed at the first boundary at or after
+    their time.
+
+    Extends
+
+        Clock, IWakingClockDelegate
+
+    Attributes
+
+        period: int
+            Time between two updates of the domain
+
+        phase: int
+            Time of one of the boundaries, such that the boundaries are at phase + k * period
+
+        _master: Clock?
+            The clock followed, None once the domain is unsubscribed from it
+
+    Methods
+
+        master() -> Clock?
+            Returns the clock followed
+
+        floor(time: int) -> int
+            Returns the latest boundary at or before time
+
+        ceil(time: int) -> int
+            Returns the earliest boundary at or after time
+    """
+
+    def __init__(self, master: Clock, period, phase=0):
+        """
+        :param master: Clock
+        :param period: int
+        :param phase: int
+        :raises: InvalidPeriodException
+        """
+        if period <= 0:
+            raise InvalidPeriodException
+        self.period = period
+        self.phase = phase
+        self._master = None
+        super().__init__(self.floor(master.current_time()))
+        master.subscribe(self)
+
+    def master(self):
+        """
+        Returns the clock followed, None if the domain has been unsubscribed from it
+        :return: Clock?
+        """
+        return self._master
+
+    def floor(self, time):
+        """
+        Returns the latest boundary at or before time
+        :param time: int
+        :return: int
+        """
+        return self.phase + (time - self.phase) // self.period * self.period
+
+    def ceil(self, time):
+        """
+        Returns the earliest boundary at or after time
+        :param time: int
+        :return: int
+        """
+        return self.phase - (self.phase - time) // self.period * self.period
+
+    def current_time(self):
+        """
+        Inherited from Clock. While the domain is not woken, this is the latest boundary the master has passed.
+        :return: int
+        """
+        master = self._master
+        if master is not None:
+            return max(self._current_time, self.floor(master.current_time()))
+        return self._current_time
+
+    def subscribe(self, delegate):
+        """
+        Inherited from Clock
+        :param delegate: IClockDelegate
+        :return: None
+        """
+        super().subscribe(delegate)
+        if self._master is not None:
+            self._master.wake_at(self, self.next_wake_time())
+
+    def wake_at(self, delegate, time):
+        """
+        Inherited from Clock, passing the boundary at or after time on to the master
+        :param delegate: IWakingClockDelegate
+        :param time: int?
+        :return: None
+        """
+        super().wake_at(delegate, time)
+        if self._master is not None and time is not None and _key(delegate) in self._wakes:
+            self._master.wake_at(self, self.ceil(max(time, self.current_time() + 1)))
+
+    def set_time(self, time):
+        """
+        Inherited from IClockDelegate. Sets the time of the domain to the latest boundary at or before time, if it
+        has not been set to it yet.
+        :param time: int
+        :return: None
+        """
+        time = self.floor(time)
+        if time > self._current_time:
+            self.set_time_to(time)
+
+    async def set_time_async(self, time):
+        """
+        Sets the time as per set_time, awaiting subscribers as per Clock.set_time_to_async
+        :param time: int
+        :return: None
+        """
+        time = self.floor(time)
+        if time > self._current_time:
+            await self.set_time_to_async(time)
+
+    def next_wake_time(self):
+        """
+        Inherited from IWakingClockDelegate. The next boundary if the domain has subscribers told every change of
+        time, otherwise the first boundary at or after the earliest wake time of its subscribers.
+        :return: int?
+        """
+        after = self.current_time() + 1
+        if self._eager:
+            return self.ceil(after)
+        wake = Clock.next_wake_time(self)
+        if wake is not None:
+            return self.ceil(max(wake, after))
+        return None
+
+    def attach_clock(self, clock):
+        """
+        Inherited from IWakingClockDelegate
+        :param clock: Clock
+        :return: bool
+        """
+        self._master = clock
+        return True
+
+    def detach_clock(self, clock):
+        """
+        Inherited from IWakingClockDelegate. The domain keeps the time it was at.
+        :param clock: Clock
+        :return: None
+        """
+        if self._master is clock:
+            self._current_time = self.current_time()
+            self._master = None
+
+    def fork(self, memo=None):
+        """
+        Inherited from Clock. The fork follows the fork of the master, once that subscribes it.
+        :param memo: dict?
+        :return: ClockDomain
+        """
+        memo = {} if memo is None else memo
+        if id(self) in memo:
+            return memo[id(self)]
+        current_time = self.current_time()
+        fork = super().fork(memo)
+        fork._current_time = current_time
+        fork._master = None
+        return fork
@@ -1,15 +1,174 @@
+import math
+from sys import intern
+
+
 class IncorrectTickerException(Exception):
     pass
 
 
+class InexactAmountException(Exception):
+    pass
+
+
+class ConflictingMinorUnitsException(Exception):
+    pass
+
+
+# An amount is a whole number of minor units if it is within the representation error of floats of one. The error
+# grows with the amount, so the tolerance is relative to it, with an absolute floor for amounts close to 0.
+_ABSOLUTE_TOLERANCE = 1e-6
+_RELATIVE_TOLERANCE = 1e-14
+
+
+class MinorUnitRegistry:
+    """
+    Tickers counted in integer minor units, e.g. cents, rather than floats. Amounts of such tickers are still given
+    and returned in major units, but Currency and Wallet store them as an integer number of minor units, so sums
+    and comparisons are exact however many of them are made. An amount which is not a whole number of minor units
+    raises an InexactAmountException rather than being rounded.
+
+    Tickers have to be registered before any currency of them is created, typically when the module defining them
+    is imported, so that every process of a ReplicaRunner registers them too. Once amounts of a ticker have been
+    stored, the ticker is pinned: registering it with another scale, or unregistering it, raises a
+    ConflictingMinorUnitsException, as the stored amounts would silently change value.
+
+    Attributes
+
+        _scales: dict
+            Number of minor units per major unit, by ticker
+
+        _pinned: set
+            Tickers amounts of which have been stored, whose scale can no longer change
+
+    Methods
+
+        register(ticker: Any, scale: int) -> None
+            Counts the ticker in units of 1 / scale
+
+        unregister(ticker: Any) -> None
+            Counts the ticker in floats again
+
+        scale(ticker: Any) -> int?
+            Returns the number of minor units per major unit of the ticker, None if it is counted in floats
+
+        pin(ticker: Any) -> int?
+            Fixes the scale of the ticker, as amounts of it are about to be stored, and returns it
+
+        to_minor(amount: float, ticker: Any) -> int | float
+            Converts an amount in major units to the units the ticker is stored in
+
+        to_major(units: int | float, ticker: Any) -> int | float
+            Converts an amount in the units the ticker is stored in to major units
+    """
+
+    def __init__(self):
+        self._scales = {}
+        self._pinned = set()
+
+    def register(self, ticker, scale=1):
+        """
+        Counts the ticker in units of 1 / scale, e.g. 100 for cents, or 1 to only allow whole amounts
+        :param ticker: Any
+        :param scale: int
+        :return: None
+        :raises: ConflictingMinorUnitsException
+        """
+        if not isinstance(scale, int) or scale < 1:
+            raise ConflictingMinorUnitsException
+        if self._scales.get(ticker, scale) != scale:
+            raise ConflictingMinorUnitsException
+        if ticker in self._pinned and ticker not in self._scales:
+            raise ConflictingMinorUnitsException
+        self._scales[ticker] = scale
+
+    def unregister(self, ticker):
+        """
+        Counts the ticker in floats again
+        :param ticker: Any
+        :return: None
+        :raises: ConflictingMinorUnitsException
+        """
+        if ticker in self._scales and ticker in self._pinned:
+            raise ConflictingMinorUnitsException
+        self._scales.pop(ticker, None)
+
+    def scale(self, ticker):
+        """
+        Returns the number of minor units per major unit of the ticker, None if it is counted in floats
+        :param ticker: Any
+        :return: int?
+        """
+        return self._scales.get(ticker)
+
+    def pin(self, ticker):
+        """
+        Fixes the scale of the ticker, as amounts of it are about to be stored, and returns it
+        :param ticker: Any
+        :return: int?
+        """
+        self._pinned.add(ticker)
+        return self._scales.get(ticker)
+
+    def to_minor(self, amount, ticker):
+        """
+        Converts an amount in major units to the units the ticker is stored in, an int of minor units for registered
+        tickers and the amount itself for others, pinning the ticker
+        :param amount: float
+        :param ticker: Any
+        :return: int | float
+        :raises: InexactAmountException
+        """
+        self._pinned.add(ticker)
+        scale = self._scales.get(ticker)
+        if scale is None:
+            return amount
+        if isinstance(amount, int):
+            return amount * scale
+        scaled = amount * scale
+        if not math.isfinite(scaled):
+            raise InexactAmountException
+        units = round(scaled)
+        # Tolerates the representation error of floats such as 0.1, but not amounts between two minor units
+        if abs(scaled - units) > _ABSOLUTE_TOLERANCE + _RELATIVE_TOLERANCE * abs(scaled):
+            raise InexactAmountException
+        return int(units)
+
+    def to_major(self, units, ticker):
+        """
+        Converts an amount in the units the ticker is stored in to major units, an int for tickers with a scale of 1
+        :param units: int | float
+        :param ticker: Any
+        :return: int | float
+        """
+        scale = self._scales.get(ticker)
+        if scale is None or scale == 1:
+            return units
+        return units / scale
+
+
+# The registry used by Currency and Wallet
+minor_units = MinorUnitRegistry()
+_scales = minor_units._scales
+_pinned = minor_units._pinned
+
+
 class Currency:
     """
     Class representing a generic currency
 
+    A value type: two currencies are equal, and hash equally, if they hold the same amount of the same ticker. The
+    fields are slots, which are not guarded against assignment, as a __setattr__ guard would make every currency
+    created slower to set up. They must nevertheless not be assigned, as the hash is cached on first use. Only burned
+    changes, once, through burn(). String tickers are interned, so that wallets look them up by identity.
+
     Attributes
 
     amount: float
-        Amount of the currency
+        Amount of the currency, in major units
+
+    minor_amount: int | float
+        Amount of the currency in the units it is stored in, an int of minor units if the ticker is registered with
+        minor_units and the amount itself otherwise
 
     ticker: any # Todo replace with "equatable" equivalent when I figure out what the proper name is
         A ticker used to identify which currency the object represents
@@ -18,6 +177,9 @@ class Currency:
         If the currency has been "burned" or "spent".
 
     Methods:
+        from_minor(minor_amount: int, ticker): Currency
+            Returns a currency of the given amount in minor units
+
         validate(self, ticker): Bool
             Returns true if and only if the given ticker is equal to this currencies ticker.
 
@@ -28,26 +190,54 @@ class Currency:
             Burns this currency.
     """
 
+    __slots__ = ("minor_amount", "ticker", "burned", "_hash")
+
     def __init__(self, amount: float, ticker):
-        _check_negative(amount)
-        self.__amount = amount
-        self.__ticker = ticker
-        self.__burned = False
+        # _check_negative and minor_units.to_minor, inlined as this is on the hot path
+        if not amount >= 0:
+            raise NegativeCurrencyException
+        if type(ticker) is str:
+            ticker = intern(ticker)
+        if ticker in _scales:
+            amount = minor_units.to_minor(amount, ticker)
+        else:
+            _pinned.add(ticker)
+        self.minor_amount = amount
+        self.ticker = ticker
+        self.burned = False
+
+    @classmethod
+    def from_minor(cls, minor_amount, ticker):
+        """
+        Returns a currency of the given amount in the units the ticker is stored in, without converting it
+        :param minor_amount: int | float
+        :param ticker: Any
+        :return: Currency
+        """
+        _check_negative(minor_amount)
+        if type(ticker) is str:
+            ticker = intern(ticker)
+        _pinned.add(ticker)
+        return _new_currency(cls, minor_amount, ticker)
 
     @property
     def amount(self):
-        return self.__amount
+        return minor_units.to_major(self.minor_amount, self.ticker)
 
-    @property
-    def ticker(self):
-        return self.__ticker
+    def __eq__(self, other):
+        if not isinstance(other, Currency):
+            return NotImplemented
+        return self.minor_amount == other.minor_amount and self.ticker == other.ticker
 
-    @property
-    def burned(self):
-        return self.__burned
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            value = self._hash = hash((self.minor_amount, self.ticker))
+            return value
 
-    def __eq__(self, other):
-        return self.amount == other.amount and self.ticker == other.ticker
+    def __reduce__(self):
+        return _restore_currency, (self.minor_amount, self.ticker, self.burned)
 
     def __str__(self):
         return f"{self.ticker}: {self.amount}"  # pragma: no cover
@@ -75,7 +265,35 @@ class Currency:
         Burns this currency
         :return: None
         """
-        self.__burned = True
+        self.burned = True
+
+
+def _new_currency(cls, minor_amount, ticker):
+    """
+    Returns an unburned currency of the given amount in stored units, without any checks
+    :param cls: type
+    :param minor_amount: int | float
+    :param ticker: Any
+    :return: Currency
+    """
+    currency = object.__new__(cls)
+    currency.minor_amount = minor_amount
+    currency.ticker = ticker
+    currency.burned = False
+    return currency
+
+
+def _restore_currency(minor_amount, ticker, burned):
+    """
+    Rebuilds a pickled currency
+    :param minor_amount: int | float
+    :param ticker: Any
+    :param burned: bool
+    :return: Currency
+    """
+    currency = _new_currency(Currency, minor_amount, ticker)
+    currency.burned = burned
+    return currency
 
 
 class ICurrencyDeposit:
@@ -96,6 +314,75 @@ class ICurrencyDeposit:
         raise NotImplementedError  # pragma: no cover
 
 
+class Price:
+    """
+    A price, i.e. an amount per ticker, resolved once so that it can be checked against wallets many times. The
+    amounts are validated and converted to the units their tickers are stored in when the price is created, so
+    Wallet.can_afford and Wallet.subtract compare and subtract them directly, and a WalletBank compiles the price to
+    its columns once and caches it. Prices are immutable and hashable, so they can be kept and shared.
+
+    Anywhere a dict price is accepted a Price can be given instead, as it has the items() of a dict.
+
+    Attributes
+
+        units: ((Any, int | float))
+            Ticker and amount, in the units the ticker is stored in, of every part of the price
+
+    Methods
+
+        items() -> Iterator[(Any, float)]
+            Returns the ticker and amount, in major units, of every part of the price
+
+        can_afford(wallets: [IWallet]) -> [bool]
+            Returns whether each of the wallets can afford the price
+    """
+
+    __slots__ = ("units", "_hash")
+
+    def __init__(self, amounts: dict):
+        """
+        :param amounts: dict Amount, in major units, by ticker
+        :raises: NegativeCurrencyException
+        :raises: InexactAmountException
+        """
+        units = []
+        for ticker, amount in amounts.items():
+            _check_negative(amount)
+            if type(ticker) is str:
+                ticker = intern(ticker)
+            units.append((ticker, minor_units.to_minor(amount, ticker)))
+        self.units = tuple(units)
+        self._hash = hash(self.units)
+
+    def items(self):
+        """
+        Returns the ticker and amount, in major units, of every part of the price
+        :return: Iterator[(Any, float)]
+        """
+        return ((ticker, minor_units.to_major(units, ticker)) for ticker, units in self.units)
+
+    def __eq__(self, other):
+        if not isinstance(other, Price):
+            return NotImplemented
+        return self.units == other.units
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Price({dict(self.items())})"  # pragma: no cover
+
+    def can_afford(self, wallets):
+        """
+        Returns whether each of the wallets can afford the price. For the wallets of a WalletBank,
+        WalletBank.can_afford checks many agents in a single vector comparison.
+        :param wallets: [IWallet]
+        :return: [bool]
+        :raises: UnsupportedCurrencyException
+        """
+        return [wallet.can_afford(self) for wallet in wallets]
+
+
 class IWallet(ICurrencyDeposit):
     """
     Interface for a generic wallet.
@@ -116,10 +403,11 @@ class IWallet(ICurrencyDeposit):
         withdraw_all_currencies(self): [Currency]
             Withdraws all currencies contained in this wallet.
 
-        can_afford(self, price: dict): Bool todo: Using dicts as prices is dumb.
-            Returns true if and only if the wallets contains geq the amounts given in the dictionary pairs.
+        can_afford(self, price: dict | Price): Bool
+            Returns true if and only if the wallets contains geq the amounts given in the dictionary pairs. A Price
+            resolves the dictionary once for many checks.
 
-        subtract(self, price: dict) todo: Burning currency like this is dumb.
+        subtract(self, price: dict | Price) todo: Burning currency like this is dumb.
             Subtracts/"burns" the currency corresponding to the dict
 
     """
@@ -199,11 +487,11 @@ class BurnedCurrencyException(Exception):
 
 def _check_negative(amount):
     """
-    Checks if the amount is negative. If so, throws a NegativeCurrencyException
-    :param amount:
-    :return:
+    Checks if the amount is negative, or not a number. If so, throws a NegativeCurrencyException
+    :param amount: int | float
+    :return: None
     """
-    if amount < 0:
+    if not amount >= 0:
         raise NegativeCurrencyException
 
 
@@ -231,32 +519,73 @@ class Wallet(IWallet):
             ensure that no UnsupportedCurrencyExceptions' are ever thrown.
 
         __wallet: dict
-            A dictionary used to manage the currencies
+            A dictionary used to manage the currencies. Balances of tickers registered with minor_units are ints of
+            minor units.
+
+        __shared: bool
+            Whether __wallet is shared with forks of this wallet, in which case it is copied before it is changed
 
+    Methods
+
+        fork(memo: dict?) -> Wallet
+            Returns a copy of this wallet which shares the balances until either of them changes them
+
+        minor_balance(ticker) -> int | float
+            Returns the balance of the ticker in the units it is stored in, see minor_units
+
+        _add_units(ticker, units: int | float) -> None
+            Adds units of the ticker, which may be negative, to the balance without any checks. Used by Transaction,
+            which checks the balances first.
     """
 
     def can_afford(self, price):
         """
         Inherited from IWallet.
-        :param price: dict
+        :param price: dict | Price
         :return: Bool
         :raises: UnsupportedCurrencyException
         """
+        wallet = self.__wallet
+        if type(price) is Price:
+            for key, units in price.units:
+                balance = wallet.get(key)
+                if balance is None:
+                    if self.__whitelist:
+                        raise UnsupportedCurrencyException
+                    balance = 0
+                if balance < units:
+                    return False
+            return True
         for key, value in price.items():
-            # Calling check balance here handles exceptions properly
-            if self.check_balance(key) < value:
-                return False
+            if key in _scales:
+                value = minor_units.to_minor(value, key)
+            try:
+                if wallet[key] < value:
+                    return False
+            except KeyError:
+                if self.__whitelist:
+                    raise UnsupportedCurrencyException
+                if 0 < value:
+                    return False
         return True
 
     def subtract(self, price):
         """
         Inherited from IWallet.
-        :param price: dict
+        :param price: dict | Price
         :return: Bool
         :raises: UnsupportedCurrencyException
         :raises: InsufficientBalanceException
         """
-        if self.can_afford(price):
+        if type(price) is Price:
+            if not self.can_afford(price):
+                raise InsufficientBalanceException
+            self.__own()
+            wallet = self.__wallet
+            for key, units in price.units:
+                if units:
+                    wallet[key] -= units
+        elif self.can_afford(price):
             for key, value in price.items():
                 self.withdraw(value, key)
         else:
@@ -268,20 +597,55 @@ class Wallet(IWallet):
         :return: [Currency]
         """
         ret = []
+        self.__own()
         for key in self.__wallet:
             # For some reason I can't iterate as key, value here?
             if self.__wallet[key] > 0:
-                ret.append(Currency(self.__wallet[key], key))
+                ret.append(Currency.from_minor(self.__wallet[key], key))
                 self.__wallet[key] = 0
         return ret
 
     def __init__(self, supported_currencies=None):
         self.__whitelist = supported_currencies is not None
         self.__wallet = {}
+        self.__shared = False
         if supported_currencies:
             for currency in supported_currencies:
                 self.__wallet[currency] = 0
 
+    def __getstate__(self):
+        return self.__whitelist, self.__wallet
+
+    def __setstate__(self, state):
+        self.__whitelist, self.__wallet = state
+        self.__shared = False
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this wallet. The two share their balances until either of them changes them, at which
+        point that wallet copies the balances (copy on write).
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: Wallet
+        """
+        if memo is not None and id(self) in memo:
+            return memo[id(self)]
+        fork = Wallet.__new__(Wallet)
+        fork.__whitelist = self.__whitelist
+        fork.__wallet = self.__wallet
+        fork.__shared = self.__shared = True
+        if memo is not None:
+            memo[id(self)] = fork
+        return fork
+
+    def __own(self):
+        """
+        Copies the balances if they are shared with forks of this wallet
+        :return: None
+        """
+        if self.__shared:
+            self.__wallet = dict(self.__wallet)
+            self.__shared = False
+
     def deposit_currency(self, currency: Currency):
         """
         Inherited from IWallet(ICurrencyDeposit)
@@ -289,17 +653,20 @@ class Wallet(IWallet):
         :return: None
         :raises: UnsupportedCurrencyException
         """
-        _check_negative(currency.amount)
-        _check_burned(currency)
+        # Currencies are immutable and checked not to be negative when created
+        if currency.burned:
+            raise BurnedCurrencyException
+        if self.__shared:
+            self.__own()
         try:
-            self.__wallet[currency.ticker] += currency.amount
+            self.__wallet[currency.ticker] += currency.minor_amount
         except KeyError:
             if self.__whitelist:
                 raise UnsupportedCurrencyException
             else:
                 self.__wallet[currency.ticker] = 0
                 self.deposit_currency(currency)  # Recursion dumb? DRY but not KISS
-        currency.burn()
+        currency.burned = True
 
     def check_balance(self, ticker):
         """
@@ -308,6 +675,16 @@ class Wallet(IWallet):
         :return: float
         :raises: UnsupportedCurrencyException
         """
+        return minor_units.to_major(self.minor_balance(ticker), ticker)
+
+    def minor_balance(self, ticker):
+        """
+        Returns the balance of the ticker in the units it is stored in, an int of minor units if the ticker is
+        registered with minor_units and the balance itself otherwise
+        :param ticker: Any
+        :return: int | float
+        :raises: UnsupportedCurrencyException
+        """
         try:
             return self.__wallet[ticker]
         except KeyError:
@@ -316,6 +693,17 @@ class Wallet(IWallet):
             else:
                 return 0
 
+    def _add_units(self, ticker, units):
+        """
+        Adds the units of the ticker, which may be negative, to the balance, without checking whether the ticker is
+        supported or the balance suffices
+        :param ticker: Any
+        :param units: int | float
+        :return: None
+        """
+        self.__own()
+        self.__wallet[ticker] = self.__wallet.get(ticker, 0) + units
+
     def withdraw(self, amount, ticker):
         """
         Inherited from IWallet
@@ -324,12 +712,16 @@ class Wallet(IWallet):
         :return: Currency
         :raises: UnsupportedCurrencyException
         :raises: InsufficientBalanceException
+        :raises: InexactAmountException
         """
         _check_negative(amount)
+        units = minor_units.to_minor(amount, ticker) if ticker in _scales else amount
         try:
-            if self.__wallet[ticker] >= amount:
-                self.__wallet[ticker] -= amount
-                return Currency(amount, ticker)
+            if self.__wallet[ticker] >= units:
+                if self.__shared:
+                    self.__own()
+                self.__wallet[ticker] -= units
+                return _new_currency(Currency, units, ticker)
         except KeyError:
             if self.__whitelist:
                 raise UnsupportedCurrencyException
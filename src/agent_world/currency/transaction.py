@@ -0,0 +1,102 @@
+from src.agent_world.currency.currency import IWallet, InsufficientBalanceException, minor_units, _check_negative
+
+
+class Transaction:
+    """
+    Moves currency between wallets all or nothing. Legs, each moving an amount of a ticker from one wallet to
+    another, are collected with transfer and applied together by commit: the legs are netted per wallet and ticker,
+    every wallet losing currency is checked to have enough, and only then are the balances changed. No Currency
+    objects are created along the way, and the currency never leaves the wallets, so nothing is burned.
+
+    As the legs are netted, a wallet may pass on currency it receives in the same transaction. Legs are netted per
+    equal wallet, so that two WalletViews of the same agent of a bank count as one wallet. Amounts are converted
+    to the units the ticker is stored in when the leg is added, so tickers registered with minor_units are moved
+    exactly.
+
+    The wallets have to be Wallets or WalletViews, or anything else with their minor_balance and _add_units, both
+    in the units the ticker is stored in, so that a balance which passes the check is exactly what is updated.
+
+    Attributes
+
+        legs: [(IWallet, IWallet, Any, int | float)]
+            Source, target, ticker and amount, in stored units, of every leg not yet committed
+
+    Methods
+
+        transfer(source: IWallet, target: IWallet, ticker: Any, amount: float) -> Transaction
+            Adds a leg, returning the transaction so that calls can be chained
+
+        commit() -> None
+            Applies all legs, or none of them
+    """
+
+    def __init__(self, legs=None):
+        """
+        :param legs: [(IWallet, IWallet, Any, float)]? Source, target, ticker and amount in major units of each leg
+        :raises: NegativeCurrencyException
+        :raises: InexactAmountException
+        """
+        self.legs = []
+        for source, target, ticker, amount in legs or []:
+            self.transfer(source, target, ticker, amount)
+
+    def __len__(self):
+        return len(self.legs)
+
+    def transfer(self, source: IWallet, target: IWallet, ticker, amount):
+        """
+        Adds a leg moving amount of the ticker from source to target
+        :param source: IWallet
+        :param target: IWallet
+        :param ticker: Any
+        :param amount: float
+        :return: Transaction
+        :raises: NegativeCurrencyException
+        :raises: InexactAmountException
+        """
+        _check_negative(amount)
+        self.legs.append((source, target, ticker, minor_units.to_minor(amount, ticker)))
+        return self
+
+    def commit(self):
+        """
+        Applies all legs, and clears them so that the transaction can be reused. If any wallet can not afford its
+        net outflow, or does not support a ticker, nothing is changed and the legs are kept.
+        :return: None
+        :raises: InsufficientBalanceException
+        :raises: UnsupportedCurrencyException
+        """
+        net = {}
+        for source, target, ticker, units in self.legs:
+            for wallet, delta in ((source, -units), (target, units)):
+                key = (wallet, ticker)
+                entry = net.get(key)
+                if entry is None:
+                    net[key] = [wallet, ticker, delta]
+                else:
+                    entry[2] += delta
+        entries = list(net.values())
+        # Checking every wallet, also those receiving, raises UnsupportedCurrencyExceptions before anything changes
+        for wallet, ticker, delta in entries:
+            if wallet.minor_balance(ticker) + delta < 0:
+                raise InsufficientBalanceException
+        for wallet, ticker, delta in entries:
+            if delta:
+                wallet._add_units(ticker, delta)
+        self.legs.clear()
+
+
+def transfer(source: IWallet, target: IWallet, ticker, amount):
+    """
+    Moves amount of the ticker from source to target, as a transaction of a single leg
+    :param source: IWallet
+    :param target: IWallet
+    :param ticker: Any
+    :param amount: float
+    :return: None
+    :raises: InsufficientBalanceException
+    :raises: UnsupportedCurrencyException
+    :raises: NegativeCurrencyException
+    :raises: InexactAmountException
+    """
+    Transaction().transfer(source, target, ticker, amount).commit()
@@ -0,0 +1,842 @@
+import numpy as np
+
+from src.agent_world.currency.currency import IWallet, Currency, InsufficientBalanceException, \
+    UnsupportedCurrencyException, NegativeCurrencyException, InexactAmountException, ConflictingMinorUnitsException, \
+    _check_negative, _check_burned, minor_units, Price, _ABSOLUTE_TOLERANCE, _RELATIVE_TOLERANCE
+
+
+class UnknownAgentException(Exception):
+    pass
+
+
+class WalletBank:
+    """
+    The wallets of many agents in a single numpy matrix, with a row per agent and a column per ticker, so that
+    deposits, withdrawals and purchases of many agents at once are array operations rather than a dictionary lookup
+    per agent and ticker. Agents are identified by their row, 0 to size() - 1, and tickers are mapped to columns
+    once, when first seen.
+
+    Batched operations take an array of agent ids, which may repeat, and either an amount per agent or a single
+    amount for all. They are all or nothing: if any agent can not afford its part, nothing is changed.
+
+    As with Wallet, a bank with supported currencies only accepts those, and raises an UnsupportedCurrencyException
+    for any other ticker, while a bank without adds a column for every new ticker deposited.
+
+    As in Wallet, tickers registered with minor_units are stored as integers of minor units, in a matrix of int64
+    of their own, so that their balances are exact. Amounts are given and returned in major units either way. A
+    ticker's column is numbered in the order tickers are first seen, and its place in either matrix, along with
+    its scale, is fixed when the column is added.
+
+    Attributes
+
+        _balances: np.ndarray
+            Balances of the tickers counted in floats, agents x tickers, with spare rows and columns to grow into
+
+        _units: np.ndarray
+            Balances of the tickers registered with minor_units, in minor units, as per _balances
+
+        _size: int
+            Number of agents
+
+        _columns: dict
+            Column of each ticker
+
+        _column_scales: np.ndarray
+            Number of minor units per major unit of the ticker of every column, 0 for tickers counted in floats
+
+        _places: np.ndarray
+            Column in _balances or _units of the ticker of every column
+
+        _whitelist: bool
+            Whether only the supported currencies are accepted
+
+        _shared: bool
+            Whether the matrices are shared with forks of this bank, in which case they are copied before they are
+            changed
+
+        _compiled: dict
+            The price as per _price of every Price used with the bank, along with the number of columns at the time,
+            as prices with tickers the bank had no column for are compiled again once columns are added
+
+    Methods
+
+        size() -> int
+            Returns the number of agents
+
+        tickers() -> [Any]
+            Returns the tickers, in the order of their columns
+
+        add_agents(count: int) -> np.ndarray
+            Adds agents with empty wallets, returning their ids
+
+        balances(ticker: Any) -> np.ndarray
+            Returns the balance of every agent in the ticker
+
+        balance(agents: np.ndarray, ticker: Any) -> np.ndarray
+            Returns the balances of the agents in the ticker
+
+        deposit(agents: np.ndarray, amounts: np.ndarray | float, ticker: Any) -> None
+            Adds the amounts to the balances of the agents
+
+        withdraw(agents: np.ndarray, amounts: np.ndarray | float, ticker: Any) -> None
+            Takes the amounts from the balances of the agents
+
+        price_vector(price: dict) -> np.ndarray
+            Returns the price as an amount per column
+
+        can_afford(agents: np.ndarray, price: dict | np.ndarray) -> np.ndarray
+            Returns a mask of the agents which can afford the price
+
+        subtract(agents: np.ndarray, price: dict | np.ndarray) -> None
+            Subtracts the price from the wallet of every agent
+
+        transact(sources: np.ndarray, targets: np.ndarray, tickers: Any | [Any], amounts: np.ndarray | float) -> None
+            Moves the amounts from the sources to the targets, all or nothing
+
+        trade(buyers: np.ndarray, sellers: np.ndarray, good: Any, quantities: np.ndarray | float, money: Any,
+              payments: np.ndarray | float) -> None
+            Settles trades of a good against money, all or nothing
+
+        wallet(agent: int) -> WalletView
+            Returns an IWallet of a single agent
+
+        fork(memo: dict?) -> WalletBank
+            Returns a copy of this bank which shares the balances until either of them changes them
+    """
+
+    def __init__(self, agents=0, supported_currencies=None):
+        """
+        :param agents: int Number of agents to start with
+        :param supported_currencies: [Any]? Tickers accepted, None to accept any
+        """
+        self._whitelist = False
+        self._columns = {}
+        self._column_scales = np.zeros(0, dtype=np.int64)
+        self._places = np.zeros(0, dtype=np.intp)
+        self._balances = np.zeros((max(agents, 1), 1))
+        self._units = np.zeros((max(agents, 1), 1), dtype=np.int64)
+        self._size = agents
+        self._shared = False
+        self._compiled = {}
+        for ticker in supported_currencies or []:
+            self._column(ticker, add=True)
+        self._whitelist = supported_currencies is not None
+
+    def size(self):
+        """
+        Returns the number of agents
+        :return: int
+        """
+        return self._size
+
+    def __len__(self):
+        return self._size
+
+    def tickers(self):
+        """
+        Returns the tickers, in the order of their columns
+        :return: [Any]
+        """
+        return list(self._columns)
+
+    def add_agents(self, count):
+        """
+        Adds agents with empty wallets, returning their ids
+        :param count: int
+        :return: np.ndarray
+        """
+        start = self._size
+        if start + count > self._balances.shape[0]:
+            self._resize(max(start + count, 2 * self._balances.shape[0]))
+        else:
+            self._own()
+            self._balances[start:start + count] = 0
+            self._units[start:start + count] = 0
+        self._size = start + count
+        return np.arange(start, start + count)
+
+    def balances(self, ticker):
+        """
+        Returns the balance of every agent in the ticker, as a read only array
+        :param ticker: Any
+        :return: np.ndarray
+        :raises: UnsupportedCurrencyException
+        """
+        column = self._column(ticker)
+        if column is None:
+            return np.zeros(self._size)
+        matrix, place, scale = self._cell(column)
+        balances = matrix[:self._size, place]
+        if scale:
+            balances = _to_major(balances, scale)
+        balances.flags.writeable = False
+        return balances
+
+    def balance(self, agents, ticker):
+        """
+        Returns the balances of the agents in the ticker
+        :param agents: np.ndarray
+        :param ticker: Any
+        :return: np.ndarray
+        :raises: UnsupportedCurrencyException
+        :raises: UnknownAgentException
+        """
+        agents = self._agents(agents)
+        column = self._column(ticker)
+        if column is None:
+            return np.zeros(len(agents))
+        matrix, place, scale = self._cell(column)
+        return _to_major(matrix[agents, place], scale) if scale else matrix[agents, place]
+
+    def deposit(self, agents, amounts, ticker):
+        """
+        Adds the amounts to the balances of the agents in the ticker
+        :param agents: np.ndarray
+        :param amounts: np.ndarray | float
+        :param ticker: Any
+        :return: None
+        :raises: UnsupportedCurrencyException
+        :raises: NegativeCurrencyException
+        :raises: InexactAmountException
+        :raises: UnknownAgentException
+        """
+        agents = self._agents(agents)
+        amounts = self._amounts(amounts, agents)
+        column = self._column(ticker, add=True)
+        agents, totals = _totals(agents, self._stored(amounts, column))
+        self._own()
+        matrix, place, _ = self._cell(column)
+        matrix[agents, place] += totals
+
+    def withdraw(self, agents, amounts, ticker):
+        """
+        Takes the amounts from the balances of the agents in the ticker. Nothing is taken if any agent has less than
+        its total.
+        :param agents: np.ndarray
+        :param amounts: np.ndarray | float
+        :param ticker: Any
+        :return: None
+        :raises: UnsupportedCurrencyException
+        :raises: NegativeCurrencyException
+        :raises: InsufficientBalanceException
+        :raises: InexactAmountException
+        :raises: UnknownAgentException
+        """
+        agents = self._agents(agents)
+        amounts = self._amounts(amounts, agents)
+        column = self._column(ticker)
+        if column is None:
+            if np.any(amounts > 0):
+                raise InsufficientBalanceException
+            return
+        agents, totals = _totals(agents, self._stored(amounts, column))
+        if np.any(self._cell(column)[0][agents, self._places[column]] < totals):
+            raise InsufficientBalanceException
+        self._own()
+        matrix, place, _ = self._cell(column)
+        matrix[agents, place] -= totals
+
+    def price_vector(self, price):
+        """
+        Returns the price as an amount per column, in the order of tickers(). Tickers the bank has no column for are
+        left out, as no agent holds any of them.
+        :param price: dict | Price
+        :return: np.ndarray
+        :raises: UnsupportedCurrencyException
+        """
+        vector = np.zeros(len(self._columns))
+        for ticker, amount in price.items():
+            column = self._column(ticker)
+            if column is not None:
+                vector[column] = amount
+        return vector
+
+    def can_afford(self, agents, price):
+        """
+        Returns a mask of the agents which can afford the price, each on its own
+        :param agents: np.ndarray
+        :param price: dict | Price | np.ndarray Amounts by ticker, or a price vector as per price_vector
+        :return: np.ndarray
+        :raises: UnsupportedCurrencyException
+        :raises: UnknownAgentException
+        """
+        agents = self._agents(agents)
+        price = self._price(price)
+        if price is None:
+            return np.zeros(len(agents), dtype=bool)
+        columns, amounts, unit_columns, units = price
+        rows = agents[:, None]
+        return np.all(self._balances[rows, columns] >= amounts, axis=1) & \
+            np.all(self._units[rows, unit_columns] >= units, axis=1)
+
+    def subtract(self, agents, price):
+        """
+        Subtracts the price from the wallet of every agent, once per occurrence of the agent. Nothing is subtracted
+        if any agent can not afford its total.
+        :param agents: np.ndarray
+        :param price: dict | Price | np.ndarray Amounts by ticker, or a price vector as per price_vector
+        :return: None
+        :raises: UnsupportedCurrencyException
+        :raises: InsufficientBalanceException
+        :raises: UnknownAgentException
+        """
+        agents = self._agents(agents)
+        price = self._price(price)
+        if len(agents) == 0:
+            return
+        if price is None:
+            raise InsufficientBalanceException
+        columns, amounts, unit_columns, units = price
+        agents, counts = np.unique(agents, return_counts=True)
+        totals = counts[:, None] * amounts
+        unit_totals = counts[:, None] * units
+        rows = agents[:, None]
+        if np.any(self._balances[rows, columns] < totals) or np.any(self._units[rows, unit_columns] < unit_totals):
+            raise InsufficientBalanceException
+        self._own()
+        self._balances[rows, columns] -= totals
+        self._units[rows, unit_columns] -= unit_totals
+
+    def transact(self, sources, targets, tickers, amounts):
+        """
+        Moves amounts[i] of tickers[i] from sources[i] to targets[i] for every leg i, in one pass. The legs are
+        netted per agent and ticker before the balances are checked, so an agent may pass on what it receives in
+        the same call. If any agent would end up with a negative balance nothing is moved.
+        :param sources: np.ndarray
+        :param targets: np.ndarray
+        :param tickers: Any | [Any] A ticker for all legs, or one per leg
+        :param amounts: np.ndarray | float
+        :return: None
+        :raises: UnsupportedCurrencyException
+        :raises: NegativeCurrencyException
+        :raises: InsufficientBalanceException
+        :raises: UnknownAgentException
+        """
+        sources = self._agents(sources)
+        targets = self._agents(targets)
+        amounts = self._amounts(amounts, sources)
+        if isinstance(tickers, (list, tuple, np.ndarray)):
+            columns = np.fromiter((self._column(ticker, add=True) for ticker in tickers), dtype=np.intp,
+                                  count=len(tickers))
+        else:
+            columns = np.full(len(sources), self._column(tickers, add=True), dtype=np.intp)
+        self._transact_columns(sources, targets, columns, amounts)
+
+    def trade(self, buyers, sellers, good, quantities, money, payments):
+        """
+        Settles trades, e.g. those cleared by a market, in which buyers[i] pays payments[i] of money to sellers[i]
+        for quantities[i] of good. All trades are settled together as per transact, or none if any agent can not
+        pay or deliver.
+        :param buyers: np.ndarray
+        :param sellers: np.ndarray
+        :param good: Any
+        :param quantities: np.ndarray | float
+        :param money: Any
+        :param payments: np.ndarray | float
+        :return: None
+        :raises: UnsupportedCurrencyException
+        :raises: NegativeCurrencyException
+        :raises: InsufficientBalanceException
+        :raises: UnknownAgentException
+        """
+        buyers = self._agents(buyers)
+        sellers = self._agents(sellers)
+        count = len(buyers)
+        columns = np.concatenate([np.full(count, self._column(money, add=True), dtype=np.intp),
+                                  np.full(count, self._column(good, add=True), dtype=np.intp)])
+        amounts = np.concatenate([self._amounts(payments, buyers), self._amounts(quantities, buyers)])
+        self._transact_columns(np.concatenate([buyers, sellers]), np.concatenate([sellers, buyers]), columns, amounts)
+
+    def wallet(self, agent):
+        """
+        Returns an IWallet of a single agent, backed by this bank
+        :param agent: int
+        :return: WalletView
+        :raises: UnknownAgentException
+        """
+        if not 0 <= agent < self._size:
+            raise UnknownAgentException
+        return WalletView(self, agent)
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this bank. The two share their balances until either of them changes them, at which point
+        that bank copies the balances (copy on write).
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: WalletBank
+        """
+        if memo is not None and id(self) in memo:
+            return memo[id(self)]
+        fork = WalletBank.__new__(WalletBank)
+        fork.__dict__.update(self.__dict__)
+        fork._columns = dict(self._columns)
+        fork._compiled = {}
+        fork._shared = self._shared = True
+        if memo is not None:
+            memo[id(self)] = fork
+        return fork
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        unit_columns = int(np.count_nonzero(self._column_scales))
+        state["_balances"] = self._balances[:self._size, :len(self._columns) - unit_columns].copy()
+        state["_units"] = self._units[:self._size, :unit_columns].copy()
+        state["_shared"] = False
+        state["_compiled"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for ticker, column in self._columns.items():
+            if minor_units.pin(ticker) != (self._column_scales[column] or None):
+                raise ConflictingMinorUnitsException
+        self._resize(max(self._balances.shape[0], 1), max(self._balances.shape[1], 1), max(self._units.shape[1], 1))
+
+    def _own(self):
+        """
+        Copies the balances if they are shared with forks of this bank
+        :return: None
+        """
+        if self._shared:
+            self._balances = self._balances.copy()
+            self._units = self._units.copy()
+            self._shared = False
+
+    def _resize(self, rows, columns=None, unit_columns=None):
+        """
+        Moves the balances to matrices of the given capacity, keeping the number of columns of either if not given
+        :param rows: int
+        :param columns: int? Columns of _balances
+        :param unit_columns: int? Columns of _units
+        :return: None
+        """
+        self._balances = _moved(self._balances, self._size, rows, columns)
+        self._units = _moved(self._units, self._size, rows, unit_columns)
+        self._shared = False
+
+    def _cell(self, column):
+        """
+        Returns the matrix holding the ticker of the column, its column in the matrix, and its scale, 0 for tickers
+        counted in floats. The matrix is replaced when it is copied or grown, so it is not to be kept.
+        :param column: int
+        :return: (np.ndarray, int, int)
+        """
+        scale = int(self._column_scales[column])
+        return self._units if scale else self._balances, int(self._places[column]), scale
+
+    def _stored(self, amounts, column):
+        """
+        Returns the amounts, in major units, of the ticker of the column in the units it is stored in
+        :param amounts: np.ndarray
+        :param column: int
+        :return: np.ndarray
+        :raises: InexactAmountException
+        """
+        scale = self._column_scales[column]
+        return _to_units(amounts, scale) if scale else amounts
+
+    def _column(self, ticker, add=False):
+        """
+        Returns the column of the ticker. Unknown tickers raise an UnsupportedCurrencyException if the bank has
+        supported currencies, and otherwise get a column if add is true, or None if not.
+        :param ticker: Any
+        :param add: bool
+        :return: int?
+        :raises: UnsupportedCurrencyException
+        """
+        column = self._columns.get(ticker)
+        if column is None:
+            if self._whitelist:
+                raise UnsupportedCurrencyException
+            if add:
+                column = len(self._columns)
+                scale = minor_units.pin(ticker) or 0
+                place = int(np.count_nonzero((self._column_scales > 0) == (scale > 0)))
+                matrix = self._units if scale else self._balances
+                if place >= matrix.shape[1]:
+                    if scale:
+                        self._resize(self._balances.shape[0], unit_columns=2 * matrix.shape[1])
+                    else:
+                        self._resize(self._balances.shape[0], columns=2 * matrix.shape[1])
+                self._column_scales = np.append(self._column_scales, scale)
+                self._places = np.append(self._places, place)
+                self._columns[ticker] = column
+        return column
+
+    def _transact_columns(self, sources, targets, columns, amounts):
+        """
+        Moves the amounts from the sources to the targets as per transact, with the tickers given as columns
+        :param sources: np.ndarray
+        :param targets: np.ndarray
+        :param columns: np.ndarray
+        :param amounts: np.ndarray
+        :return: None
+        :raises: InsufficientBalanceException
+        :raises: InexactAmountException
+        """
+        scales = self._column_scales[columns]
+        in_units = scales > 0
+        changes = []
+        # The legs of either matrix are netted and checked before either is changed
+        for legs, matrix_units in ((~in_units, False), (in_units, True)):
+            if not legs.any():
+                continue
+            width = (self._units if matrix_units else self._balances).shape[1]
+            places = self._places[columns[legs]]
+            moved = _to_units(amounts[legs], scales[legs]) if matrix_units else amounts[legs]
+            cells, deltas = _totals(np.concatenate([sources[legs] * width + places, targets[legs] * width + places]),
+                                    np.concatenate([-moved, moved]))
+            rows, places = np.divmod(cells, width)
+            if np.any((self._units if matrix_units else self._balances)[rows, places] + deltas < 0):
+                raise InsufficientBalanceException
+            changes.append((matrix_units, rows, places, deltas))
+        self._own()
+        for matrix_units, rows, places, deltas in changes:
+            (self._units if matrix_units else self._balances)[rows, places] += deltas
+
+    def _agents(self, agents):
+        """
+        Returns the agent ids as an array, checking that they exist
+        :param agents: np.ndarray | [int] | int
+        :return: np.ndarray
+        :raises: UnknownAgentException
+        """
+        agents = np.atleast_1d(np.asarray(agents, dtype=np.intp))
+        if len(agents) and (agents.min() < 0 or agents.max() >= self._size):
+            raise UnknownAgentException
+        return agents
+
+    @staticmethod
+    def _amounts(amounts, agents):
+        """
+        Returns an amount per agent, checking that none is negative
+        :param amounts: np.ndarray | float
+        :param agents: np.ndarray
+        :return: np.ndarray
+        :raises: NegativeCurrencyException
+        """
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=np.float64), agents.shape)
+        # As in _check_negative, so that NaN is rejected too
+        if not np.all(amounts >= 0):
+            raise NegativeCurrencyException
+        return amounts
+
+    def _price(self, price):
+        """
+        Returns the columns in _balances and amounts of the non zero parts of the price counted in floats, and the
+        columns in _units and amounts in minor units of those registered with minor_units, or None if the price has
+        a ticker the bank has no column for, which no agent can afford
+        :param price: dict | Price | np.ndarray
+        :return: (np.ndarray, np.ndarray, np.ndarray, np.ndarray)?
+        :raises: UnsupportedCurrencyException
+        :raises: NegativeCurrencyException
+        :raises: InexactAmountException
+        """
+        if type(price) is Price:
+            return self._compile(price)[1]
+        if isinstance(price, dict):
+            columns = []
+            amounts = []
+            for ticker, amount in price.items():
+                column = self._column(ticker)
+                if amount == 0:
+                    continue
+                if column is None:
+                    return None
+                columns.append(column)
+                amounts.append(amount)
+            columns = np.array(columns, dtype=np.intp)
+            amounts = np.array(amounts, dtype=np.float64)
+        else:
+            price = np.asarray(price, dtype=np.float64)
+            columns = np.flatnonzero(price)
+            amounts = price[columns]
+        # As in _check_negative, so that NaN is rejected too
+        if not np.all(amounts >= 0):
+            raise NegativeCurrencyException
+        scales = self._column_scales[columns]
+        in_units = scales > 0
+        return self._places[columns[~in_units]], amounts[~in_units], \
+            self._places[columns[in_units]], _to_units(amounts[in_units], scales[in_units])
+
+    def _compile(self, price):
+        """
+        Returns the number of columns the price was compiled at, the price as per _price, and a triple of whether
+        the ticker is in _units, its column there and the amount for every part of the price, compiling the price if
+        it has not been yet or columns have been added since
+        :param price: Price
+        :return: (int, (np.ndarray, np.ndarray, np.ndarray, np.ndarray)?, [(bool, int, int | float)]?)
+        :raises: UnsupportedCurrencyException
+        """
+        compiled = self._compiled.get(price)
+        if compiled is None or compiled[0] != len(self._columns):
+            split = self._price(dict(price.items()))
+            triples = None
+            if split is not None:
+                columns, amounts, unit_columns, units = split
+                triples = [(False, column, amount) for column, amount in zip(columns.tolist(), amounts.tolist())] + \
+                          [(True, column, amount) for column, amount in zip(unit_columns.tolist(), units.tolist())]
+            if len(self._compiled) >= _MAX_COMPILED:
+                self._compiled.clear()
+            compiled = self._compiled[price] = (len(self._columns), split, triples)
+        return compiled
+
+
+# Number of compiled prices a bank keeps before starting over
+_MAX_COMPILED = 4096
+
+# Amounts of minor units have to be below this to fit in an int64
+_UNITS_LIMIT = 2.0 ** 63
+
+
+def _totals(agents, amounts):
+    """
+    Sums the amounts of agents which occur more than once, keeping integer amounts exact
+    :param agents: np.ndarray
+    :param amounts: np.ndarray
+    :return: (np.ndarray, np.ndarray) The distinct agents and their totals
+    """
+    agents, inverse = np.unique(agents, return_inverse=True)
+    if amounts.dtype.kind == "f":
+        return agents, np.bincount(inverse, weights=amounts, minlength=len(agents))
+    totals = np.zeros(len(agents), dtype=amounts.dtype)
+    np.add.at(totals, inverse, amounts)
+    return agents, totals
+
+
+def _to_units(amounts, scales):
+    """
+    Converts amounts in major units to int64 minor units, as per MinorUnitRegistry.to_minor
+    :param amounts: np.ndarray
+    :param scales: np.ndarray | int
+    :return: np.ndarray
+    :raises: InexactAmountException
+    """
+    scaled = amounts * scales
+    # Infinite amounts, and amounts of more minor units than an int64 holds, can not be stored exactly
+    if not np.all(np.abs(scaled) < _UNITS_LIMIT):
+        raise InexactAmountException
+    units = np.rint(scaled)
+    if np.any(np.abs(scaled - units) > _ABSOLUTE_TOLERANCE + _RELATIVE_TOLERANCE * np.abs(scaled)):
+        raise InexactAmountException
+    return units.astype(np.int64)
+
+
+def _to_major(units, scale):
+    """
+    Converts minor units to major units, as per MinorUnitRegistry.to_major
+    :param units: np.ndarray | int
+    :param scale: int
+    :return: np.ndarray | int | float
+    """
+    return units if scale == 1 else units / scale
+
+
+def _moved(matrix, size, rows, columns=None):
+    """
+    Returns a matrix of zeros of the given capacity, and the type of the given matrix, with its first size rows
+    copied in
+    :param matrix: np.ndarray
+    :param size: int
+    :param rows: int
+    :param columns: int? Defaults to the columns of the given matrix
+    :return: np.ndarray
+    """
+    columns = matrix.shape[1] if columns is None else columns
+    moved = np.zeros((rows, columns), dtype=matrix.dtype)
+    old = matrix[:min(size, rows), :min(matrix.shape[1], columns)]
+    moved[:old.shape[0], :old.shape[1]] = old
+    return moved
+
+
+class WalletView(IWallet):
+    """
+    The wallet of a single agent of a WalletBank, for code written against IWallet. The balances stay in the bank.
+
+    Extends
+
+        IWallet
+
+    Attributes
+
+        bank: WalletBank
+            The bank holding the balances
+
+        agent: int
+            Id of the agent in the bank
+
+    Methods
+
+        fork(memo: dict?) -> WalletView
+            Returns the view of the same agent in a fork of the bank
+
+        minor_balance(ticker) -> int | float
+            Returns the balance of the ticker as per Wallet.minor_balance
+    """
+
+    __slots__ = ("bank", "agent")
+
+    def __init__(self, bank: WalletBank, agent):
+        """
+        :param bank: WalletBank
+        :param agent: int
+        """
+        self.bank = bank
+        self.agent = agent
+
+    def __eq__(self, other):
+        return isinstance(other, WalletView) and self.bank is other.bank and self.agent == other.agent
+
+    def __hash__(self):
+        return hash((id(self.bank), self.agent))
+
+    def __reduce__(self):
+        return WalletView, (self.bank, self.agent)
+
+    def deposit_currency(self, currency: Currency):
+        """
+        Inherited from IWallet(ICurrencyDeposit)
+        :param currency: Currency
+        :return: None
+        :raises: UnsupportedCurrencyException
+        """
+        _check_negative(currency.amount)
+        _check_burned(currency)
+        bank = self.bank
+        column = bank._column(currency.ticker, add=True)
+        bank._own()
+        matrix, place, scale = bank._cell(column)
+        matrix[self.agent, place] += currency.minor_amount if scale else currency.amount
+        currency.burn()
+
+    def check_balance(self, ticker):
+        """
+        Inherited from IWallet
+        :param ticker: Any
+        :return: float
+        :raises: UnsupportedCurrencyException
+        """
+        column = self.bank._column(ticker)
+        if column is None:
+            return 0
+        matrix, place, scale = self.bank._cell(column)
+        return _to_major(int(matrix[self.agent, place]), scale) if scale else float(matrix[self.agent, place])
+
+    def withdraw(self, amount, ticker):
+        """
+        Inherited from IWallet
+        :param amount: float
+        :param ticker: Any
+        :return: Currency
+        :raises: UnsupportedCurrencyException
+        :raises: InsufficientBalanceException
+        :raises: InexactAmountException
+        """
+        _check_negative(amount)
+        bank = self.bank
+        column = bank._column(ticker)
+        if column is None:
+            raise InsufficientBalanceException
+        matrix, place, scale = bank._cell(column)
+        units = minor_units.to_minor(amount, ticker) if scale else amount
+        if matrix[self.agent, place] < units:
+            raise InsufficientBalanceException
+        bank._own()
+        bank._cell(column)[0][self.agent, place] -= units
+        return Currency.from_minor(units, ticker) if scale else Currency(amount, ticker)
+
+    def withdraw_all(self, ticker):
+        """
+        Inherited from IWallet
+        :param ticker: Any
+        :return: Currency
+        :raises: UnsupportedCurrencyException
+        """
+        return self.withdraw(self.check_balance(ticker), ticker)
+
+    def minor_balance(self, ticker):
+        """
+        Returns the balance of the ticker in minor units if it is registered with minor_units, as per
+        Wallet.minor_balance
+        :param ticker: Any
+        :return: int | float
+        :raises: UnsupportedCurrencyException
+        """
+        column = self.bank._column(ticker)
+        if column is None:
+            return 0
+        matrix, place, scale = self.bank._cell(column)
+        return int(matrix[self.agent, place]) if scale else float(matrix[self.agent, place])
+
+    def _add_units(self, ticker, units):
+        """
+        Adds units of the ticker, as per Wallet._add_units
+        :param ticker: Any
+        :param units: int | float
+        :return: None
+        """
+        bank = self.bank
+        column = bank._column(ticker, add=True)
+        bank._own()
+        matrix, place, _ = bank._cell(column)
+        matrix[self.agent, place] += units
+
+    def withdraw_all_currencies(self):
+        """
+        Inherited from IWallet
+        :return: [Currency]
+        """
+        bank = self.bank
+        ret = []
+        for ticker, column in bank._columns.items():
+            matrix, place, scale = bank._cell(column)
+            balance = matrix[self.agent, place]
+            if balance > 0:
+                ret.append(Currency.from_minor(int(balance), ticker) if scale else Currency(float(balance), ticker))
+        if ret:
+            bank._own()
+            bank._balances[self.agent] = 0
+            bank._units[self.agent] = 0
+        return ret
+
+    def can_afford(self, price):
+        """
+        Inherited from IWallet
+        :param price: dict | Price
+        :return: Bool
+        :raises: UnsupportedCurrencyException
+        """
+        if type(price) is Price:
+            triples = self.bank._compile(price)[2]
+            if triples is None:
+                return False
+            balances = self.bank._balances[self.agent]
+            units = self.bank._units[self.agent]
+            for in_units, column, amount in triples:
+                if (units if in_units else balances)[column] < amount:
+                    return False
+            return True
+        return bool(self.bank.can_afford(self.agent, price)[0])
+
+    def subtract(self, price):
+        """
+        Inherited from IWallet
+        :param price: dict | Price
+        :return: None
+        :raises: UnsupportedCurrencyException
+        :raises: InsufficientBalanceException
+        """
+        self.bank.subtract(self.agent, price)
+
+    def fork(self, memo=None):
+        """
+        Returns the view of the same agent in the fork of the bank made with the memo
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: WalletView
+        """
+        memo = {} if memo is None else memo
+        if id(self) in memo:
+            return memo[id(self)]
+        fork = WalletView(self.bank.fork(memo), self.agent)
+        memo[id(self)] = fork
+        return fork
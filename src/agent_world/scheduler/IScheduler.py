@@ -14,17 +14,36 @@ class ScheduledEvent:
         An identifier for the scheduled event, currently the concern of the implementation. Ideally this should be
         unique and lightweight, such as a string, integer or data class.
 
+    kind: Hashable = None
+        The kind of the event. If the scheduler has a batch handler for the kind, all events of that kind scheduled
+        for the same time are passed to the handler together instead of being executed one by one.
+
+    payload: Any = None
+        Data passed to the batch handler of the kind of the event
+
     """
 
-    def __init__(self, scheduled_event, scheduled_time, identifier=None):
+    __slots__ = ("scheduled_event", "scheduled_time", "identifier", "kind", "payload")
+
+    def __init__(self, scheduled_event, scheduled_time, identifier=None, kind=None, payload=None):
         """
         :param scheduled_event: lambda
         :param scheduled_time: int
         :param identifier: Equatable
+        :param kind: Hashable
+        :param payload: Any
         """
         self.scheduled_event = scheduled_event
         self.scheduled_time = scheduled_time
         self.identifier = identifier
+        self.kind = kind
+        self.payload = payload
+
+    def __reduce__(self):
+        # Pickled and copied as a constructor call, which is smaller and faster than going through the slots
+        # generically. Subclasses without slots keep the rest of their state in __dict__.
+        return type(self), (self.scheduled_event, self.scheduled_time, self.identifier, self.kind, self.payload), \
+            getattr(self, "__dict__", None)
 
 
 class IScheduler:
@@ -43,6 +62,9 @@ class IScheduler:
 
         cancel_event(self, identifier)
             Cancels an event identified by the provided identifier.
+
+        next_event_time(self): int?
+            Returns the time of the next scheduled event
     """
 
     def current_time(self):
@@ -74,3 +96,144 @@ class IScheduler:
         :return: None
         """
         raise NotImplementedError  # pragma: no cover
+
+    def next_event_time(self):
+        """
+        Returns the time of the next scheduled event, or None if no events are scheduled
+        :return: int?
+        """
+        raise NotImplementedError  # pragma: no cover
+
+
+class InvalidPeriodException(Exception):
+    pass
+
+
+class PeriodicEvent(ScheduledEvent):
+    """
+    An event which is executed every period milliseconds, at the times phase + k * period. The scheduler re-arms the
+    same object after every execution, instead of the event having to schedule a new copy of itself.
+
+    Extends
+
+        ScheduledEvent
+
+    Attributes
+
+    period: int
+        Time in milliseconds between executions
+
+    end_time: int? = None
+        Time in milliseconds after which the event is no longer executed
+
+    remaining: int? = None
+        Number of executions left, None if unlimited
+
+    aggregate: bool = False
+        Whether consecutive executions may be aggregated. This is meant for side effect free ticks, where running the
+        event k times is equivalent to running it once for k periods. If True, scheduled_event is called with the
+        number of periods that have elapsed, and a scheduler which is advanced past several periods at once calls it
+        a single time. Events passed to a batch handler are never aggregated.
+
+    Methods
+
+    align_to(time: int)
+        Moves the scheduled time to the first execution at or after the given time
+
+    next_execution(time: int) -> int?
+        Returns the time of the first execution at or after the given time, without moving the scheduled time
+
+    periods_until(time: int) -> int
+        Returns the number of executions due up to and including the given time
+
+    advance(periods: int)
+        Moves the scheduled time forward by the given number of executions
+
+    is_exhausted() -> bool
+        Returns true if the event has no executions left
+    """
+
+    __slots__ = ("period", "end_time", "remaining", "aggregate")
+
+    def __init__(self, scheduled_event, period, phase=0, identifier=None, end_time=None, count=None,
+                 aggregate=False, kind=None, payload=None):
+        """
+        :param scheduled_event: lambda
+        :param period: int
+        :param phase: int
+            Time of the first execution, or any other time in the same phase if that is in the past
+        :param identifier: Equatable
+        :param end_time: int?
+        :param count: int?
+        :param aggregate: bool
+        :param kind: Hashable
+        :param payload: Any
+        :raises: InvalidPeriodException
+        """
+        if period <= 0:
+            raise InvalidPeriodException
+        super().__init__(scheduled_event, phase, identifier, kind, payload)
+        self.period = period
+        self.end_time = end_time
+        self.remaining = count
+        self.aggregate = aggregate
+
+    def __reduce__(self):
+        return type(self), (self.scheduled_event, self.period, self.scheduled_time, self.identifier, self.end_time,
+                            self.remaining, self.aggregate, self.kind, self.payload), getattr(self, "__dict__", None)
+
+    def align_to(self, time):
+        """
+        Moves the scheduled time to the first execution at or after the given time
+        :param time: int
+        :return: None
+        """
+        if self.scheduled_time < time:
+            self.scheduled_time += -((self.scheduled_time - time) // self.period) * self.period
+
+    def next_execution(self, time):
+        """
+        Returns the time of the first execution at or after the given time, as per align_to, or None if the event
+        has no executions left by then. The event itself is not changed.
+        :param time: int
+        :return: int?
+        """
+        scheduled_time = self.scheduled_time
+        if scheduled_time < time:
+            scheduled_time += -((scheduled_time - time) // self.period) * self.period
+        if (self.remaining is not None and self.remaining <= 0) or \
+                (self.end_time is not None and scheduled_time > self.end_time):
+            return None
+        return scheduled_time
+
+    def periods_until(self, time):
+        """
+        Returns the number of executions due up to and including the given time
+        :param time: int
+        :return: int
+        """
+        last = time if self.end_time is None else min(time, self.end_time)
+        if last < self.scheduled_time:
+            return 0
+        periods = (last - self.scheduled_time) // self.period + 1
+        if self.remaining is not None:
+            periods = min(periods, self.remaining)
+        return periods
+
+    def advance(self, periods):
+        """
+        Moves the scheduled time forward by the given number of executions
+        :param periods: int
+        :return: None
+        """
+        self.scheduled_time += periods * self.period
+        if self.remaining is not None:
+            self.remaining -= periods
+
+    def is_exhausted(self):
+        """
+        Returns true if the event has no executions left
+        :return: bool
+        """
+        return (self.remaining is not None and self.remaining <= 0) or \
+            (self.end_time is not None and self.scheduled_time > self.end_time)
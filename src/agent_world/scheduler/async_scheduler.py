@@ -0,0 +1,279 @@
+import asyncio
+import inspect
+import threading
+from collections import deque
+
+from src.agent_world.scheduler.IScheduler import PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+
+
+class AwaitableInRunningLoopException(Exception):
+    pass
+
+
+# Operations in the inbox
+_SCHEDULE = 0
+_SCHEDULE_ALL = 1
+_CANCEL = 2
+
+
+class AsyncScheduler(Scheduler):
+    """
+    A Scheduler which can be fed from other threads and asyncio tasks, and whose events may be coroutines.
+
+    Events scheduled and cancelled from outside the execution of this scheduler are appended to an inbox, a deque,
+    whose appends and pops are atomic, so no lock is taken. The inbox is applied to the queue, in order, by the
+    thread advancing the scheduler: before advancing the time and after every timestamp. Events scheduled or
+    cancelled by the events being executed apply immediately, as in Scheduler.
+
+    The next event time is the earliest of the queue and the events in the inbox, which is worked out without
+    applying the inbox, so that it can be asked for from any thread. As the cancellations in the inbox are not
+    applied either, it may be earlier than the time of the next event which is actually executed, but never later.
+
+    As the inbox is applied when the scheduler is advanced, events arriving for a time which has already passed by
+    then are dropped, as with any event scheduled in the past.
+
+    Callbacks and batch handlers may return awaitables. set_time_async awaits each of them before executing the
+    next event. set_time, which is what Clock.set_time_to calls, runs them to completion on a new event loop, and
+    raises an AwaitableInRunningLoopException if it is called from within a running event loop, where
+    Clock.set_time_to_async should be used instead.
+
+    Extends
+
+        Scheduler
+
+    Methods
+
+        set_time_async(time: int) -> None
+            Coroutine setting the time as per set_time, awaiting awaitable callbacks in order
+
+        fork(memo: dict?) -> AsyncScheduler
+            Inherited from Scheduler, applying the inbox first
+
+        attach_clock(clock: Clock) -> bool
+            Inherited from Scheduler. Returns False, as events arriving in the inbox are not known to the clock until
+            the inbox is applied, so the scheduler has its time set on every change of time. Arrivals in the inbox
+            are announced with Clock.notify_wake instead.
+    """
+
+    def __init__(self, current_time=0, queue=None):
+        """
+        :param current_time: int
+        :param queue: _HeapSchedulerQueue? Defaults to an empty _HeapSchedulerQueue
+        """
+        super().__init__(current_time, queue)
+        self._inbox = deque()
+        # Thread currently executing events, None when not executing
+        self._executing = None
+        # Clock told about arrivals in the inbox
+        self._inbox_clock = None
+
+    def schedule_event(self, event):
+        """
+        Inherited from IScheduler. Safe to call from any thread.
+        :param event: ScheduledEvent
+        :return: None
+        """
+        if self._is_executing_thread():
+            self._apply_inbox()
+            super().schedule_event(event)
+        else:
+            self._inbox.append((_SCHEDULE, event))
+            self._announce()
+
+    def schedule_events(self, events):
+        """
+        Inherited from IScheduler. Safe to call from any thread.
+        :param events: [ScheduledEvent]
+        :return: None
+        """
+        if self._is_executing_thread():
+            self._apply_inbox()
+            super().schedule_events(events)
+        else:
+            self._inbox.append((_SCHEDULE_ALL, list(events)))
+            self._announce()
+
+    def cancel_event(self, identifier):
+        """
+        Inherited from IScheduler. Safe to call from any thread.
+        :param identifier: Equatable
+        :return: None
+        """
+        if self._is_executing_thread():
+            self._apply_inbox()
+            super().cancel_event(identifier)
+        else:
+            self._inbox.append((_CANCEL, identifier))
+            self._announce()
+
+    def next_event_time(self):
+        """
+        Inherited from IScheduler. Safe to call from any thread. Only the executing thread applies the inbox, other
+        threads take the events in it into account without changing the queue.
+        :return: int?
+        """
+        if self._is_executing_thread():
+            self._apply_inbox()
+            return super().next_event_time()
+        time = super().next_event_time()
+        current_time = self._current_time
+        # A copy, as the inbox may be appended to and applied while it is gone through
+        for operation, value in self._inbox.copy():
+            if operation == _CANCEL:
+                continue
+            for event in [value] if operation == _SCHEDULE else value:
+                scheduled_time = _pending_time(event, current_time)
+                if scheduled_time is not None and (time is None or scheduled_time < time):
+                    time = scheduled_time
+        return time
+
+    def set_time(self, time):
+        """
+        Inherited from Scheduler. Awaitables returned by callbacks are run to completion on a new event loop.
+        :param time: int
+        :return: None
+        :raises: AwaitableInRunningLoopException
+        """
+        self._apply_inbox()
+        self._executing = threading.get_ident()
+        try:
+            super().set_time(time)
+        finally:
+            self._executing = None
+
+    async def set_time_async(self, time):
+        """
+        Sets the time as per set_time, awaiting each awaitable returned by a callback before executing the next
+        event
+        :param time: int
+        :return: None
+        """
+        self._apply_inbox()
+        if time <= self._current_time:
+            return
+        self._current_time = time
+        self._executing = threading.get_ident()
+        try:
+            queue = self._queue_to_execute(time)
+            if queue is None:
+                return
+            bucket = queue.pop_bucket(time)
+            while bucket:
+                steps = self._bucket_steps(bucket, time)
+                try:
+                    for result in steps:
+                        if inspect.isawaitable(result):
+                            await result
+                finally:
+                    steps.close()
+                self._apply_inbox()
+                bucket = queue.pop_bucket(time)
+        finally:
+            self._executing = None
+
+    def fork(self, memo=None):
+        """
+        Inherited from Scheduler. The inbox is applied first, and the fork starts with an empty inbox of its own.
+        :param memo: dict?
+        :return: AsyncScheduler
+        """
+        if memo is not None and id(self) in memo:
+            return memo[id(self)]
+        self._apply_inbox()
+        fork = super().fork(memo)
+        fork._inbox = deque()
+        fork._inbox_clock = None
+        return fork
+
+    def attach_clock(self, clock):
+        """
+        Inherited from Scheduler
+        :param clock: Clock
+        :return: bool
+        """
+        self._inbox_clock = clock
+        return False
+
+    def _announce(self):
+        """
+        Tells the clock, and so e.g. a driver waiting for the next event, that something arrived in the inbox
+        :return: None
+        """
+        clock = self._inbox_clock
+        if clock is not None:
+            clock.notify_wake()
+
+    def _execute_bucket(self, bucket, time):
+        """
+        Inherited from Scheduler, running awaitables returned by callbacks to completion and applying the inbox
+        afterwards
+        :param bucket: [ScheduledEvent]
+        :param time: int
+        :return: None
+        :raises: AwaitableInRunningLoopException
+        """
+        steps = self._bucket_steps(bucket, time)
+        try:
+            for result in steps:
+                if inspect.isawaitable(result):
+                    _run_to_completion(result)
+        finally:
+            steps.close()
+        self._apply_inbox()
+
+    def _is_executing_thread(self):
+        """
+        Returns true if this is called by the thread executing the events of this scheduler, e.g. by an event
+        :return: bool
+        """
+        return self._executing == threading.get_ident()
+
+    def _apply_inbox(self):
+        """
+        Applies the scheduling and cancelling in the inbox to the queue, in the order they were made
+        :return: None
+        """
+        inbox = self._inbox
+        while inbox:
+            operation, value = inbox.popleft()
+            if operation == _SCHEDULE:
+                Scheduler.schedule_event(self, value)
+            elif operation == _SCHEDULE_ALL:
+                Scheduler.schedule_events(self, value)
+            else:
+                Scheduler.cancel_event(self, value)
+
+
+def _pending_time(event, current_time):
+    """
+    Returns the time the event will be scheduled for once the inbox is applied, None if it will be dropped, as per
+    Scheduler._accepts but without aligning periodic events
+    :param event: ScheduledEvent
+    :param current_time: int
+    :return: int?
+    """
+    if isinstance(event, PeriodicEvent):
+        return event.next_execution(current_time)
+    return event.scheduled_time if event.scheduled_time >= current_time else None
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _run_to_completion(awaitable):
+    """
+    Runs the awaitable to completion on a new event loop
+    :param awaitable: Awaitable
+    :return: Any
+    :raises: AwaitableInRunningLoopException
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await(awaitable))
+    if inspect.iscoroutine(awaitable):
+        # Closed so that it is not reported as never awaited
+        awaitable.close()
+    raise AwaitableInRunningLoopException
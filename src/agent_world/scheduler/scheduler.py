@@ -1,27 +1,57 @@
-from src.agent_world.clock.clock import IClockDelegate
-from src.agent_world.scheduler.IScheduler import IScheduler
+import heapq
+import itertools
+import math
+from collections import deque
+from operator import attrgetter
 
+from src.agent_world.clock.clock import IWakingClockDelegate
+from src.agent_world.scheduler.IScheduler import IScheduler, PeriodicEvent
 
-class Scheduler(IScheduler, IClockDelegate):
+
+class Scheduler(IScheduler, IWakingClockDelegate):
     """
     A class to facilitate and handle the scheduling of actions
 
+    Subscribed to a Clock, the scheduler tells the clock the time of its next event and only has its time set when
+    that event is due. In between, its current time is the time of the clock.
+
     Extends
 
-        IScheduler, IClockDelegate
+        IScheduler, IWakingClockDelegate
 
     Attributes
 
         current_time: int
             The current in-world time
 
-        _queue: _SchedulerQueue
-            Queue used to store scheduled events
+        _queue: _HeapSchedulerQueue
+            Queue used to store scheduled events. Any object with the _SchedulerQueue interface can be supplied, the
+            linked list _SchedulerQueue is kept as a reference implementation.
+
+        _batch_handlers: dict
+            Handlers for kinds of events which are executed in batches, by kind
+
+        _bucket: [ScheduledEvent?]?
+            The events of the timestamp currently being executed. Executed and cancelled events are replaced by None.
+
+        _bucket_index: dict?
+            Positions in _bucket of the events of every hashable identifier, in order, built by the first
+            cancel_event while the bucket is executed
+
+        _fork_memo: dict?
+            Set while the queue is shared with forks of this scheduler, None once the scheduler has its own queue.
+            Maps the ids of forked objects to their forks, so that events can be pointed at the forks once the queue
+            is copied.
+
+        _clock: Clock?
+            The clock this scheduler is attached to, told whenever an event earlier than the previous first event
+            is scheduled
 
     Methods
 
         schedule_event(event: ScheduledEvent) -> None
-            If the event is scheduled for the future it is added to the queue of events
+            If the event is scheduled for the future it is added to the queue of events. PeriodicEvents are first
+            moved to their first execution at or after the current time.
 
         cancel_event(identifier: Equatable) -> None
             Removes the event corresponding to the given identifier from the schedule
@@ -29,8 +59,23 @@ class Scheduler(IScheduler, IClockDelegate):
         current_time() -> int
             Returns the current time
 
+        next_event_time() -> int?
+            Returns the time of the next scheduled event
+
         schedule_events(events: [ScheduledEvent]) -> None
-            Iteratively schedules all events contained in the list as per schedule_event()
+            Schedules all events contained in the list as per schedule_event(), sorting them once and merging them
+            into the queue in a single pass
+
+        schedule_batch_handler(kind: Hashable, handler: lambda) -> None
+            Executes events of the given kind in batches, one per timestamp, by calling the handler with the list of
+            their payloads
+
+        remove_batch_handler(kind: Hashable) -> None
+            Stops executing events of the given kind in batches
+
+        set_time(time: int) -> None
+            If the given time is greater than the current time, the current time is set to the time and all events
+            scheduled up to and including that time are executed in order, one timestamp at a time
 
         advance_time_to(time: int) -> None
             If the given time is greater than the current time, the current time is set to the time and all events
@@ -38,14 +83,33 @@ class Scheduler(IScheduler, IClockDelegate):
 
         advance_time_by(time: int) -> None
             Calls advance_time_to(current_time + time) i.e. advances time by the given time
+
+        fork(memo: dict?) -> Scheduler
+            Returns a copy of this scheduler which shares the queue until either of them changes it
+
+        next_wake_time() -> int?
+            Inherited from IWakingClockDelegate, the time of the next scheduled event
+
+        attach_clock(clock: Clock) -> bool
+            Inherited from IWakingClockDelegate
+
+        detach_clock(clock: Clock) -> None
+            Inherited from IWakingClockDelegate
     """
 
-    def __init__(self, current_time=0):
+    def __init__(self, current_time=0, queue=None):
         """
         :param current_time: int
+        :param queue: _HeapSchedulerQueue? Defaults to an empty _HeapSchedulerQueue
         """
         self._current_time = current_time
-        self._queue = _SchedulerQueue()
+        self._queue = queue if queue is not None else _HeapSchedulerQueue()
+        self._batch_handlers = {}
+        self._bucket = None
+        self._bucket_index = None
+        self._position = 0
+        self._fork_memo = None
+        self._clock = None
 
     def schedule_event(self, event):
         """
@@ -53,49 +117,788 @@ class Scheduler(IScheduler, IClockDelegate):
         :param event: ScheduledEvent
         :return: None
         """
-        if event.scheduled_time >= self._current_time:
-            self._queue.add_event(event)
+        if self._accepts(event):
+            self._own_queue().add_event(event)
+            if self._clock is not None:
+                self._clock.wake_at(self, event.scheduled_time)
 
     def cancel_event(self, identifier):
         """
-        Inherited from IScheduler
+        Inherited from IScheduler. Events of the timestamp currently being executed come first, and a periodic event
+        cancelling itself while being executed is not re-armed.
         :param identifier: Equatable
         :return: None
         """
-        self._queue.remove_event(identifier)
+        bucket = self._bucket
+        if bucket is not None:
+            position = self._bucket_position(identifier)
+            if position is not None:
+                bucket[position] = None
+                return
+        self._own_queue().remove_event(identifier)
 
     def current_time(self):
         """
-        Inherited from IScheduler
+        Inherited from IScheduler. While attached to a clock, this is the time of the clock if the clock is ahead.
         :return: int
         """
+        clock = self._clock
+        if clock is not None and clock.current_time() > self._current_time:
+            return clock.current_time()
         return self._current_time
 
+    def next_event_time(self):
+        """
+        Inherited from IScheduler
+        :return: int?
+        """
+        first = self._queue.peak_first()
+        if first is not None:
+            return first.scheduled_time
+
     def schedule_events(self, events):
         """
         Inherited from IScheduler
         :param events: [ScheduledEvent]
         :return: None
         """
-        for event in events:
-            # Does not use the _SchedulerQueue method due to additional constraints
-            self.schedule_event(event)
+        accepted = [event for event in events if self._accepts(event)]
+        self._own_queue().add_batch(accepted)
+        if self._clock is not None and accepted:
+            self._clock.wake_at(self, min(event.scheduled_time for event in accepted))
+
+    def schedule_batch_handler(self, kind, handler):
+        """
+        Executes events of the given kind in batches. All events of the kind scheduled for the same time are
+        executed together, at the position of the first of them, by calling handler with the list of their payloads.
+        The scheduled_event of these events is not called.
+        :param kind: Hashable
+        :param handler: lambda
+        :return: None
+        """
+        self._batch_handlers[kind] = handler
+
+    def remove_batch_handler(self, kind):
+        """
+        Stops executing events of the given kind in batches
+        :param kind: Hashable
+        :return: None
+        """
+        self._batch_handlers.pop(kind, None)
 
     def set_time(self, time):
         """
-        Sets the time of this scheduler.
+        Sets the time of this scheduler, executing all events scheduled up to and including that time. The events
+        are taken from the queue one timestamp at a time.
         :param time: int
         :return: None
         """
         if time > self._current_time:
             self._current_time = time
-            for event in self._queue.timed_iter(time):
-                event.scheduled_event()
+            queue = self._queue_to_execute(time)
+            if queue is None:
+                return
+            bucket = queue.pop_bucket(time)
+            while bucket:
+                self._execute_bucket(bucket, time)
+                bucket = queue.pop_bucket(time)
+
+    def next_wake_time(self):
+        """
+        Inherited from IWakingClockDelegate
+        :return: int?
+        """
+        return self.next_event_time()
+
+    def attach_clock(self, clock):
+        """
+        Inherited from IWakingClockDelegate
+        :param clock: Clock
+        :return: bool
+        """
+        self._clock = clock
+        return True
+
+    def detach_clock(self, clock):
+        """
+        Inherited from IWakingClockDelegate. The scheduler keeps the time the clock was at.
+        :param clock: Clock
+        :return: None
+        """
+        if self._clock is clock:
+            self._current_time = self.current_time()
+            self._clock = None
+
+    def fork(self, memo=None):
+        """
+        Returns a copy of this scheduler. The two share the queue until either of them changes it, at which point
+        that scheduler copies the queue (copy on write), so forking is O(1) and forks which are never advanced
+        never copy anything. The fork is not attached to the clock of this scheduler, but starts at its time.
+
+        Periodic events are copied along with the queue, as they are changed when re-armed. Other events are shared
+        between the copies, unless their Action arguments or payloads refer to objects which have been forked with
+        the same memo. Those are pointed at the forks.
+        :param memo: dict? Maps the ids of objects forked together to their forks, as in copy.deepcopy
+        :return: Scheduler
+        :raises: ForkDuringExecutionException
+        """
+        memo = {} if memo is None else memo
+        if id(self) in memo:
+            return memo[id(self)]
+        if self._bucket is not None:
+            raise ForkDuringExecutionException
+        # Not copy.copy, which would go through __getstate__ and copy the queue
+        fork = object.__new__(type(self))
+        fork.__dict__.update(self.__dict__)
+        memo[id(self)] = fork
+        fork._current_time = self.current_time()
+        fork._clock = None
+        fork._batch_handlers = {kind: _fork_callable(handler, memo) for kind, handler in self._batch_handlers.items()}
+        fork._fork_memo = memo
+        if self._fork_memo is None:
+            self._fork_memo = {}
+        return fork
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self._fork_memo is not None:
+            state["_queue"] = self._queue.copy(_event_forker(self._fork_memo))
+            state["_fork_memo"] = None
+        return state
+
+    def _queue_to_execute(self, time):
+        """
+        Returns the queue to take the events up to and including the given time from, or None if there are none and
+        the queue is shared with forks of this scheduler. A shared queue is left untouched, and is not copied, if
+        there is nothing to execute.
+        :param time: int
+        :return: _HeapSchedulerQueue?
+        """
+        if self._fork_memo is not None:
+            next_time = self.next_event_time()
+            if next_time is None or next_time > time:
+                return None
+        return self._own_queue()
+
+    def _bucket_position(self, identifier):
+        """
+        Returns the position of the first event with the given identifier in the bucket being executed which has not
+        been executed or cancelled yet, or None if there is none. The positions of all identifiers are indexed the
+        first time this is called for a bucket, so that cancelling is O(1) amortised.
+        :param identifier: Equatable
+        :return: int?
+        """
+        bucket = self._bucket
+        try:
+            hash(identifier)
+        except TypeError:
+            for position in range(self._position, len(bucket)):
+                event = bucket[position]
+                if event is not None and event.identifier == identifier:
+                    return position
+            return None
+        if self._bucket_index is None:
+            self._bucket_index = index = {}
+            for position in range(self._position, len(bucket)):
+                event = bucket[position]
+                if event is not None:
+                    try:
+                        index.setdefault(event.identifier, deque()).append(position)
+                    except TypeError:
+                        pass
+        positions = self._bucket_index.get(identifier)
+        # Positions which have been executed or cancelled since are dropped as they are come across
+        while positions:
+            position = positions[0]
+            if position >= self._position and bucket[position] is not None:
+                return position
+            positions.popleft()
+        return None
+
+    def _restore(self, events):
+        """
+        Puts events of a bucket which were not executed, as an event before them raised, back at the front of the
+        queue, ahead of the events scheduled for the same time while the bucket was executed
+        :param events: [ScheduledEvent]
+        :return: None
+        """
+        queue = self._own_queue()
+        time = events[0].scheduled_time
+        queue.add_all(events + queue.pop_bucket(time))
+        if self._clock is not None:
+            self._clock.wake_at(self, time)
+
+    def _own_queue(self):
+        """
+        Returns the queue, copying it first if it is shared with forks of this scheduler
+        :return: _HeapSchedulerQueue
+        """
+        if self._fork_memo is not None:
+            self._queue = self._queue.copy(_event_forker(self._fork_memo))
+            self._fork_memo = None
+        return self._queue
+
+    def _accepts(self, event):
+        """
+        Returns true if the event can be added to the queue, aligning periodic events to the current time
+        :param event: ScheduledEvent
+        :return: bool
+        """
+        if isinstance(event, PeriodicEvent):
+            event.align_to(self.current_time())
+            return not event.is_exhausted()
+        return event.scheduled_time >= self.current_time()
+
+    def _execute_bucket(self, bucket, time):
+        """
+        Executes all events of a timestamp in order, passing events with batch handlers to their handlers
+        :param bucket: [ScheduledEvent]
+        :param time: int
+        :return: None
+        """
+        # Exhausts the generator without a Python level loop
+        deque(self._bucket_steps(bucket, time), maxlen=0)
+
+    def _bucket_steps(self, bucket, time):
+        """
+        Generator executing the events of a timestamp as per _execute_bucket, which yields what each event or batch
+        handler returns right after calling it. This lets subclasses wait for callbacks, such as awaitables, before
+        the next event is executed.
+        :param bucket: [ScheduledEvent]
+        :param time: int
+        :return: Iterator
+        """
+        handlers = self._batch_handlers
+        batches = {}
+        if handlers:
+            for position, event in enumerate(bucket):
+                if event.kind is not None and event.kind in handlers:
+                    batches.setdefault(event.kind, []).append(position)
+        self._bucket = bucket
+        self._bucket_index = None
+        try:
+            for position in range(len(bucket)):
+                event = bucket[position]
+                if event is None:
+                    continue
+                self._position = position
+                if batches and event.kind in batches:
+                    yield from self._batch_steps(bucket, batches.pop(event.kind), handlers[event.kind])
+                elif isinstance(event, PeriodicEvent):
+                    periods = event.periods_until(time) if event.aggregate else 1
+                    # Re-armed even if the callback raises, as it would have been had it returned
+                    try:
+                        yield event.scheduled_event(periods) if event.aggregate else event.scheduled_event()
+                    finally:
+                        if bucket[position] is event:
+                            bucket[position] = None
+                            self._rearm(event, periods)
+                else:
+                    # Cleared before executing, so that the event can not cancel itself
+                    bucket[position] = None
+                    yield event.scheduled_event()
+        except BaseException:
+            # The events after the one which raised, or was being awaited when the steps were closed, are not lost
+            remainder = [event for event in bucket[self._position + 1:] if event is not None]
+            if remainder:
+                self._restore(remainder)
+            raise
+        finally:
+            self._bucket = None
+            self._bucket_index = None
+            self._position = 0
+
+    def _batch_steps(self, bucket, positions, handler):
+        """
+        Generator passing the payloads of the events at the given positions of the bucket to the handler, and
+        yielding what the handler returns. Periodic events are re-armed afterwards, unless they were cancelled by the
+        handler.
+        :param bucket: [ScheduledEvent?]
+        :param positions: [int]
+        :param handler: lambda
+        :return: Iterator
+        """
+        events = [bucket[position] for position in positions]
+        for position, event in zip(positions, events):
+            if event is not None and not isinstance(event, PeriodicEvent):
+                bucket[position] = None
+        try:
+            yield handler([event.payload for event in events if event is not None])
+        finally:
+            for position, event in zip(positions, events):
+                if event is not None and bucket[position] is event:
+                    bucket[position] = None
+                    self._rearm(event, 1)
+
+    def _rearm(self, event, periods):
+        """
+        Moves the periodic event forward by the given number of periods and adds it to the queue again
+        :param event: PeriodicEvent
+        :param periods: int
+        :return: None
+        """
+        event.advance(periods)
+        if not event.is_exhausted():
+            self._own_queue().add_event(event)
+            if self._clock is not None:
+                self._clock.wake_at(self, event.scheduled_time)
+
+
+class ForkDuringExecutionException(Exception):
+    pass
+
+
+def _fork_callable(function, memo):
+    """
+    Returns the fork of the function if it can be forked, such as an Action, otherwise the function itself
+    :param function: lambda
+    :param memo: dict
+    :return: lambda
+    """
+    fork = getattr(function, "fork", None)
+    return fork(memo) if fork is not None else function
+
+
+def _event_forker(memo):
+    """
+    Returns a function which copies events for a copy of a queue. Periodic events are always copied, other events
+    only if their scheduled_event or payload refers to an object in the memo.
+    :param memo: dict
+    :return: (ScheduledEvent) -> ScheduledEvent
+    """
+    copies = {}
+
+    def fork_event(event):
+        forked = copies.get(id(event))
+        if forked is not None:
+            return forked
+        scheduled_event = _fork_callable(event.scheduled_event, memo) if memo else event.scheduled_event
+        payload = memo.get(id(event.payload), event.payload) if memo else event.payload
+        if scheduled_event is event.scheduled_event and payload is event.payload and \
+                not isinstance(event, PeriodicEvent):
+            return event
+        reduced = event.__reduce__()
+        forked = reduced[0](*reduced[1])
+        if len(reduced) > 2 and reduced[2]:
+            forked.__dict__.update(reduced[2])
+        forked.scheduled_event = scheduled_event
+        forked.payload = payload
+        copies[id(event)] = forked
+        return forked
+
+    return fork_event
+
+
+_scheduled_time = attrgetter("scheduled_time")
+
+
+class _HeapSchedulerQueue:
+    """
+    A binary heap used to manage the ordering of ScheduledEvents. Has the same interface and ordering as
+    _SchedulerQueue, but adding and popping events is O(log n) rather than O(n).
+
+    Events are stored as (scheduled_time, sequence, event) tuples, where sequence is a running counter. Events with
+    equal scheduled times are thus popped in the order they were added.
+
+    Removal is lazy: every entry is indexed by the identifier of its event, and removing an event only adds the
+    sequence number of its entry to a set of removed entries (the "tombstones"). Tombstones are skipped when popping,
+    and the heap is compacted once they make up more than compaction_threshold of it. Peeking never changes the
+    heap, so that it may be done from another thread than the one changing it.
+
+    Attributes
+
+    compaction_threshold: float
+        Fraction of tombstones in the heap above which it is compacted
+
+    Implements:
+
+    __iter__
+
+    Methods
+
+    add_event(event: ScheduledEvent)
+        Adds event to the heap
+
+    add_all(list_of_events: [ScheduledEvent])
+        Adds all events contained in the list consecutively as per the add_event method
+
+    add_batch(list_of_events: [ScheduledEvent])
+        Adds all events contained in the list as per add_all, merging them into the heap with a single heapify
+
+    remove_event(identifier: Equatable)
+        Removes the event of the given identifier from the heap. If there are multiple occurrences of the
+        same identifier, the first occurrence will be removed
+
+    compact()
+        Removes all tombstones from the heap
+
+    copy(copy_event: (ScheduledEvent) -> ScheduledEvent?) -> _HeapSchedulerQueue
+        Returns a copy of the heap, with every event replaced by copy_event(event)
+
+    peak_first() -> ScheduledEvent?
+        Returns the first ScheduledEvent of the heap without removing it. If the heap is empty, returns None
+
+    pop() -> ScheduledEvent?
+        Pops the first object from the heap. If the heap is empty, returns None
+
+    pop_bucket(end_time: int) -> [ScheduledEvent]
+        Pops all events scheduled for the time of the first event, if that is at or before end_time
+
+    size() -> int
+        Returns the number of events in the heap
+
+    is_not_empty() -> Boolean
+        Returns true if the heap is not empty
+
+    is_empty() -> Boolean
+        Returns true if the heap is empty
+
+    timed_iter(end_time: int) -> _FixedTimedIterator
+        Returns an iterator which iterates over all events up to and including the given time 'destructively', i.e.
+        the elements are popped from the heap as they are iterated over.
+    """
+
+    __slots__ = ("compaction_threshold", "_heap", "_counter", "_size", "_removed", "_index")
+
+    def __init__(self, compaction_threshold=0.5):
+        """
+        :param compaction_threshold: float
+        """
+        self.compaction_threshold = compaction_threshold
+        self._heap = []
+        self._counter = itertools.count()
+        self._size = 0
+        # Sequence numbers of removed entries still in the heap
+        self._removed = set()
+        self._index = _IdentifierIndex()
+
+    # Various adds
+
+    def add_event(self, event):
+        """
+        Adds event to the heap, after all events already in the heap with the same scheduled time
+        :param event: ScheduledEvent
+        :return: None
+        """
+        entry = (event.scheduled_time, next(self._counter), event)
+        heapq.heappush(self._heap, entry)
+        if event.identifier is not None:
+            self._index.add(entry)
+        self._size += 1
+
+    def add_all(self, list_of_events):
+        """
+        Adds all events contained in the list consecutively as per the add_event method
+        :param list_of_events: [ScheduledEvent]
+        :return: None
+        """
+        for event in list_of_events:
+            self.add_event(event)
+
+    def add_batch(self, list_of_events):
+        """
+        Adds all events contained in the list as per add_all. Heapify is linear, so unless the batch is small
+        compared to the heap it is cheaper to append the whole batch and heapify once than to push each event.
+        Sorting the batch first would not help, as heapify does not benefit from sorted input.
+        :param list_of_events: [ScheduledEvent]
+        :return: None
+        """
+        counter = self._counter
+        entries = [(event.scheduled_time, next(counter), event) for event in list_of_events]
+        if not entries:
+            return
+        add_to_index = self._index.add
+        for entry in entries:
+            if entry[2].identifier is not None:
+                add_to_index(entry)
+        heap = self._heap
+        total = len(heap) + len(entries)
+        if len(entries) * math.log2(total) < total:
+            for entry in entries:
+                heapq.heappush(heap, entry)
+        else:
+            heap.extend(entries)
+            heapq.heapify(heap)
+        self._size += len(entries)
+
+    # Various removes
+
+    def remove_event(self, identifier):
+        """
+        Removes the event of the given identifier from the heap. If there are multiple occurrences of the
+        same identifier, the first occurrence will be removed
+        :param identifier: Equatable
+        :return: None
+        """
+        if identifier is None:
+            first = _first_without_identifier(self._heap, self._removed)
+        else:
+            first = self._index.first(identifier)
+        if first is None:
+            return
+        self._index.remove(first)
+        self._removed.add(first[1])
+        self._size -= 1
+        if len(self._removed) > self.compaction_threshold * len(self._heap):
+            self.compact()
+
+    def compact(self):
+        """
+        Removes all tombstones from the heap
+        :return: None
+        """
+        removed = self._removed
+        self._heap = [entry for entry in self._heap if entry[1] not in removed]
+        heapq.heapify(self._heap)
+        removed.clear()
+
+    # Various operators
+
+    def peak_first(self):
+        """
+        Returns the first ScheduledEvent of the heap without removing it. If the heap is empty, returns None
+        :return: ScheduledEvent?
+        """
+        # A slice rather than an index, as the heap may be emptied by another thread in the meantime
+        top = self._heap[:1]
+        if not top:
+            return None
+        removed = self._removed
+        if removed and top[0][1] in removed:
+            # The tombstones are left for pop and pop_bucket to discard
+            first = min((entry for entry in self._heap if entry[1] not in removed), default=None)
+            return first[2] if first is not None else None
+        return top[0][2]
+
+    def pop(self):
+        """
+        Pops the first object from the heap. If the heap is empty, returns None
+        :return: ScheduledEvent?
+        """
+        heap = self._heap
+        removed = self._removed
+        while heap:
+            entry = heapq.heappop(heap)
+            if removed and entry[1] in removed:
+                removed.discard(entry[1])
+                continue
+            if entry[2].identifier is not None:
+                self._index.remove(entry)
+            self._size -= 1
+            return entry[2]
+
+    def pop_bucket(self, end_time):
+        """
+        Pops all events scheduled for the time of the first event, if that is at or before end_time
+        :param end_time: int
+        :return: [ScheduledEvent]
+        """
+        heap = self._heap
+        removed = self._removed
+        while heap and removed and heap[0][1] in removed:
+            removed.discard(heapq.heappop(heap)[1])
+        if not heap or heap[0][0] > end_time:
+            return []
+        time = heap[0][0]
+        remove_from_index = self._index.remove
+        heappop = heapq.heappop
+        bucket = []
+        while heap and heap[0][0] == time:
+            entry = heappop(heap)
+            if removed and entry[1] in removed:
+                removed.discard(entry[1])
+                continue
+            event = entry[2]
+            if event.identifier is not None:
+                remove_from_index(entry)
+            bucket.append(event)
+        self._size -= len(bucket)
+        return bucket
+
+    def size(self):
+        """
+        Returns the number of events in the heap
+        :return: int
+        """
+        return self._size
+
+    # Various boolean functions
+
+    def is_not_empty(self):
+        """
+        Returns true if the heap is not empty
+        :return: Boolean
+        """
+        return self._size > 0
+
+    def is_empty(self):
+        """
+        Returns true if the heap is empty
+        :return: Boolean
+        """
+        return self._size == 0
+
+    # Iterator implementation
+
+    def __iter__(self):
+        """
+        Iterates over the events in order, without removing them
+        :return: Iterable
+        """
+        return (entry[2] for entry in sorted(self._heap) if entry[1] not in self._removed)
+
+    def timed_iter(self, end_time):
+        """
+        Returns an iterator which iterates over all events up to and including the given time 'destructively', i.e.
+        the elements are popped from the heap as they are iterated over.
+        :param end_time: int
+        :return: _FixedTimeIterator
+        """
+        return _FixedTimeIterator(end_time, self)
+
+    def copy(self, copy_event=None):
+        """
+        Returns a copy of the heap, with every event replaced by copy_event(event)
+        :param copy_event: (ScheduledEvent) -> ScheduledEvent? Defaults to keeping the events
+        :return: _HeapSchedulerQueue
+        """
+        queue = _HeapSchedulerQueue(self.compaction_threshold)
+        removed = self._removed
+        if copy_event is None:
+            queue._heap = [entry for entry in self._heap if entry[1] not in removed]
+        else:
+            queue._heap = [(entry[0], entry[1], copy_event(entry[2])) for entry in self._heap
+                           if entry[1] not in removed]
+        # Dropping entries from the heap list can break the heap property
+        if removed:
+            heapq.heapify(queue._heap)
+        queue._counter = itertools.count(next(self._counter))
+        queue._size = self._size
+        add_to_index = queue._index.add
+        for entry in queue._heap:
+            if entry[2].identifier is not None:
+                add_to_index(entry)
+        return queue
+
+    # Serialization, only the events are saved, in order, and the heap and index are rebuilt when restoring
+
+    def __getstate__(self):
+        return self.compaction_threshold, list(self)
+
+    def __setstate__(self, state):
+        compaction_threshold, events = state
+        self.__init__(compaction_threshold)
+        self.add_batch(events)
+
+
+class _IdentifierIndex:
+    """
+    Index from identifiers to the (scheduled_time, sequence, event) entries of a queue, used to find the entry to
+    remove without searching the whole queue.
+
+    Most identifiers are unique, so an identifier with a single entry maps directly to that entry. The entries of
+    identifiers with several entries are kept in a small heap. Queues only ever remove the first entry of an
+    identifier, either because it is the first entry of the whole queue or because it is being removed by
+    identifier, so removal is O(log k) for k entries sharing an identifier.
+
+    Entries without an identifier (None) must not be added, as these are rarely removed, and first(None) always
+    returns None. Queues have to search for them themselves.
+
+    Methods
+
+    add(entry: (int, int, ScheduledEvent))
+        Adds the entry to the index
+
+    remove(entry: (int, int, ScheduledEvent))
+        Removes the entry from the index
+
+    first(identifier: Equatable) -> (int, int, ScheduledEvent)?
+        Returns the first entry, in queue order, with the given identifier. If there is none, returns None
+    """
+
+    __slots__ = ("_entries", "_unhashable")
+
+    def __init__(self):
+        # identifier -> entry, or identifier -> [entry] heap if there are several
+        self._entries = {}
+        # Entries whose identifiers can not be hashed, these are searched linearly
+        self._unhashable = []
+
+    def add(self, entry):
+        """
+        Adds the entry to the index
+        :param entry: (int, int, ScheduledEvent)
+        :return: None
+        """
+        identifier = entry[2].identifier
+        try:
+            indexed = self._entries.get(identifier)
+        except TypeError:
+            self._unhashable.append(entry)
+            return
+        if indexed is None:
+            self._entries[identifier] = entry
+        elif indexed.__class__ is list:
+            heapq.heappush(indexed, entry)
+        else:
+            self._entries[identifier] = [indexed, entry] if indexed < entry else [entry, indexed]
+
+    def remove(self, entry):
+        """
+        Removes the entry from the index
+        :param entry: (int, int, ScheduledEvent)
+        :return: None
+        """
+        identifier = entry[2].identifier
+        if identifier is None:
+            return
+        try:
+            indexed = self._entries[identifier]
+        except TypeError:
+            self._unhashable.remove(entry)
+            return
+        if indexed is entry:
+            del self._entries[identifier]
+            return
+        if indexed[0] is entry:
+            heapq.heappop(indexed)
+        else:
+            indexed.remove(entry)
+            heapq.heapify(indexed)
+        if len(indexed) == 1:
+            self._entries[identifier] = indexed[0]
+
+    def first(self, identifier):
+        """
+        Returns the first entry, in queue order, with the given identifier. If there is none, returns None
+        :param identifier: Equatable
+        :return: (int, int, ScheduledEvent)?
+        """
+        try:
+            indexed = self._entries.get(identifier)
+        except TypeError:
+            entries = [entry for entry in self._unhashable if entry[2].identifier == identifier]
+            return min(entries) if entries else None
+        if indexed is not None and indexed.__class__ is list:
+            return indexed[0]
+        return indexed
+
+
+def _first_without_identifier(entries, removed):
+    """
+    Returns the first entry, in queue order, whose event has no identifier. If there is none, returns None
+    :param entries: Iterable of (int, int, ScheduledEvent)
+    :param removed: {int}
+        Sequence numbers of removed entries
+    :return: (int, int, ScheduledEvent)?
+    """
+    return min((entry for entry in entries if entry[2].identifier is None and entry[1] not in removed), default=None)
 
 
 class _SchedulerQueue:
     """
-    A linked list used to manage the ordering of ScheduledEvents
+    A linked list used to manage the ordering of ScheduledEvents. Inserting and removing events is O(n), so this is
+    only kept as a reference implementation for _HeapSchedulerQueue.
 
     Attributes
 
@@ -114,10 +917,16 @@ class _SchedulerQueue:
     add_all(list_of_events: [ScheduledEvent])
         Adds all events contained in the list consecutively as per the add_event method
 
+    add_batch(list_of_events: [ScheduledEvent])
+        Adds all events contained in the list as per add_all, sorting them once and merging them into the list
+
     remove_event(identifier: Equatable)
         Removes the event of the given identifier from the list. If there are multiple occurrences of the
         same identifier, the first occurrence will be removed
 
+    copy(copy_event: (ScheduledEvent) -> ScheduledEvent?) -> _SchedulerQueue
+        Returns a copy of the list, with every event replaced by copy_event(event)
+
     peak_first() -> ScheduledEvent?
         Returns the first ScheduledEvent of the linked list without removing it from the list.
         If the list is empty, returns None
@@ -125,6 +934,9 @@ class _SchedulerQueue:
     pop() -> ScheduledEvent?
         Pops the first object from the list. If the list is empty, returns None
 
+    pop_bucket(end_time: int) -> [ScheduledEvent]
+        Pops all events scheduled for the time of the first event, if that is at or before end_time
+
     size() -> int
         Returns the size of the linked list
 
@@ -151,8 +963,10 @@ class _SchedulerQueue:
         :param event: ScheduledEvent
         :return: None
         """
-        if self.first is None:
-            self.first = _Node(event)
+        if self.first is None or self.first.timestamp() > event.scheduled_time:
+            new_node = _Node(event)
+            new_node.set_next(self.first)
+            self.first = new_node
             return
         current = self.first
         while current.next() is not None and current.next().timestamp() <= event.scheduled_time:
@@ -170,6 +984,27 @@ class _SchedulerQueue:
         for event in list_of_events:
             self.add_event(event)
 
+    def add_batch(self, list_of_events):
+        """
+        Adds all events contained in the list as per add_all. The events are sorted once, which is stable, and then
+        merged into the linked list in a single pass.
+        :param list_of_events: [ScheduledEvent]
+        :return: None
+        """
+        previous = None
+        current = self.first
+        for event in sorted(list_of_events, key=_scheduled_time):
+            while current is not None and current.timestamp() <= event.scheduled_time:
+                previous = current
+                current = current.next()
+            new_node = _Node(event)
+            new_node.set_next(current)
+            if previous is None:
+                self.first = new_node
+            else:
+                previous.set_next(new_node)
+            previous = new_node
+
     # Various removes
 
     def remove_event(self, identifier):
@@ -216,6 +1051,20 @@ class _SchedulerQueue:
         self.first = ret.next()
         return ret.get_content()
 
+    def pop_bucket(self, end_time):
+        """
+        Pops all events scheduled for the time of the first event, if that is at or before end_time
+        :param end_time: int
+        :return: [ScheduledEvent]
+        """
+        if self.first is None or self.first.timestamp() > end_time:
+            return []
+        time = self.first.timestamp()
+        bucket = []
+        while self.first is not None and self.first.timestamp() == time:
+            bucket.append(self.pop())
+        return bucket
+
     def size(self):
         """
         Returns the size of the linked list
@@ -273,6 +1122,25 @@ class _SchedulerQueue:
         """
         return _FixedTimeIterator(end_time, self)
 
+    def copy(self, copy_event=None):
+        """
+        Returns a copy of the list, with every event replaced by copy_event(event)
+        :param copy_event: (ScheduledEvent) -> ScheduledEvent? Defaults to keeping the events
+        :return: _SchedulerQueue
+        """
+        queue = _SchedulerQueue()
+        queue.add_batch(list(self) if copy_event is None else [copy_event(event) for event in self])
+        return queue
+
+    # Serialization, the events are saved as a flat list rather than as a chain of nodes
+
+    def __getstate__(self):
+        return list(self)
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.add_batch(state)
+
 
 class _FixedTimeIterator:
     """
@@ -284,14 +1152,14 @@ class _FixedTimeIterator:
     end_time: int
         The time to iterate up to and including
 
-    queue: _SchedulerQueue
+    queue: _HeapSchedulerQueue | _SchedulerQueue
         Queue to iterate over
     """
 
     def __init__(self, end_time, scheduler_queue):
         """
         :param end_time: int
-        :param scheduler_queue: _SchedulerQueue
+        :param scheduler_queue: _HeapSchedulerQueue | _SchedulerQueue
         """
         self.end_time = end_time
         self.queue = scheduler_queue
@@ -300,27 +1168,18 @@ class _FixedTimeIterator:
         """
         :return: Iterable
         """
-
-        if self.queue.is_not_empty() and self.queue.peak_first().scheduled_time <= self.end_time:
-            self._current_iter = self.queue.pop()
-        else:
-            self._current_iter = None
         return self
 
     def __next__(self):
         """
+        Pops the next event only when it is asked for, so that events added while iterating are iterated over in
+        order as well
         :return: ScheduledEvent
         """
-        if self._current_iter is not None:
-            ret = self._current_iter
-            peak = self.queue.peak_first()
-            if peak and peak.scheduled_time <= self.end_time:
-                self._current_iter = self.queue.pop()
-            else:
-                self._current_iter = None
-            return ret
-        else:
-            raise StopIteration
+        peak = self.queue.peak_first()
+        if peak is not None and peak.scheduled_time <= self.end_time:
+            return self.queue.pop()
+        raise StopIteration
 
 
 class _Node:
@@ -352,6 +1211,8 @@ class _Node:
         Returns the scheduled event contained in the node
     """
 
+    __slots__ = ("_content", "_next")
+
     def __init__(self, content):
         """
         :param content: ScheduledEvent
@@ -0,0 +1,493 @@
+import heapq
+import itertools
+from collections import deque
+
+from src.agent_world.global_params import second, minute, hour, day
+from src.agent_world.scheduler.scheduler import Scheduler, _IdentifierIndex, _first_without_identifier
+
+# (granularity, number of slots) of the millisecond, second, minute and hour wheels. Anything further away than the
+# current day is kept in per-day buckets.
+_WHEELS = ((1, second), (second, minute // second), (minute, hour // minute), (hour, day // hour))
+_DAY_LEVEL = len(_WHEELS)
+
+
+class TimingWheelScheduler(Scheduler):
+    """
+    A Scheduler backed by a hierarchical timing wheel rather than a heap. Adding and executing events is amortized
+    O(1), and advancing the time only visits the slots which contain events, so jumping several days ahead is cheap.
+
+    Extends
+
+        Scheduler
+    """
+
+    def __init__(self, current_time=0, compaction_threshold=0.5):
+        """
+        :param current_time: int
+        :param compaction_threshold: float
+        """
+        super().__init__(current_time, _TimingWheelQueue(current_time, compaction_threshold))
+
+
+class _TimingWheelQueue:
+    """
+    A hierarchical timing wheel used to manage the ordering of ScheduledEvents. Has the same interface and ordering
+    as _HeapSchedulerQueue.
+
+    The wheel has one level each for milliseconds, seconds, minutes and hours, plus buckets for whole days. An event
+    is stored on the coarsest level in which its time differs from the current time of the wheel, in the slot given
+    by its time. When the current time reaches a slot on a coarse level, the events of that slot are moved to the
+    finer levels ("cascaded"), until they reach the millisecond level from which they are popped. Occupied slots are
+    tracked with one integer bitmask per level, so empty slots are never visited.
+
+    Events are stored as (scheduled_time, sequence, event) tuples and removed lazily, as in _HeapSchedulerQueue.
+
+    Attributes
+
+    compaction_threshold: float
+        Fraction of tombstones in the wheel above which it is compacted
+
+    Implements:
+
+    __iter__
+
+    Methods
+
+    add_event(event: ScheduledEvent)
+        Adds event to the wheel
+
+    add_all(list_of_events: [ScheduledEvent])
+        Adds all events contained in the list consecutively as per the add_event method
+
+    add_batch(list_of_events: [ScheduledEvent])
+        Adds all events contained in the list as per add_all
+
+    remove_event(identifier: Equatable)
+        Removes the event of the given identifier from the wheel. If there are multiple occurrences of the
+        same identifier, the first occurrence will be removed
+
+    compact()
+        Removes all tombstones from the wheel
+
+    copy(copy_event: (ScheduledEvent) -> ScheduledEvent?) -> _TimingWheelQueue
+        Returns a copy of the wheel, with every event replaced by copy_event(event)
+
+    peak_first() -> ScheduledEvent?
+        Returns the first ScheduledEvent of the wheel without removing it. If the wheel is empty, returns None
+
+    pop() -> ScheduledEvent?
+        Pops the first object from the wheel. If the wheel is empty, returns None
+
+    pop_bucket(end_time: int) -> [ScheduledEvent]
+        Pops all events scheduled for the time of the first event, if that is at or before end_time. Once there are
+        no such events, the current time of the wheel is end_time.
+
+    size() -> int
+        Returns the number of events in the wheel
+
+    is_not_empty() -> Boolean
+        Returns true if the wheel is not empty
+
+    is_empty() -> Boolean
+        Returns true if the wheel is empty
+
+    timed_iter(end_time: int) -> Iterator
+        Returns an iterator which iterates over all events up to and including the given time 'destructively', i.e.
+        the elements are popped from the wheel as they are iterated over. Once exhausted, the current time of the
+        wheel is end_time.
+    """
+
+    __slots__ = ("compaction_threshold", "_now", "_slots", "_occupied", "_days", "_day_heap", "_counter", "_size",
+                 "_removed", "_index")
+
+    def __init__(self, current_time=0, compaction_threshold=0.5):
+        """
+        :param current_time: int
+        :param compaction_threshold: float
+        """
+        self.compaction_threshold = compaction_threshold
+        self._now = current_time
+        self._slots = [[None] * slot_count for _, slot_count in _WHEELS]
+        self._occupied = [0] * len(_WHEELS)
+        self._days = {}
+        self._day_heap = []
+        self._counter = itertools.count()
+        self._size = 0
+        # Sequence numbers of removed entries still in the wheel
+        self._removed = set()
+        self._index = _IdentifierIndex()
+
+    # Various adds
+
+    def add_event(self, event):
+        """
+        Adds event to the wheel, after all events already in the wheel with the same scheduled time
+        :param event: ScheduledEvent
+        :return: None
+        """
+        entry = (event.scheduled_time, next(self._counter), event)
+        self._place(entry)
+        if event.identifier is not None:
+            self._index.add(entry)
+        self._size += 1
+
+    def add_all(self, list_of_events):
+        """
+        Adds all events contained in the list consecutively as per the add_event method
+        :param list_of_events: [ScheduledEvent]
+        :return: None
+        """
+        for event in list_of_events:
+            self.add_event(event)
+
+    def add_batch(self, list_of_events):
+        """
+        Adds all events contained in the list as per add_all. Adding to the wheel is O(1) regardless of order, so
+        unlike the other queues the batch is not sorted.
+        :param list_of_events: [ScheduledEvent]
+        :return: None
+        """
+        self.add_all(list_of_events)
+
+    # Various removes
+
+    def remove_event(self, identifier):
+        """
+        Removes the event of the given identifier from the wheel. If there are multiple occurrences of the
+        same identifier, the first occurrence will be removed
+        :param identifier: Equatable
+        :return: None
+        """
+        if identifier is None:
+            first = _first_without_identifier(self._entries(), self._removed)
+        else:
+            first = self._index.first(identifier)
+        if first is None:
+            return
+        self._index.remove(first)
+        self._removed.add(first[1])
+        self._size -= 1
+        if len(self._removed) > self.compaction_threshold * (self._size + len(self._removed)):
+            self.compact()
+
+    def compact(self):
+        """
+        Removes all tombstones from the wheel
+        :return: None
+        """
+        removed = self._removed
+        for level, slots in enumerate(self._slots):
+            for slot, bucket in enumerate(slots):
+                if bucket is not None:
+                    # Buckets are filtered in place, as timed_iter may be draining one of them
+                    live = [entry for entry in bucket if entry[1] not in removed]
+                    bucket.clear()
+                    bucket.extend(live)
+                    if not live:
+                        self._clear_slot(level, slot)
+        for day_number, bucket in list(self._days.items()):
+            live = [entry for entry in bucket if entry[1] not in removed]
+            if live:
+                self._days[day_number] = live
+            else:
+                del self._days[day_number]
+        self._day_heap = list(self._days)
+        heapq.heapify(self._day_heap)
+        removed.clear()
+
+    # Various operators
+
+    def peak_first(self):
+        """
+        Returns the first ScheduledEvent of the wheel without removing it. If the wheel is empty, returns None
+        :return: ScheduledEvent?
+        """
+        for level, slots in enumerate(self._slots):
+            mask = self._occupied[level]
+            while mask:
+                lowest = mask & -mask
+                first = _first_live(slots[lowest.bit_length() - 1], self._removed)
+                if first is not None:
+                    return first[2]
+                mask ^= lowest
+        for day_number in sorted(self._days):
+            first = _first_live(self._days[day_number], self._removed)
+            if first is not None:
+                return first[2]
+
+    def pop(self):
+        """
+        Pops the first object from the wheel. If the wheel is empty, returns None
+        :return: ScheduledEvent?
+        """
+        removed = self._removed
+        found = self._next_bucket(None)
+        while found is not None:
+            slot, bucket = found
+            while bucket:
+                entry = bucket.popleft()
+                if removed and entry[1] in removed:
+                    removed.discard(entry[1])
+                    continue
+                if not bucket:
+                    self._clear_slot(0, slot)
+                self._index.remove(entry)
+                self._size -= 1
+                return entry[2]
+            self._clear_slot(0, slot)
+            found = self._next_bucket(None)
+
+    def pop_bucket(self, end_time):
+        """
+        Pops all events scheduled for the time of the first event, if that is at or before end_time. Once there are
+        no such events, the current time of the wheel is end_time.
+        :param end_time: int
+        :return: [ScheduledEvent]
+        """
+        removed = self._removed
+        found = self._next_bucket(end_time)
+        while found is not None:
+            slot, entries = found
+            self._clear_slot(0, slot)
+            remove_from_index = self._index.remove
+            bucket = []
+            for entry in entries:
+                if removed and entry[1] in removed:
+                    removed.discard(entry[1])
+                    continue
+                event = entry[2]
+                if event.identifier is not None:
+                    remove_from_index(entry)
+                bucket.append(event)
+            if bucket:
+                self._size -= len(bucket)
+                return bucket
+            found = self._next_bucket(end_time)
+        return []
+
+    def size(self):
+        """
+        Returns the number of events in the wheel
+        :return: int
+        """
+        return self._size
+
+    # Various boolean functions
+
+    def is_not_empty(self):
+        """
+        Returns true if the wheel is not empty
+        :return: Boolean
+        """
+        return self._size > 0
+
+    def is_empty(self):
+        """
+        Returns true if the wheel is empty
+        :return: Boolean
+        """
+        return self._size == 0
+
+    # Iterator implementation
+
+    def __iter__(self):
+        """
+        Iterates over the events in order, without removing them
+        :return: Iterable
+        """
+        return (entry[2] for entry in sorted(self._entries()) if entry[1] not in self._removed)
+
+    def timed_iter(self, end_time):
+        """
+        Returns an iterator which iterates over all events up to and including the given time 'destructively', i.e.
+        the elements are popped from the wheel as they are iterated over. Once exhausted, the current time of the
+        wheel is end_time.
+        :param end_time: int
+        :return: Iterator
+        """
+        removed = self._removed
+        found = self._next_bucket(end_time)
+        while found is not None:
+            slot, bucket = found
+            # Events scheduled for the current time while iterating are appended to the same bucket
+            while bucket:
+                entry = bucket.popleft()
+                if removed and entry[1] in removed:
+                    removed.discard(entry[1])
+                    continue
+                self._index.remove(entry)
+                self._size -= 1
+                yield entry[2]
+            if self._slots[0][slot] is bucket:
+                self._clear_slot(0, slot)
+            found = self._next_bucket(end_time)
+
+    def copy(self, copy_event=None):
+        """
+        Returns a copy of the wheel, with every event replaced by copy_event(event). Entries keep their slots, so
+        the copy pops events in exactly the same order.
+        :param copy_event: (ScheduledEvent) -> ScheduledEvent? Defaults to keeping the events
+        :return: _TimingWheelQueue
+        """
+        removed = self._removed
+        if copy_event is None:
+            def copy_bucket(bucket):
+                return [entry for entry in bucket if entry[1] not in removed]
+        else:
+            def copy_bucket(bucket):
+                return [(entry[0], entry[1], copy_event(entry[2])) for entry in bucket if entry[1] not in removed]
+        queue = _TimingWheelQueue(self._now, self.compaction_threshold)
+        # Buckets emptied by dropping removed entries stay marked as occupied, popping skips over them
+        queue._slots = [[None if bucket is None else deque(copy_bucket(bucket)) for bucket in slots]
+                        for slots in self._slots]
+        queue._occupied = list(self._occupied)
+        queue._days = {day_number: copy_bucket(bucket) for day_number, bucket in self._days.items()}
+        queue._day_heap = list(self._day_heap)
+        queue._counter = itertools.count(next(self._counter))
+        queue._size = self._size
+        add_to_index = queue._index.add
+        for entry in queue._entries():
+            if entry[2].identifier is not None:
+                add_to_index(entry)
+        return queue
+
+    # Serialization, only the events are saved, in order, and the wheel is rebuilt when restoring
+
+    def __getstate__(self):
+        return self._now, self.compaction_threshold, list(self)
+
+    def __setstate__(self, state):
+        current_time, compaction_threshold, events = state
+        self.__init__(current_time, compaction_threshold)
+        self.add_batch(events)
+
+    # Wheel internals
+
+    def _entries(self):
+        """
+        Iterates over all entries in the wheel, including tombstones, in no particular order
+        :return: Iterable
+        """
+        for slots in self._slots:
+            for bucket in slots:
+                if bucket is not None:
+                    yield from bucket
+        for bucket in self._days.values():
+            yield from bucket
+
+    def _place(self, entry):
+        """
+        Puts the entry in the slot matching its time, relative to the current time of the wheel. Entries scheduled
+        before the current time are put in the slot of the current time.
+        :param entry: (int, int, ScheduledEvent)
+        :return: None
+        """
+        now = self._now
+        time = entry[0] if entry[0] > now else now
+        if time // day != now // day:
+            day_number = time // day
+            bucket = self._days.get(day_number)
+            if bucket is None:
+                self._days[day_number] = [entry]
+                heapq.heappush(self._day_heap, day_number)
+            else:
+                bucket.append(entry)
+            return
+        if time // second == now // second:
+            level = 0
+        elif time // minute == now // minute:
+            level = 1
+        elif time // hour == now // hour:
+            level = 2
+        else:
+            level = 3
+        granularity, slot_count = _WHEELS[level]
+        slot = (time // granularity) % slot_count
+        bucket = self._slots[level][slot]
+        if bucket is None:
+            self._slots[level][slot] = deque((entry,))
+            self._occupied[level] |= 1 << slot
+        else:
+            bucket.append(entry)
+
+    def _clear_slot(self, level, slot):
+        """
+        Marks the slot as empty
+        :param level: int
+        :param slot: int
+        :return: None
+        """
+        self._slots[level][slot] = None
+        self._occupied[level] &= ~(1 << slot)
+
+    def _next_slot(self):
+        """
+        Returns the level and slot of the first occupied slot, or None if the wheel is empty. Slots on finer levels
+        always precede those on coarser levels.
+        :return: (int, int)?
+        """
+        for level, mask in enumerate(self._occupied):
+            if mask:
+                return level, (mask & -mask).bit_length() - 1
+        if self._day_heap:
+            return _DAY_LEVEL, self._day_heap[0]
+        return None
+
+    def _slot_start(self, level, slot):
+        """
+        Returns the first time covered by the slot
+        :param level: int
+        :param slot: int
+        :return: int
+        """
+        if level == _DAY_LEVEL:
+            return slot * day
+        granularity, slot_count = _WHEELS[level]
+        span = granularity * slot_count
+        return (self._now // span) * span + slot * granularity
+
+    def _next_bucket(self, end_time):
+        """
+        Moves the current time to the first occupied millisecond slot up to and including end_time, cascading slots
+        on coarser levels as the current time passes them. If there is no such slot, returns None and sets the
+        current time to end_time.
+        :param end_time: int? None for no limit
+        :return: (int, deque)?
+        """
+        removed = self._removed
+        while True:
+            found = self._next_slot()
+            if found is None:
+                break
+            level, slot = found
+            start = self._slot_start(level, slot)
+            if end_time is not None and start > end_time:
+                break
+            self._now = start
+            if level == 0:
+                return slot, self._slots[0][slot]
+            if level == _DAY_LEVEL:
+                heapq.heappop(self._day_heap)
+                bucket = self._days.pop(slot)
+            else:
+                bucket = self._slots[level][slot]
+                self._clear_slot(level, slot)
+            for entry in bucket:
+                if removed and entry[1] in removed:
+                    removed.discard(entry[1])
+                else:
+                    self._place(entry)
+        if end_time is not None and end_time > self._now:
+            self._now = end_time
+        return None
+
+
+def _first_live(bucket, removed):
+    """
+    Returns the first live entry of the bucket in queue order, or None if all entries are tombstones
+    :param bucket: [(int, int, ScheduledEvent)]
+    :param removed: {int}
+        Sequence numbers of removed entries
+    :return: (int, int, ScheduledEvent)?
+    """
+    return min((entry for entry in bucket if entry[1] not in removed), default=None)
@@ -0,0 +1,139 @@
+class UnknownActionException(Exception):
+    pass
+
+
+class ActionAlreadyRegisteredException(Exception):
+    pass
+
+
+class ActionRegistry:
+    """
+    A registry of named functions. Events which should survive a checkpoint are scheduled with an Action, which refers
+    to its function by name, rather than with a lambda, which can not be serialized.
+
+    Methods
+
+        register(name: str, function: lambda) -> None
+            Registers the function under the given name
+            Throws ActionAlreadyRegisteredException
+
+        action(name: str) -> decorator
+            Decorator registering the decorated function under the given name
+
+        unregister(name: str) -> None
+            Removes the function of the given name, if there is one
+
+        resolve(name: str) -> lambda
+            Returns the function registered under the given name
+            Throws UnknownActionException
+    """
+
+    def __init__(self):
+        self._functions = {}
+
+    def register(self, name, function):
+        """
+        Registers the function under the given name
+        :param name: str
+        :param function: lambda
+        :return: None
+        :raises: ActionAlreadyRegisteredException
+        """
+        if self._functions.get(name, function) is not function:
+            raise ActionAlreadyRegisteredException
+        self._functions[name] = function
+
+    def action(self, name):
+        """
+        Decorator registering the decorated function under the given name
+        :param name: str
+        :return: decorator
+        """
+        def decorator(function):
+            self.register(name, function)
+            return function
+        return decorator
+
+    def unregister(self, name):
+        """
+        Removes the function of the given name, if there is one
+        :param name: str
+        :return: None
+        """
+        self._functions.pop(name, None)
+
+    def resolve(self, name):
+        """
+        Returns the function registered under the given name
+        :param name: str
+        :return: lambda
+        :raises: UnknownActionException
+        """
+        try:
+            return self._functions[name]
+        except KeyError:
+            raise UnknownActionException(name)
+
+
+action_registry = ActionRegistry()
+
+
+class Action:
+    """
+    A serializable stand-in for a function call, used as the scheduled_event of a ScheduledEvent. Calling the action
+    calls the function registered under its name in action_registry with its arguments, followed by any arguments
+    the action itself is called with (such as the number of periods of an aggregate PeriodicEvent).
+
+    The function is looked up when the action is called, so an action restored from a checkpoint calls whatever is
+    registered under its name in the restoring process.
+
+    Attributes
+
+        name: str
+            Name of the function in action_registry
+
+        args: tuple
+            Arguments to call the function with
+
+    Methods
+
+        fork(memo: dict) -> Action
+            Returns the action with its forked arguments replaced by their forks
+    """
+
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, *args):
+        """
+        :param name: str
+        :param args: Any
+        """
+        self.name = name
+        self.args = args
+
+    def __call__(self, *args):
+        return action_registry.resolve(self.name)(*self.args, *args)
+
+    def __eq__(self, other):
+        return isinstance(other, Action) and self.name == other.name and self.args == other.args
+
+    def __hash__(self):
+        return hash((self.name, self.args))
+
+    def __repr__(self):
+        return f"Action({', '.join(map(repr, (self.name,) + self.args))})"  # pragma: no cover
+
+    def fork(self, memo):
+        """
+        Returns the action with the arguments which have been forked with the memo replaced by their forks. If no
+        argument has been forked, returns the action itself.
+        :param memo: dict
+        :return: Action
+        """
+        for arg in self.args:
+            if id(arg) in memo:
+                return Action(self.name, *[memo.get(id(arg), arg) for arg in self.args])
+        return self
+
+    def __reduce__(self):
+        return Action, (self.name, *self.args)
@@ -0,0 +1,89 @@
+import pickle
+import zlib
+
+from src.agent_world.simulation.world import World
+
+
+class UnserializableStateException(Exception):
+    pass
+
+
+class InvalidCheckpointException(Exception):
+    pass
+
+
+# A checkpoint is the magic bytes, a flags byte and the pickled world, zlib compressed if the compressed flag is set
+_MAGIC = b"AWCP1"
+_COMPRESSED = 1
+
+
+def save_checkpoint(world: World, compress=True):
+    """
+    Serializes the world into a checkpoint. Events have to be scheduled with Actions (or other picklable callables)
+    rather than lambdas, as functions are saved by name.
+    :param world: World
+    :param compress: bool
+    :return: bytes
+    :raises: UnserializableStateException
+    """
+    try:
+        data = pickle.dumps(world, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError) as error:
+        raise UnserializableStateException(str(error)) from error
+    if compress:
+        return _MAGIC + bytes([_COMPRESSED]) + zlib.compress(data, 1)
+    return _MAGIC + bytes([0]) + data
+
+
+def load_checkpoint(checkpoint):
+    """
+    Restores a world from a checkpoint. Every call returns a new, independent world, so a single checkpoint can be
+    loaded any number of times to branch off from the same state.
+
+    Checkpoints are pickles, and loading a pickle can import modules and run arbitrary code, so only checkpoints
+    from a trusted source may be loaded. Checking the magic bytes does not make an untrusted checkpoint safe.
+    :param checkpoint: bytes
+    :return: World
+    :raises: InvalidCheckpointException
+    """
+    if checkpoint[:len(_MAGIC)] != _MAGIC or len(checkpoint) <= len(_MAGIC):
+        raise InvalidCheckpointException
+    flags = checkpoint[len(_MAGIC)]
+    data = checkpoint[len(_MAGIC) + 1:]
+    try:
+        if flags & _COMPRESSED:
+            data = zlib.decompress(data)
+        world = pickle.loads(data)
+    except Exception as error:
+        # Unpickling may fail in many ways, e.g. with an ImportError for a class which no longer exists, an
+        # AttributeError for one which was renamed or whatever a __setstate__ raises
+        raise InvalidCheckpointException(str(error)) from error
+    if not isinstance(world, World):
+        raise InvalidCheckpointException
+    return world
+
+
+def write_checkpoint(world: World, path, compress=True):
+    """
+    Serializes the world into a checkpoint file
+    :param world: World
+    :param path: str
+    :param compress: bool
+    :return: None
+    :raises: UnserializableStateException
+    """
+    checkpoint = save_checkpoint(world, compress)
+    with open(path, "wb") as file:
+        file.write(checkpoint)
+
+
+def read_checkpoint(path):
+    """
+    Restores a world from a checkpoint file. As with load_checkpoint, only files from a trusted source may be read,
+    as loading them can run arbitrary code.
+    :param path: str
+    :return: World
+    :raises: InvalidCheckpointException
+    """
+    with open(path, "rb") as file:
+        return load_checkpoint(file.read())
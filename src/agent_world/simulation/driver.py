@@ -0,0 +1,111 @@
+from src.agent_world.clock.clock import Clock
+from src.agent_world.scheduler.IScheduler import IScheduler
+
+
+class SimulationDriver:
+    """
+    Drives a Clock forward from event to event. Instead of advancing the clock in fixed steps, the driver asks the
+    schedulers subscribed to the clock when their next event is and sets the clock straight to that time, so no time
+    is spent on intervals in which nothing happens.
+
+    Attributes
+
+        clock: Clock
+            The clock being driven
+
+    Methods
+
+        next_event_time() -> int?
+            Returns the time of the next event of any scheduler subscribed to the clock
+
+        step() -> bool
+            Advances the clock to the next event
+
+        run_until(time: int, max_steps: int?) -> int
+            Advances the clock from event to event up to and including the given time
+
+        run_until_idle(max_steps: int?) -> int
+            Advances the clock from event to event until no events are left
+
+        run_steps(steps: int) -> int
+            Advances the clock to the next event the given number of times
+    """
+
+    def __init__(self, clock: Clock):
+        """
+        :param clock: Clock
+        """
+        self.clock = clock
+
+    def next_event_time(self):
+        """
+        Returns the time of the next event of any scheduler subscribed to the clock, or None if there are none.
+        Schedulers which tell the clock when they wake are looked up in the wake heap of the clock, only the others
+        are asked.
+        :return: int?
+        """
+        next_time = self.clock.next_wake_time()
+        for subscriber in self.clock.eager_subscribers():
+            if isinstance(subscriber, IScheduler):
+                time = subscriber.next_event_time()
+                if time is not None and (next_time is None or time < next_time):
+                    next_time = time
+        return next_time
+
+    def step(self):
+        """
+        Advances the clock to the next event. Events scheduled for the current time of the clock are executed by
+        advancing it by a single millisecond. Returns False if there are no events.
+        :return: bool
+        """
+        next_time = self.next_event_time()
+        if next_time is None:
+            return False
+        self.clock.set_time_to(max(next_time, self.clock.current_time() + 1))
+        return True
+
+    def run_until(self, time, max_steps=None):
+        """
+        Advances the clock from event to event up to and including the given time, and then sets it to that time.
+        If max_steps events are visited first, the clock is left at the last of them instead. Returns the number of
+        events visited.
+        :param time: int
+        :param max_steps: int?
+        :return: int
+        """
+        steps = 0
+        next_time = self.next_event_time()
+        while next_time is not None and next_time <= time and self.clock.current_time() < time:
+            if max_steps is not None and steps >= max_steps:
+                return steps
+            self.clock.set_time_to(max(next_time, self.clock.current_time() + 1))
+            steps += 1
+            next_time = self.next_event_time()
+        if self.clock.current_time() < time:
+            self.clock.set_time_to(time)
+        return steps
+
+    def run_until_idle(self, max_steps=None):
+        """
+        Advances the clock from event to event until no events are left, or until max_steps events have been
+        visited. Periodic events never run out, so max_steps should be given if there are any. Returns the number of
+        events visited.
+        :param max_steps: int?
+        :return: int
+        """
+        steps = 0
+        while (max_steps is None or steps < max_steps) and self.step():
+            steps += 1
+        return steps
+
+    def run_steps(self, steps):
+        """
+        Advances the clock to the next event the given number of times, stopping early if no events are left.
+        Returns the number of events visited.
+        :param steps: int
+        :return: int
+        """
+        taken = 0
+        while taken < steps and self.step():
+            taken += 1
+        return taken
@@ -0,0 +1,297 @@
+import asyncio
+import threading
+import time as wall_clock
+
+from src.agent_world.clock.clock import Clock
+from src.agent_world.global_params import second
+from src.agent_world.simulation.driver import SimulationDriver
+
+
+class InvalidSpeedException(Exception):
+    pass
+
+
+class LagMetrics:
+    """
+    How far the world time of a RealTimeDriver trails the time it should be at, in world milliseconds. The lag is
+    sampled at the end of every tick, so it is the world time the driver still has to make up after executing
+    everything that was due, i.e. 0 for a driver which keeps up and growing for an overloaded one.
+
+    Attributes
+
+        last: int
+            Lag of the latest tick
+
+        max: int
+            Largest lag seen
+
+        total: int
+            Sum of the lags of all ticks
+
+        samples: int
+            Number of ticks
+
+        behind: int
+            Number of ticks which could not fully catch up, because they ran into the step limit
+
+    Methods
+
+        mean() -> float
+            Returns the mean lag per tick
+    """
+
+    def __init__(self):
+        self.last = 0
+        self.max = 0
+        self.total = 0
+        self.samples = 0
+        self.behind = 0
+
+    def record(self, lag):
+        """
+        Adds a sample
+        :param lag: int
+        :return: None
+        """
+        self.last = lag
+        self.max = max(self.max, lag)
+        self.total += lag
+        self.samples += 1
+
+    def mean(self):
+        """
+        Returns the mean lag per tick
+        :return: float
+        """
+        return self.total / self.samples if self.samples else 0.0
+
+
+class RealTimeDriver(SimulationDriver):
+    """
+    Drives a Clock so that it follows wall time, at speed world milliseconds per wall millisecond. Between events
+    the driver sleeps until the next event is due, rather than polling, and when it has fallen behind it catches up
+    by executing everything that is due in one tick, at most max_steps events at a time.
+
+    The driver listens to the clock while it runs, so that work announced during a sleep which is due before the
+    sleep would end, e.g. an event scheduled earlier than the next one, or from another thread through the inbox of
+    an AsyncScheduler, cuts the sleep short. wake() does the same from anywhere.
+
+    Wall time is taken from time_source, in seconds. Waiting is done on a threading.Event, or an asyncio.Event in
+    run_async, which wake() sets, unless sleep or async_sleep are given, e.g. to run the driver against a simulated
+    wall clock in tests; those are not cut short.
+
+    Extends
+
+        SimulationDriver
+
+    Attributes
+
+        speed: float
+            World milliseconds per wall millisecond
+
+        max_steps: int?
+            Maximum number of events executed per tick, None for no limit
+
+        metrics: LagMetrics
+            Lag of the world time behind the target time
+
+    Methods
+
+        target_time() -> int
+            Returns the world time matching the current wall time
+
+        lag() -> int
+            Returns how far the world time trails the target time
+
+        set_speed(speed: float) -> None
+            Changes the speed from now on
+
+        wake() -> None
+            Cuts the current sleep short, from any thread
+
+        tick(end_time: int?) -> int
+            Catches up with the target time
+
+        run(end_time: int) -> None
+            Follows wall time until the world time reaches end_time
+
+        run_async(end_time: int) -> None
+            Coroutine following wall time as per run, without blocking the event loop
+    """
+
+    def __init__(self, clock: Clock, speed=1.0, max_steps=None, time_source=wall_clock.monotonic, sleep=None,
+                 async_sleep=None):
+        """
+        :param clock: Clock
+        :param speed: float
+        :param max_steps: int?
+        :param time_source: () -> float
+        :param sleep: (float) -> None? Defaults to waiting on the wake event
+        :param async_sleep: (float) -> Awaitable? Defaults to waiting on the async wake event
+        :raises: InvalidSpeedException
+        """
+        super().__init__(clock)
+        if speed <= 0:
+            raise InvalidSpeedException
+        self.speed = speed
+        self.max_steps = max_steps
+        self.metrics = LagMetrics()
+        self._time_source = time_source
+        self._sleep = sleep if sleep is not None else self._wait
+        self._async_sleep = async_sleep if async_sleep is not None else self._wait_async
+        self._woken = threading.Event()
+        # Event and loop of a running run_async, set from wake() through the loop
+        self._async_woken = None
+        self._loop = None
+        self._anchor_wall = time_source()
+        self._anchor_world = clock.current_time()
+
+    def target_time(self):
+        """
+        Returns the world time matching the current wall time
+        :return: int
+        """
+        elapsed = self._time_source() - self._anchor_wall
+        return self._anchor_world + round(elapsed * second * self.speed)
+
+    def lag(self):
+        """
+        Returns how far the world time trails the target time, in world milliseconds
+        :return: int
+        """
+        return max(0, self.target_time() - self.clock.current_time())
+
+    def set_speed(self, speed):
+        """
+        Changes the speed from now on, keeping the current target time
+        :param speed: float
+        :return: None
+        :raises: InvalidSpeedException
+        """
+        if speed <= 0:
+            raise InvalidSpeedException
+        self._anchor_world = self.target_time()
+        self._anchor_wall = self._time_source()
+        self.speed = speed
+        self.wake()
+
+    def wake(self):
+        """
+        Cuts the current sleep of run or run_async short, so that the driver looks at the clock again. Safe to call
+        from any thread.
+        :return: None
+        """
+        self._woken.set()
+        loop, event = self._loop, self._async_woken
+        if loop is not None and event is not None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop has closed
+                pass
+
+    def tick(self, end_time=None):
+        """
+        Executes everything due up to the target time, at most max_steps events, and moves the clock to the target
+        time if it caught up. Returns the number of events visited.
+        :param end_time: int? Time not to move the clock past
+        :return: int
+        """
+        target = self.target_time() if end_time is None else min(self.target_time(), end_time)
+        steps = self.run_until(target, self.max_steps)
+        if self.clock.current_time() < target:
+            self.metrics.behind += 1
+        self._record_lag(end_time)
+        return steps
+
+    def run(self, end_time):
+        """
+        Follows wall time until the world time reaches end_time, sleeping until the next event is due whenever the
+        clock has caught up
+        :param end_time: int
+        :return: None
+        """
+        self.clock.add_wake_listener(self.wake)
+        try:
+            while self.clock.current_time() < end_time:
+                # Cleared before looking at the clock, so that no wake after that is missed
+                self._woken.clear()
+                self.tick(end_time)
+                delay = self._delay(end_time)
+                if delay > 0:
+                    self._sleep(delay)
+        finally:
+            self.clock.remove_wake_listener(self.wake)
+
+    async def run_async(self, end_time):
+        """
+        Follows wall time as per run, sleeping with the async sleep, so that other tasks run in the meantime, and
+        advancing the clock with Clock.set_time_to_async
+        :param end_time: int
+        :return: None
+        """
+        self._loop = asyncio.get_running_loop()
+        self._async_woken = asyncio.Event()
+        self.clock.add_wake_listener(self.wake)
+        try:
+            while self.clock.current_time() < end_time:
+                self._async_woken.clear()
+                target = min(self.target_time(), end_time)
+                steps = 0
+                next_time = self.next_event_time()
+                while next_time is not None and next_time <= target and \
+                        (self.max_steps is None or steps < self.max_steps):
+                    await self.clock.set_time_to_async(max(next_time, self.clock.current_time() + 1))
+                    steps += 1
+                    next_time = self.next_event_time()
+                if next_time is not None and next_time <= target:
+                    self.metrics.behind += 1
+                elif self.clock.current_time() < target:
+                    await self.clock.set_time_to_async(target)
+                self._record_lag(end_time)
+                delay = self._delay(end_time)
+                if delay > 0:
+                    await self._async_sleep(delay)
+        finally:
+            self.clock.remove_wake_listener(self.wake)
+            self._loop = self._async_woken = None
+
+    def _record_lag(self, end_time):
+        """
+        Samples the lag
+        :param end_time: int? Time not to move the clock past
+        :return: None
+        """
+        target = self.target_time() if end_time is None else min(self.target_time(), end_time)
+        self.metrics.record(max(0, target - self.clock.current_time()))
+
+    def _wait(self, seconds):
+        """
+        Sleeps for seconds, or until wake() is called
+        :param seconds: float
+        :return: None
+        """
+        self._woken.wait(seconds)
+
+    async def _wait_async(self, seconds):
+        """
+        Coroutine sleeping for seconds, or until wake() is called
+        :param seconds: float
+        :return: None
+        """
+        try:
+            await asyncio.wait_for(self._async_woken.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _delay(self, end_time):
+        """
+        Returns the wall time in seconds until the next event or end_time, whichever comes first, is due. Returns 0
+        if the driver is behind.
+        :param end_time: int
+        :return: float
+        """
+        next_time = self.next_event_time()
+        wake = end_time if next_time is None else min(next_time, end_time)
+        ahead = wake - self.target_time()
+        return ahead / (second * self.speed) if ahead > 0 else 0
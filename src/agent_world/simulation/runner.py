@@ -0,0 +1,174 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.agent_world.simulation.driver import SimulationDriver
+from src.agent_world.statistics.columnar_log import ColumnarLog
+
+
+class ReplicaResult:
+    """
+    The outcome of a single replica
+
+    Attributes
+
+        seed: int
+            Seed the replica was built with
+
+        time: int
+            Time of the clock of the world when the replica finished
+
+        statistics: ColumnarLog?
+            The statistics log of the world, if it had a statistics handler
+
+        value: Any
+            What the collect function returned for the world, None if there is no collect function
+    """
+
+    __slots__ = ("seed", "time", "statistics", "value")
+
+    def __init__(self, seed, time, statistics=None, value=None):
+        """
+        :param seed: int
+        :param time: int
+        :param statistics: ColumnarLog?
+        :param value: Any
+        """
+        self.seed = seed
+        self.time = time
+        self.statistics = statistics
+        self.value = value
+
+    def __reduce__(self):
+        return ReplicaResult, (self.seed, self.time, self.statistics, self.value)
+
+
+class ReplicaRunner:
+    """
+    Runs independent replicas of a simulation, one per seed, across a pool of processes. Each replica builds a world
+    with world_factory(seed, rng), where rng is a random.Random seeded with the seed alone, so a replica gives the
+    same result no matter which process or chunk it runs in. The world is then driven from event to event up to
+    end_time.
+
+    Seeds are sent to the processes in chunks, and every process only sends back a ReplicaResult per replica, with
+    the statistics log in columnar form, rather than the world. The world factory and collect function are pickled
+    to the processes, so they have to be defined at module level.
+
+    Attributes
+
+        world_factory: (int, random.Random) -> World
+            Builds the world of a replica
+
+        end_time: int
+            Time to run every replica until
+
+        collect: (World) -> Any?
+            Extracts the value of a finished replica
+
+        max_workers: int
+            Number of processes. With a single worker the replicas are run in this process.
+
+        chunk_size: int?
+            Number of seeds per chunk, None to split the seeds in four chunks per worker
+
+    Methods
+
+        iter_results(seeds: [int]) -> Iterator[ReplicaResult]
+            Runs a replica per seed, yielding results chunk by chunk as they finish
+
+        run(seeds: [int]) -> [ReplicaResult]
+            Runs a replica per seed, returning the results in the order of the seeds
+    """
+
+    def __init__(self, world_factory, end_time, collect=None, max_workers=None, chunk_size=None):
+        """
+        :param world_factory: (int, random.Random) -> World
+        :param end_time: int
+        :param collect: (World) -> Any?
+        :param max_workers: int? Defaults to the number of cores
+        :param chunk_size: int?
+        """
+        self.world_factory = world_factory
+        self.end_time = end_time
+        self.collect = collect
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def iter_results(self, seeds):
+        """
+        Runs a replica per seed, yielding the results chunk by chunk as they finish, i.e. not in the order of the
+        seeds
+        :param seeds: [int]
+        :return: Iterator[ReplicaResult]
+        """
+        for _, results in self._run_chunks(self._chunks(list(seeds))):
+            yield from results
+
+    def run(self, seeds):
+        """
+        Runs a replica per seed, returning the results in the order of the seeds, with a result per occurrence of a
+        seed which is given more than once
+        :param seeds: [int]
+        :return: [ReplicaResult]
+        """
+        chunks = self._chunks(list(seeds))
+        results = [None] * len(chunks)
+        for position, chunk_results in self._run_chunks(chunks):
+            results[position] = chunk_results
+        return [result for chunk_results in results for result in chunk_results]
+
+    def _run_chunks(self, chunks):
+        """
+        Runs the chunks, yielding the position of every chunk along with its results as they finish
+        :param chunks: [[int]]
+        :return: Iterator[(int, [ReplicaResult])]
+        """
+        if self.max_workers <= 1:
+            for position, chunk in enumerate(chunks):
+                yield position, run_replicas(self.world_factory, self.end_time, self.collect, chunk)
+            return
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(run_replicas, self.world_factory, self.end_time, self.collect, chunk): position
+                       for position, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _chunks(self, seeds):
+        """
+        Splits the seeds in chunks
+        :param seeds: [int]
+        :return: [[int]]
+        """
+        size = self.chunk_size or max(1, math.ceil(len(seeds) / (4 * self.max_workers)))
+        return [seeds[start:start + size] for start in range(0, len(seeds), size)]
+
+
+def run_replica(world_factory, end_time, collect, seed):
+    """
+    Builds the world of the seed, runs it until end_time and returns its result
+    :param world_factory: (int, random.Random) -> World
+    :param end_time: int
+    :param collect: (World) -> Any?
+    :param seed: int
+    :return: ReplicaResult
+    """
+    world = world_factory(seed, random.Random(seed))
+    SimulationDriver(world.clock).run_until(end_time)
+    statistics = None
+    if world.statistics is not None:
+        statistics = ColumnarLog.from_records(world.statistics.query_keys([]))
+    value = collect(world) if collect is not None else None
+    return ReplicaResult(seed, world.clock.current_time(), statistics, value)
+
+
+def run_replicas(world_factory, end_time, collect, seeds):
+    """
+    Runs a chunk of replicas, as per run_replica
+    :param world_factory: (int, random.Random) -> World
+    :param end_time: int
+    :param collect: (World) -> Any?
+    :param seeds: [int]
+    :return: [ReplicaResult]
+    """
+    return [run_replica(world_factory, end_time, collect, seed) for seed in seeds]
@@ -0,0 +1,74 @@
+import copy
+
+from src.agent_world.clock.clock import Clock
+from src.agent_world.scheduler.IScheduler import IScheduler
+
+
+class World:
+    """
+    Container for the state of a simulation, i.e. everything a checkpoint saves and restores
+
+    Attributes
+
+        clock: Clock
+            The clock driving the simulation. Schedulers and other delegates subscribed to the clock are part of the
+            world through it.
+
+        wallets: dict
+            Wallets, by name
+
+        boards: dict
+            Game boards, by name
+
+        statistics: StatisticsHandler?
+            Handler holding the statistics log of the simulation
+
+        data: dict
+            Any other state of the simulation, by name
+
+    Methods
+
+        schedulers() -> [IScheduler]
+            Returns the schedulers subscribed to the clock
+
+        fork() -> World
+            Returns a copy of the world which shares unchanged state with this world
+    """
+
+    def __init__(self, clock=None, wallets=None, boards=None, statistics=None, data=None):
+        """
+        :param clock: Clock? Defaults to a new Clock
+        :param wallets: dict?
+        :param boards: dict?
+        :param statistics: StatisticsHandler?
+        :param data: dict?
+        """
+        self.clock = clock if clock is not None else Clock()
+        self.wallets = wallets if wallets is not None else {}
+        self.boards = boards if boards is not None else {}
+        self.statistics = statistics
+        self.data = data if data is not None else {}
+
+    def schedulers(self):
+        """
+        Returns the schedulers subscribed to the clock, in the order they subscribed
+        :return: [IScheduler]
+        """
+        return [subscriber for subscriber in self.clock.subscribers() if isinstance(subscriber, IScheduler)]
+
+    def fork(self):
+        """
+        Returns a copy of the world. The clock, its subscribers, the wallets and the boards are forked copy on write,
+        and Actions scheduled with any of them as arguments are pointed at their forks. The statistics handler and
+        data are deep copied, sharing the memo.
+        :return: World
+        """
+        memo = {}
+        clock = self.clock.fork(memo)
+        wallets = {name: wallet.fork(memo) for name, wallet in self.wallets.items()}
+        boards = {name: board.fork(memo) for name, board in self.boards.items()}
+        fork = World(clock, wallets, boards)
+        memo[id(self)] = fork
+        fork.statistics = copy.deepcopy(self.statistics, memo)
+        fork.data = copy.deepcopy(self.data, memo)
+        return fork
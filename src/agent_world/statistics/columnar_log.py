@@ -0,0 +1,140 @@
+import numpy as np
+
+
+class ColumnarLog:
+    """
+    A compact, read only form of a statistics log, i.e. a list of dictionaries. Every key is stored once, with a
+    column holding its value in each record. Columns whose values are all ints, floats or bools are numpy arrays of
+    the smallest type that fits (columns mixing ints and floats become floats). Other columns are lists, with None
+    where a record lacks the key, and columns with repeating values are stored as their distinct values plus an
+    array of positions. Which records lack a key is kept apart from the columns, so that a None which was recorded
+    is told apart from a missing key.
+
+    Attributes
+
+        columns: dict
+            Column of each key, in compact form
+
+        length: int
+            Number of records
+
+        missing: dict
+            Mask of the records lacking each key, for the keys some record lacks
+
+    Methods
+
+        from_records(records: [dict]) -> ColumnarLog
+            Builds the log from a list of dictionaries
+
+        records() -> [dict]
+            Returns the log as a list of dictionaries again
+
+        column(key) -> np.ndarray | list
+            Returns the column of the given key
+    """
+
+    def __init__(self, columns, length, missing=None):
+        """
+        :param columns: dict
+        :param length: int
+        :param missing: dict?
+        """
+        self.columns = columns
+        self.length = length
+        self.missing = missing if missing is not None else {}
+
+    def __len__(self):
+        return self.length
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds the log from a list of dictionaries
+        :param records: [dict]
+        :return: ColumnarLog
+        """
+        columns = {}
+        gaps = {}
+        for position, record in enumerate(records):
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * position
+                    if position:
+                        gaps[key] = list(range(position))
+                column.append(value)
+            for key, column in columns.items():
+                if len(column) == position:
+                    column.append(None)
+                    gaps.setdefault(key, []).append(position)
+        missing = {}
+        for key, positions in gaps.items():
+            mask = missing[key] = np.zeros(len(records), dtype=bool)
+            mask[positions] = True
+        return cls({key: _compact(column) for key, column in columns.items()}, len(records), missing)
+
+    def records(self):
+        """
+        Returns the log as a list of dictionaries again. Keys a record did not have are left out.
+        :return: [dict]
+        """
+        columns = [(key, _expand(column), self.missing[key].tolist() if key in self.missing else None)
+                   for key, column in self.columns.items()]
+        return [{key: column[position] for key, column, missing in columns if missing is None or not missing[position]}
+                for position in range(self.length)]
+
+    def column(self, key):
+        """
+        Returns the column of the given key, as a numpy array for numeric columns and as a list otherwise
+        :param key: Hashable
+        :return: np.ndarray | list
+        """
+        column = self.columns[key]
+        return _expand(column) if isinstance(column, tuple) else column
+
+
+def _compact(column):
+    """
+    Returns the column as a numpy array of the smallest fitting type if all its values are ints, floats or bools.
+    Otherwise, if its values repeat, returns it as a list of the distinct values and an array of positions in that
+    list. Otherwise returns it as is.
+    :param column: list
+    :return: np.ndarray | ([Any], np.ndarray) | list
+    """
+    kinds = {type(value) for value in column}
+    if not kinds:
+        return column
+    if kinds <= {bool}:
+        return np.array(column, dtype=bool)
+    if kinds <= {int}:
+        low, high = min(column), max(column)
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                return np.array(column, dtype=dtype)
+        return column
+    if kinds <= {int, float}:
+        return np.array(column, dtype=np.float64)
+    try:
+        # Keyed by type as well, as equal values of different types, such as 1, 1.0 and True, must not be merged
+        codes = {}
+        positions = [codes.setdefault((type(value), value), len(codes)) for value in column]
+    except TypeError:
+        return column
+    if 2 * len(codes) > len(column):
+        return column
+    dtype = np.uint8 if len(codes) <= 256 else np.uint16 if len(codes) <= 65536 else np.uint32
+    return [value for _, value in codes], np.array(positions, dtype=dtype)
+
+
+def _expand(column):
+    """
+    Reverses _compact, returning the column as a list
+    :param column: np.ndarray | ([Any], np.ndarray) | list
+    :return: list
+    """
+    if isinstance(column, np.ndarray):
+        return column.tolist()
+    if isinstance(column, tuple):
+        values, positions = column
+        return [values[position] for position in positions.tolist()]
+    return column
@@ -0,0 +1,103 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.agent_world.board.exceptions import InvalidCoordinateException
+from src.agent_world.board.hex.chunked_hex_board import ChunkedHexBoard, ChunkStore
+from src.agent_world.board.hex.hex_board import SquareAlreadyHasContentException
+
+
+def _squares(radius):
+    return [(x, y, -x - y) for x in range(-radius, radius + 1) for y in range(-radius, radius + 1)
+            if abs(x + y) <= radius]
+
+
+def test_content_and_attributes():
+    board = ChunkedHexBoard(radius=10, chunk_size=4, attributes={"height": np.float32})
+    square = board.get_coordinate(-3, 7, -4)
+    assert square.get_content() is None
+    square.add("tree")
+    assert "tree" == board.get_coordinate(-3, 7, -4).get_content()
+    with pytest.raises(SquareAlreadyHasContentException):
+        square.add("rock")
+    board.set_attribute(-3, 7, -4, "height", 2.5)
+    assert 2.5 == board.attribute(-3, 7, -4, "height")
+    assert 0 == board.attribute(3, -7, 4, "height")
+    square.remove("tree")
+    assert square.get_content() is None
+    for coordinates in [(11, -11, 0), (1, 1, 1)]:
+        with pytest.raises(InvalidCoordinateException):
+            board.get_coordinate(*coordinates)
+
+
+def test_chunks_created_on_first_touch():
+    board = ChunkedHexBoard(chunk_size=8)
+    assert 0 == board.chunks()
+    board.get_coordinate(0, 0, 0)
+    assert 0 == board.chunks()
+    board.get_coordinate(1000000, -2000000, 1000000).add("far")
+    board.get_coordinate(-5, 0, 5).get_content()
+    assert 2 == board.chunks()
+    assert "far" == board.get_coordinate(1000000, -2000000, 1000000).get_content()
+
+
+def test_paging_out_and_in():
+    board = ChunkedHexBoard(radius=20, chunk_size=4, max_resident=3, attributes={"terrain": np.int16})
+    squares = _squares(20)
+    for i, (x, y, z) in enumerate(squares):
+        if i % 3 == 0:
+            board.get_coordinate(x, y, z).add(i)
+        board.set_attribute(x, y, z, "terrain", i % 100)
+    assert 3 == board.resident_chunks()
+    assert board.chunks() > 3
+    assert board.chunks() - 3 <= board.store.used()
+    for i, (x, y, z) in enumerate(squares):
+        assert (i if i % 3 == 0 else None) == board.get_coordinate(x, y, z).get_content()
+        assert i % 100 == board.attribute(x, y, z, "terrain")
+    # Paging clean chunks out again does not take more of the store
+    used = board.store.used()
+    for x, y, z in squares:
+        board.get_coordinate(x, y, z).get_content()
+    assert used == board.store.used()
+
+
+def test_fork_copies_on_write():
+    board = ChunkedHexBoard(chunk_size=4, max_resident=2)
+    for q in range(0, 40, 4):
+        board.get_coordinate(q, -q, 0).add(q)
+    fork = board.fork()
+    fork.get_coordinate(0, 0, 0).remove(0)
+    fork.get_coordinate(36, -36, 0).remove(36)
+    fork.get_coordinate(1, -1, 0).add("fork")
+    board.get_coordinate(4, -4, 0).remove(4)
+    for q in range(0, 40, 4):
+        assert (None if q == 4 else q) == board.get_coordinate(q, -q, 0).get_content()
+        assert (None if q in (0, 36) else q) == fork.get_coordinate(q, -q, 0).get_content()
+    assert board.get_coordinate(1, -1, 0).get_content() is None
+    assert "fork" == fork.get_coordinate(1, -1, 0).get_content()
+
+
+def test_store_slots_are_reference_counted():
+    store = ChunkStore(np.int32, 4)
+    chunk = np.arange(4, dtype=np.int32)
+    slot = store.write(None, chunk)
+    assert slot == store.write(slot, chunk + 1)
+    store.share(slot)
+    other = store.write(slot, chunk + 2)
+    assert other != slot
+    assert [1, 2, 3, 4] == store.read(slot).tolist()
+    assert [2, 3, 4, 5] == store.read(other).tolist()
+    store.release(slot)
+    assert 1 == store.used()
+    assert slot == store.write(None, chunk)
+
+
+def test_pickle():
+    board = ChunkedHexBoard(radius=12, chunk_size=4, max_resident=2)
+    for i, (x, y, z) in enumerate(_squares(12)[::7]):
+        board.get_coordinate(x, y, z).add(i)
+    copy = pickle.loads(pickle.dumps(board))
+    for i, (x, y, z) in enumerate(_squares(12)[::7]):
+        assert i == copy.get_coordinate(x, y, z).get_content()
+    assert board.chunks() == copy.chunks()
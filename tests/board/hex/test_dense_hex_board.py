@@ -0,0 +1,76 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.agent_world.board.exceptions import InvalidCoordinateException
+from src.agent_world.board.hex.dense_hex_board import HexIndexer, DenseCircleHexBoard
+from src.agent_world.board.hex.hex_board import CircleHexBoard, SquareAlreadyHasContentException
+
+
+def test_indexer_round_trip():
+    indexer = HexIndexer(4)
+    assert 61 == indexer.size
+    coordinates = [(x, y, -x - y) for x in range(-4, 5) for y in range(-4, 5) if abs(x + y) <= 4]
+    assert list(range(indexer.size)) == [indexer.index(*c) for c in coordinates]
+    assert coordinates == [indexer.coordinates(index) for index in range(indexer.size)]
+    xs, ys, zs = indexer.all_coordinates()
+    assert coordinates == list(zip(xs.tolist(), ys.tolist(), zs.tolist()))
+
+
+def test_indexer_invalid():
+    indexer = HexIndexer(2)
+    for coordinates in [(1, 1, 1), (3, -3, 0), (-3, 1, 2)]:
+        assert not indexer.contains(*coordinates)
+        with pytest.raises(InvalidCoordinateException):
+            indexer.index(*coordinates)
+    with pytest.raises(InvalidCoordinateException):
+        indexer.coordinates(indexer.size)
+
+
+def test_squares():
+    board = DenseCircleHexBoard(3)
+    square = board.get_coordinate(1, -2, 1)
+    assert square.get_content() is None and (1, -2, 1) == square.coordinates()
+    square.add("tree")
+    assert "tree" == board.get_coordinate(1, -2, 1).get_content()
+    assert square == board.get_coordinate(1, -2, 1)
+    with pytest.raises(SquareAlreadyHasContentException):
+        board.get_coordinate(1, -2, 1).add("rock")
+    board.get_coordinate(0, 0, 0).add("rock")
+    assert 2 == board.occupancy().sum()
+    square.remove("tree")
+    assert square.get_content() is None
+    board.get_coordinate(3, 0, -3).add("bush")
+    assert "bush" == board.content(board.content_ids()[board.indexer.index(3, 0, -3)])
+    assert 37 == len(list(board)) == board.size()
+
+
+def test_attributes():
+    board = DenseCircleHexBoard(2)
+    terrain = board.add_attribute("terrain", np.int8, 1)
+    terrain[board.indexer.index(0, 0, 0)] = 3
+    assert 3 == board.attribute("terrain")[board.indexer.index(0, 0, 0)]
+    assert board.size() + 2 == board.attribute("terrain").sum()
+
+
+def test_fork_and_pickle():
+    board = DenseCircleHexBoard(2)
+    board.add_attribute("terrain")
+    board.get_coordinate(0, 0, 0).add("tree")
+    fork = board.fork()
+    fork.get_coordinate(0, 0, 0).remove("tree")
+    fork.get_coordinate(1, 0, -1).add("rock")
+    fork.attribute("terrain")[0] = 5
+    assert "tree" == board.get_coordinate(0, 0, 0).get_content()
+    assert board.get_coordinate(1, 0, -1).get_content() is None
+    assert 0 == board.attribute("terrain")[0]
+    restored = pickle.loads(pickle.dumps(fork))
+    assert "rock" == restored.get_coordinate(1, 0, -1).get_content()
+    assert 5 == restored.attribute("terrain")[0]
+
+
+def test_circle_board_preload():
+    board = CircleHexBoard(5, lazy_loading=False)
+    assert 91 == len(list(board))
+    assert pickle.loads(pickle.dumps(board)).get_coordinate(5, -5, 0).get_content() is None
@@ -0,0 +1,93 @@
+import numpy as np
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.dense_hex_board import HexIndexer, DenseCircleHexBoard
+from src.agent_world.board.hex.hex_board import hex_to_cartesian
+
+
+def _squares(coordinates):
+    return [tuple(c) for c in np.asarray(coordinates).tolist()]
+
+
+def test_hex_to_cartesian_arrays():
+    x, y = hex_to_cartesian(2, -3, 1)
+    assert np.isclose(x, 2.5) and np.isclose(y, np.sqrt(3) / 2)
+    xs, ys, zs = HexIndexer(3).all_coordinates()
+    cartesian_xs, cartesian_ys = hex_to_cartesian(xs, ys, zs)
+    assert cartesian_xs.shape == xs.shape
+    for i in range(len(xs)):
+        assert np.allclose((cartesian_xs[i], cartesian_ys[i]), hex_to_cartesian(int(xs[i]), int(ys[i]), int(zs[i])))
+
+
+def test_distance_and_neighbors():
+    assert 0 == hex_geometry.distance((1, -1, 0), (1, -1, 0))
+    assert 3 == hex_geometry.distance((0, 0, 0), (2, -3, 1))
+    center = np.array([(0, 0, 0), (2, -1, -1)])
+    neighbors = hex_geometry.neighbors(center)
+    assert (2, 6, 3) == neighbors.shape
+    assert (neighbors.sum(axis=-1) == 0).all()
+    assert (hex_geometry.distance(neighbors, center[:, None, :]) == 1).all()
+    assert 6 == len(set(_squares(neighbors[1])))
+
+
+def test_axial_round_trip():
+    cube = hex_geometry.axial_to_cube([1, -2], [3, 0])
+    assert [(1, -4, 3), (-2, 2, 0)] == _squares(cube)
+    q, r = hex_geometry.cube_to_axial(cube)
+    assert [1, -2] == q.tolist() and [3, 0] == r.tolist()
+
+
+def test_ring_spiral_and_range():
+    center = (1, 2, -3)
+    assert [center] == _squares(hex_geometry.ring(center, 0))
+    for radius in range(1, 5):
+        ring = hex_geometry.ring(center, radius)
+        assert 6 * radius == len(set(_squares(ring)))
+        assert (hex_geometry.distance(ring, center) == radius).all()
+        # Consecutive squares of a ring are neighbours
+        assert (hex_geometry.distance(ring, np.roll(ring, 1, axis=0)) == 1).all()
+    spiral = hex_geometry.spiral(center, 4)
+    distances = hex_geometry.distance(spiral, center)
+    assert (np.diff(distances) >= 0).all()
+    expected = {(x + 1, y + 2, -x - y - 3) for x in range(-4, 5) for y in range(-4, 5) if abs(x + y) <= 4}
+    assert expected == set(_squares(spiral))
+    assert sorted(expected) == _squares(hex_geometry.hex_range(center, 4))
+
+
+def test_line():
+    assert [(0, 0, 0)] == _squares(hex_geometry.line((0, 0, 0), (0, 0, 0)))
+    a, b = (-3, 1, 2), (4, -2, -2)
+    line = hex_geometry.line(a, b)
+    assert 8 == len(line)
+    assert (a, b) == (_squares(line)[0], _squares(line)[-1])
+    assert (line.sum(axis=-1) == 0).all()
+    assert (hex_geometry.distance(line[1:], line[:-1]) == 1).all()
+
+
+def test_cube_round():
+    rounded = hex_geometry.cube_round([(0.3, 0.45, -0.75), (1.6, -0.7, -0.9)])
+    assert [(0, 1, -1), (2, -1, -1)] == _squares(rounded)
+
+
+def test_line_of_sight_and_nearest_free():
+    board = DenseCircleHexBoard(3)
+    assert hex_geometry.line_of_sight((-2, 0, 2), (2, 0, -2), board.occupied)
+    board.get_coordinate(0, 0, 0).add("wall")
+    assert not hex_geometry.line_of_sight((-2, 0, 2), (2, 0, -2), board.occupied)
+    assert hex_geometry.line_of_sight((-1, 0, 1), (0, 0, 0), board.occupied)
+    assert (0, 0, 0) != board.nearest_free(0, 0, 0)
+    assert 1 == hex_geometry.distance(board.nearest_free(0, 0, 0), (0, 0, 0))
+    assert (1, -1, 0) == board.nearest_free(1, -1, 0)
+    assert board.nearest_free(0, 0, 0, max_distance=0) is None
+    for square in board:
+        if square.get_content() is None:
+            square.add("wall")
+    assert board.nearest_free(3, 0, -3) is None
+
+
+def test_indexer_indices():
+    indexer = HexIndexer(2)
+    xs, ys, zs = indexer.all_coordinates()
+    coordinates = np.stack([xs, ys, zs], axis=-1)
+    assert list(range(indexer.size)) == indexer.indices(coordinates).tolist()
+    assert [-1, -1, -1] == indexer.indices([(1, 1, 1), (3, -3, 0), (-3, 1, 2)]).tolist()
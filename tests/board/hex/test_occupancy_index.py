@@ -0,0 +1,121 @@
+import pickle
+
+import pytest
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+from src.agent_world.board.hex.occupancy_index import OccupancyIndex
+
+
+class Tree:
+    pass
+
+
+class Pine(Tree):
+    pass
+
+
+def _brute_count(board, center, radius):
+    return sum(1 for square in hex_geometry.spiral(center, radius).tolist()
+               if max(map(abs, square)) <= board.occupancy().indexer.radius
+               and board.get_coordinate(*square).get_content() is not None)
+
+
+@pytest.mark.parametrize("lazy_loading", [True, False])
+def test_squares_keep_index_up_to_date(lazy_loading):
+    board = CircleHexBoard(6, lazy_loading=lazy_loading)
+    tree, pine = Tree(), Pine()
+    board.get_coordinate(1, -1, 0).add(tree)
+    board.get_coordinate(-3, 5, -2).add(pine)
+    board.get_coordinate(0, 0, 0).add("rock")
+    index = board.occupancy()
+    assert index.is_occupied(1, -1, 0) and not index.is_occupied(1, 0, -1)
+    assert 3 == index.occupancy().sum()
+    assert [(-3, 5, -2), (1, -1, 0)] == board.squares_with(Tree)
+    assert [(-3, 5, -2)] == board.squares_with(Pine)
+    assert [(0, 0, 0)] == board.squares_with(str)
+    board.get_coordinate(1, -1, 0).remove(tree)
+    board.get_coordinate(1, -1, 0).remove(tree)
+    assert not index.is_occupied(1, -1, 0)
+    assert [(-3, 5, -2)] == board.squares_with(Tree)
+    assert 2 == index.occupancy().sum()
+
+
+def test_squares_outside_circle_are_not_indexed():
+    board = CircleHexBoard(3)
+    square = board.get_coordinate(-5, 2, 3)
+    square.add("x")
+    assert "x" == square.get_content()
+    assert 0 == board.count_occupied(0, 0, 0, 3)
+    assert (0, 0, 0) == board.nearest_free(0, 0, 0)
+    square.remove("x")
+    assert 0 == board.count_occupied(0, 0, 0, 3)
+
+
+def test_count_occupied_matches_scan():
+    board = CircleHexBoard(12)
+    for i, square in enumerate(hex_geometry.spiral((0, 0, 0), 12).tolist()):
+        if i % 3 == 0 or i % 7 == 0:
+            board.get_coordinate(*square).add(i)
+    for center, radius in [((0, 0, 0), 0), ((0, 0, 0), 12), ((3, -5, 2), 4), ((11, -11, 0), 6), ((-12, 0, 12), 30),
+                           ((2, 2, -4), 9)]:
+        assert _brute_count(board, center, radius) == board.count_occupied(*center, radius)
+    assert 3 * 12 * 13 + 1 == board.occupancy().count_on_board(0, 0, 0, 24)
+    assert 7 == board.occupancy().count_on_board(0, 0, 0, 1)
+    assert 4 == board.occupancy().count_on_board(12, -12, 0, 1)
+
+
+def test_nearest_free():
+    board = CircleHexBoard(3)
+    assert (0, 0, 0) == board.nearest_free(0, 0, 0)
+    for square in hex_geometry.spiral((0, 0, 0), 1).tolist():
+        board.get_coordinate(*square).add("wall")
+    assert board.nearest_free(0, 0, 0, max_distance=1) is None
+    board.get_coordinate(0, 3, -3).add("wall")
+    for coordinates in hex_geometry.ring((0, 0, 0), 2).tolist():
+        board.get_coordinate(*coordinates).add("wall")
+    assert board.nearest_free(0, 0, 0, max_distance=2) is None
+    assert (0, 0, 0) != board.nearest_free(0, 0, 0, max_distance=3)
+    for coordinates in hex_geometry.ring((0, 0, 0), 2).tolist():
+        board.get_coordinate(*coordinates).remove("wall")
+    assert 2 == hex_geometry.distance(board.nearest_free(0, 0, 0), (0, 0, 0))
+    for coordinates in hex_geometry.spiral((0, 0, 0), 3).tolist():
+        square = board.get_coordinate(*coordinates)
+        if square.get_content() is None:
+            square.add("wall")
+    assert board.nearest_free(0, 0, 0) is None
+    board.get_coordinate(-3, 3, 0).remove("wall")
+    assert (-3, 3, 0) == board.nearest_free(2, -1, -1)
+
+
+def test_fork_has_own_index():
+    board = CircleHexBoard(4, lazy_loading=False)
+    board.get_coordinate(0, 0, 0).add("rock")
+    fork = board.fork()
+    fork.get_coordinate(1, -1, 0).add("tree")
+    fork.get_coordinate(0, 0, 0).remove("rock")
+    board.get_coordinate(2, -1, -1).add("bush")
+    assert [(0, 0, 0), (2, -1, -1)] == board.squares_with(str)
+    assert [(1, -1, 0)] == fork.squares_with(str)
+    assert 2 == board.count_occupied(0, 0, 0, 4)
+    assert 1 == fork.count_occupied(0, 0, 0, 4)
+
+
+def test_index_restored_by_pickle():
+    board = CircleHexBoard(4)
+    board.get_coordinate(1, 2, -3).add("tree")
+    copy = pickle.loads(pickle.dumps(board))
+    assert [(1, 2, -3)] == copy.squares_with(str)
+    copy.get_coordinate(1, 2, -3).remove("tree")
+    assert 0 == copy.count_occupied(0, 0, 0, 4)
+    assert 1 == board.count_occupied(0, 0, 0, 4)
+
+
+def test_index_fork_copies_on_write():
+    index = OccupancyIndex(2)
+    index.add(0, "a")
+    fork = index.fork()
+    fork.add(1, "b")
+    index.remove(0, "a")
+    assert [] == index.squares_with(str)
+    assert 2 == fork.occupancy().sum()
@@ -0,0 +1,140 @@
+import random
+from math import inf
+
+import numpy as np
+import pytest
+
+from src.agent_world.board.hex import hex_geometry
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+from src.agent_world.board.hex.pathfinding import Pathfinder, InvalidCostException
+
+
+def _path_cost(pathfinder, path):
+    return sum(pathfinder.cost(*square) for square in path[1:])
+
+
+def _walled_board():
+    # A wall along x == 0 with a single gap at the edge of the board
+    board = CircleHexBoard(5)
+    for y in range(-4, 6):
+        board.get_coordinate(0, y, -y).add("wall")
+    return board
+
+
+def test_path_goes_around_content():
+    board = _walled_board()
+    pathfinder = Pathfinder(board)
+    path = pathfinder.path((-2, 0, 2), (2, 0, -2))
+    assert (-2, 0, 2) == path[0] and (2, 0, -2) == path[-1]
+    assert (0, -5, 5) in path
+    assert all(1 == hex_geometry.distance(a, b) for a, b in zip(path, path[1:]))
+    assert all(board.get_coordinate(*square).get_content() is None for square in path)
+    board.get_coordinate(0, -5, 5).add("wall")
+    assert pathfinder.path((-2, 0, 2), (2, 0, -2)) is None
+    # Occupied goals can be reached
+    assert 2 == len(pathfinder.path((-1, 0, 1), (0, 0, 0)))
+
+
+def test_path_takes_cheapest_route():
+    board = CircleHexBoard(4)
+    pathfinder = Pathfinder(board)
+    assert 5 == len(pathfinder.path((-2, 0, 2), (2, 0, -2)))
+    for square in hex_geometry.line((-2, 0, 2), (2, 0, -2)).tolist()[1:-1]:
+        pathfinder.set_cost(*square, 10)
+    path = pathfinder.path((-2, 0, 2), (2, 0, -2))
+    assert _path_cost(pathfinder, path) < 10
+    pathfinder.set_cost(0, 0, 0, inf)
+    assert (0, 0, 0) not in pathfinder.path((-1, 0, 1), (1, 0, -1))
+    with pytest.raises(InvalidCostException):
+        pathfinder.set_cost(0, 0, 0, 0)
+
+
+def test_a_star_matches_dijkstra():
+    rng = random.Random(3)
+    board = CircleHexBoard(6)
+    squares = hex_geometry.spiral((0, 0, 0), 6).tolist()
+    pathfinder = Pathfinder(board, costs=[rng.choice([1, 2, 5]) for _ in squares])
+    for square in rng.sample(squares, 25):
+        board.get_coordinate(*square).add("rock")
+    for _ in range(20):
+        start, goal = rng.sample(squares, 2)
+        distances = pathfinder.dijkstra([start])
+        path = pathfinder.path(start, goal)
+        if path is None:
+            assert board.get_coordinate(*goal).get_content() is not None or \
+                inf == distances[pathfinder.indexer.index(*goal)]
+        else:
+            assert _path_cost(pathfinder, path) == distances[pathfinder.indexer.index(*goal)]
+
+
+def test_flow_field_is_shared_and_leads_to_target():
+    board = _walled_board()
+    pathfinder = Pathfinder(board)
+    field = pathfinder.flow_field([(3, 0, -3)])
+    assert field is pathfinder.flow_field([(3, 0, -3)])
+    path = field.path(-3, 0, 3)
+    assert (3, 0, -3) == path[-1]
+    assert len(path) - 1 == field.distance(-3, 0, 3)
+    assert path[1] == field.next_step(-3, 0, 3)
+    starts = np.array([(-3, 0, 3), (3, 0, -3), (-1, 1, 0)])
+    steps = field.next_steps(starts)
+    assert [path[1], (3, 0, -3), field.next_step(-1, 1, 0)] == [tuple(step) for step in steps.tolist()]
+    assert field.next_step(3, 0, -3) is None
+
+
+def test_flow_fields_invalidated_only_when_affected():
+    board = _walled_board()
+    pathfinder = Pathfinder(board)
+    east = pathfinder.flow_field([(3, 0, -3)])
+    centre = pathfinder.flow_field([(2, -1, -1)])
+    # In the far corner of the west, which no square steps through
+    board.get_coordinate(-5, 5, 0).add("tree")
+    assert pathfinder.flow_field([(3, 0, -3)]) is east
+    # The gap, which every square to the west steps through
+    board.get_coordinate(0, -5, 5).add("tree")
+    assert east.stale and centre.stale
+    east = pathfinder.flow_field([(3, 0, -3)])
+    assert inf == east.distance(-3, 0, 3)
+    # Opening the wall gives a shorter way
+    board.get_coordinate(0, 0, 0).remove("wall")
+    assert east.stale
+    assert 6 == pathfinder.flow_field([(3, 0, -3)]).distance(-3, 0, 3)
+
+
+def test_evicted_flow_fields_are_stale():
+    board = _walled_board()
+    pathfinder = Pathfinder(board, max_fields=1)
+    east = pathfinder.flow_field([(3, 0, -3)])
+    pathfinder.flow_field([(-3, 0, 3)])
+    assert east.stale
+    board.get_coordinate(0, -5, 5).add("rock")
+    assert inf == pathfinder.flow_field([(3, 0, -3)]).distance(-3, 0, 3)
+
+
+def test_flow_fields_match_fresh_computation():
+    rng = random.Random(7)
+    board = CircleHexBoard(6)
+    squares = hex_geometry.spiral((0, 0, 0), 6).tolist()
+    pathfinder = Pathfinder(board)
+    targets = [[(0, 0, 0)], [(6, -6, 0), (-6, 0, 6)]]
+    for _ in range(60):
+        x, y, z = rng.choice(squares)
+        square = board.get_coordinate(x, y, z)
+        if square.get_content() is None:
+            square.add("agent")
+        else:
+            square.remove("agent")
+        for target in targets:
+            fresh = Pathfinder(board)
+            expected = fresh.flow_field(target).distances
+            assert np.array_equal(expected, pathfinder.flow_field(target).distances)
+            fresh.close()
+
+
+def test_closed_pathfinder_stops_listening():
+    board = CircleHexBoard(2)
+    pathfinder = Pathfinder(board)
+    field = pathfinder.flow_field([(0, 0, 0)])
+    pathfinder.close()
+    board.get_coordinate(1, -1, 0).add("rock")
+    assert not field.stale
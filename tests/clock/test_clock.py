@@ -1,6 +1,11 @@
+import pickle
+
 import pytest
 
-from src.agent_world.clock.clock import Clock, IClockDelegate, InvalidTimeException, AlreadySubscribedToClockException
+from src.agent_world.clock.clock import Clock, IClockDelegate, InvalidTimeException, AlreadySubscribedToClockException, \
+    UnforkableDelegateException
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler
 
 
 class ToySubscriber(IClockDelegate):
@@ -90,3 +95,194 @@ def test_advance_time_subscriber():
     clock.subscribe(toy_subscriber)
     clock.advance_time_by(1)
     assert clock.current_time() == 1 and toy_subscriber._current_time == 1
+
+
+def test_fork():
+    clock = Clock(5)
+    scheduler = Scheduler(5)
+    clock.subscribe(scheduler)
+    fork = clock.fork()
+    assert 5 == fork.current_time()
+    fork.set_time_to(10)
+    assert 10 == fork.subscribers()[0].current_time()
+    assert 5 == scheduler.current_time()
+    clock.subscribe(ToySubscriber())
+    with pytest.raises(UnforkableDelegateException):
+        clock.fork()
+
+
+class CountingScheduler(Scheduler):
+    def __init__(self, current_time=0):
+        super().__init__(current_time)
+        self.times_set = []
+
+    def set_time(self, time):
+        self.times_set.append(time)
+        super().set_time(time)
+
+
+def test_subscribers_in_order():
+    clock = Clock()
+    subscribers = [ToySubscriber(), Scheduler(), ToySubscriber()]
+    for subscriber in subscribers:
+        clock.subscribe(subscriber)
+    clock.unsubscribe(subscribers[0])
+    clock.subscribe(subscribers[0])
+    assert [subscribers[1], subscribers[2], subscribers[0]] == clock.subscribers()
+    assert [subscribers[2], subscribers[0]] == clock.eager_subscribers()
+
+
+def test_only_due_schedulers_are_woken():
+    clock = Clock()
+    schedulers = [CountingScheduler() for _ in range(3)]
+    toy_subscriber = ToySubscriber()
+    clock.subscribe(toy_subscriber)
+    for scheduler in schedulers:
+        clock.subscribe(scheduler)
+    executed = []
+    schedulers[1].schedule_event(ScheduledEvent(lambda: executed.append(clock.current_time()), 20))
+    for time in range(1, 31):
+        clock.set_time_to(time)
+    assert [20] == executed
+    assert [] == schedulers[0].times_set == schedulers[2].times_set
+    assert [20] == schedulers[1].times_set
+    assert 30 == toy_subscriber._current_time
+    assert all(30 == scheduler.current_time() for scheduler in schedulers)
+
+
+def test_idle_scheduler_follows_clock():
+    clock = Clock()
+    scheduler = Scheduler()
+    clock.subscribe(scheduler)
+    clock.set_time_to(50)
+    executed = []
+    # In the past of the clock, so dropped
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(10), 10))
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(60), 60))
+    assert 60 == clock.next_wake_time()
+    clock.set_time_to(70)
+    assert [60] == executed
+    clock.unsubscribe(scheduler)
+    clock.set_time_to(80)
+    assert 70 == scheduler.current_time()
+
+
+def test_wake_time_refreshed_on_cancel():
+    clock = Clock()
+    scheduler = CountingScheduler()
+    clock.subscribe(scheduler)
+    scheduler.schedule_event(ScheduledEvent(lambda: None, 10, identifier="first"))
+    scheduler.schedule_event(ScheduledEvent(lambda: None, 20))
+    assert 10 == clock.next_wake_time()
+    scheduler.cancel_event("first")
+    assert 20 == clock.next_wake_time()
+    clock.set_time_to(15)
+    assert [] == scheduler.times_set
+
+
+def test_wake_during_set_time():
+    clock = Clock()
+    first, second = Scheduler(), CountingScheduler()
+    clock.subscribe(first)
+    clock.subscribe(second)
+    executed = []
+
+    def schedule_on_second():
+        second.schedule_event(ScheduledEvent(lambda: executed.append(("second", clock.current_time())), 10))
+        first.schedule_event(ScheduledEvent(lambda: executed.append(("first", clock.current_time())), 10))
+
+    first.schedule_event(ScheduledEvent(schedule_on_second, 10))
+    clock.set_time_to(10)
+    assert [("first", 10), ("second", 10)] == executed
+    assert [10] == second.times_set
+
+
+class _LoggingSubscriber(IClockDelegate):
+    def __init__(self, log, name, on_time=None):
+        self.log = log
+        self.name = name
+        self.on_time = on_time
+
+    def set_time(self, time):
+        self.log.append((self.name, time))
+        if self.on_time is not None:
+            self.on_time(time)
+
+
+def test_subscribers_told_in_order_of_subscription():
+    clock = Clock()
+    log = []
+    first, second = Scheduler(), Scheduler()
+
+    def schedule_on_both(time):
+        first.schedule_event(ScheduledEvent(lambda: log.append(("first", clock.current_time())), time))
+        second.schedule_event(ScheduledEvent(lambda: log.append(("second", clock.current_time())), time))
+
+    clock.subscribe(_LoggingSubscriber(log, "a"))
+    clock.subscribe(first)
+    clock.subscribe(_LoggingSubscriber(log, "b", schedule_on_both))
+    clock.subscribe(second)
+    clock.subscribe(_LoggingSubscriber(log, "c"))
+    second.schedule_event(ScheduledEvent(lambda: log.append(("second", clock.current_time())), 5))
+    first.schedule_event(ScheduledEvent(lambda: log.append(("first", clock.current_time())), 5))
+    clock.set_time_to(5)
+    # The first scheduler gets the work of b after its turn, so it is done at the next change of time
+    assert [("a", 5), ("first", 5), ("b", 5), ("second", 5), ("second", 5), ("c", 5)] == log
+    log.clear()
+    clock.set_time_to(6)
+    assert ("first", 6) == log[1]
+
+
+class _UnhashableSubscriber(ToySubscriber):
+    def __eq__(self, other):
+        return isinstance(other, _UnhashableSubscriber)
+
+
+def test_unhashable_delegates():
+    clock = Clock()
+    subscribers = [_UnhashableSubscriber(), _UnhashableSubscriber()]
+    for subscriber in subscribers:
+        clock.subscribe(subscriber)
+    with pytest.raises(AlreadySubscribedToClockException):
+        clock.subscribe(subscribers[0])
+    clock.set_time_to(5)
+    assert [5, 5] == [subscriber._current_time for subscriber in subscribers]
+    clock.unsubscribe(subscribers[1])
+    assert subscribers[0] is clock.subscribers()[0] and 1 == len(clock.subscribers())
+
+
+def test_periodic_events_rearm_wake():
+    clock = Clock()
+    scheduler = CountingScheduler()
+    clock.subscribe(scheduler)
+    scheduler.schedule_event(PeriodicEvent(lambda: None, 10, phase=5))
+    for time in range(1, 40):
+        clock.set_time_to(time)
+    assert [5, 15, 25, 35] == scheduler.times_set
+
+
+def test_pickled_clock_keeps_wakes():
+    clock = Clock()
+    scheduler = Scheduler()
+    clock.subscribe(scheduler)
+    scheduler.schedule_event(ScheduledEvent(int, 10))
+    clock = pickle.loads(pickle.dumps(clock))
+    scheduler = clock.subscribers()[0]
+    assert 10 == clock.next_wake_time()
+    clock.set_time_to(10)
+    assert clock.next_wake_time() is None
+    scheduler.schedule_event(ScheduledEvent(int, 30))
+    assert 30 == clock.next_wake_time()
+
+
+def test_wake_listeners_told_of_earlier_work():
+    clock = Clock()
+    scheduler = Scheduler()
+    clock.subscribe(scheduler)
+    wakes = []
+    clock.add_wake_listener(lambda: wakes.append(clock.next_wake_time()))
+    scheduler.schedule_event(ScheduledEvent(int, 100))
+    scheduler.schedule_event(ScheduledEvent(int, 200))
+    scheduler.schedule_event(ScheduledEvent(int, 50))
+    assert [100, 50] == wakes
+    assert [] == clock.fork()._wake_listeners
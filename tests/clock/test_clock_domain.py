@@ -0,0 +1,99 @@
+import pytest
+
+from src.agent_world.clock.clock import Clock
+from src.agent_world.clock.clock_domain import ClockDomain, InvalidPeriodException
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.driver import SimulationDriver
+from tests.clock.test_clock import ToySubscriber
+
+
+class RecordingSubscriber(ToySubscriber):
+    def __init__(self):
+        super().__init__()
+        self.times_set = []
+
+    def set_time(self, time):
+        super().set_time(time)
+        self.times_set.append(time)
+
+
+def test_boundaries():
+    domain = ClockDomain(Clock(), 10, phase=3)
+    assert 3 == domain.floor(12) == domain.floor(3)
+    assert -7 == domain.floor(2)
+    assert 13 == domain.ceil(12) == domain.ceil(13)
+    assert 3 == domain.ceil(-6)
+    with pytest.raises(InvalidPeriodException):
+        ClockDomain(Clock(), 0)
+
+
+def test_coalesces_updates():
+    master = Clock()
+    domain = ClockDomain(master, 100)
+    subscriber = RecordingSubscriber()
+    domain.subscribe(subscriber)
+    for time in range(1, 251):
+        master.set_time_to(time)
+    master.set_time_to(1000)
+    assert [100, 200, 1000] == subscriber.times_set
+    assert 1000 == domain.current_time()
+
+
+def test_scheduler_in_domain():
+    master = Clock()
+    domain = ClockDomain(master, 100)
+    scheduler = Scheduler()
+    domain.subscribe(scheduler)
+    executed = []
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(domain.current_time()), 150))
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(domain.current_time()), 160))
+    assert 200 == master.next_wake_time()
+    for time in range(1, 301):
+        master.set_time_to(time)
+    assert [200, 200] == executed
+    assert 300 == domain.current_time() == scheduler.current_time()
+
+
+def test_idle_domain_follows_master():
+    master = Clock()
+    domain = ClockDomain(master, 100)
+    domain.subscribe(Scheduler())
+    master.set_time_to(250)
+    assert 200 == domain.current_time()
+    assert domain.next_wake_time() is None
+    master.unsubscribe(domain)
+    master.set_time_to(450)
+    assert 200 == domain.current_time()
+    assert domain.master() is None
+
+
+def test_driver_steps_to_domain_boundaries():
+    master = Clock()
+    fine = Scheduler()
+    master.subscribe(fine)
+    domain = ClockDomain(master, 100)
+    coarse = Scheduler()
+    domain.subscribe(coarse)
+    executed = []
+    fine.schedule_event(PeriodicEvent(lambda: executed.append(("fine", master.current_time())), 40, phase=40))
+    coarse.schedule_event(PeriodicEvent(lambda: executed.append(("coarse", master.current_time())), 100, phase=130))
+    assert 8 == SimulationDriver(master).run_until(300)
+    assert [("fine", 40), ("fine", 80), ("fine", 120), ("fine", 160), ("fine", 200), ("coarse", 200),
+            ("fine", 240), ("fine", 280), ("coarse", 300)] == executed
+
+
+def test_fork():
+    master = Clock()
+    domain = ClockDomain(master, 100)
+    scheduler = Scheduler()
+    domain.subscribe(scheduler)
+    executed = []
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(1), 150))
+    fork = master.fork()
+    forked_domain = fork.subscribers()[0]
+    assert forked_domain is not domain and forked_domain.master() is fork
+    fork.set_time_to(200)
+    assert [1] == executed
+    assert 0 == domain.current_time()
+    assert 200 == forked_domain.current_time()
@@ -0,0 +1,17 @@
+import pytest
+
+from src.agent_world.currency.currency import minor_units
+
+
+@pytest.fixture(autouse=True)
+def minor_unit_registry():
+    """
+    Restores the registry after every test, as it is shared by the whole process and tickers stay pinned once used.
+    Its dict and set are restored in place, as the currency module keeps references to them.
+    """
+    scales, pinned = dict(minor_units._scales), set(minor_units._pinned)
+    yield minor_units
+    minor_units._scales.clear()
+    minor_units._scales.update(scales)
+    minor_units._pinned.clear()
+    minor_units._pinned.update(pinned)
@@ -1,7 +1,10 @@
+import pickle
+
 import pytest
 
 from src.agent_world.currency.currency import Currency, IncorrectTickerException, NegativeCurrencyException, \
-    _check_negative, Wallet, BurnedCurrencyException, _check_burned
+    _check_negative, Wallet, BurnedCurrencyException, _check_burned, minor_units, InexactAmountException, \
+    ConflictingMinorUnitsException
 
 
 def test_validate_ticker():
@@ -31,3 +34,79 @@ def test_burned():
         wallet.deposit_currency(currency)
     with pytest.raises(BurnedCurrencyException):
         _check_burned(currency)
+
+
+def test_not_a_number():
+    with pytest.raises(NegativeCurrencyException):
+        Currency(float("nan"), "USD")
+
+
+def test_minor_units():
+    minor_units.register("test_cents", 100)
+    currency = Currency(0.1, "test_cents")
+    assert 10 == currency.minor_amount and 0.1 == currency.amount
+    assert Currency(0.1, "test_cents") == Currency.from_minor(10, "test_cents")
+    with pytest.raises(InexactAmountException):
+        Currency(0.001, "test_cents")
+    with pytest.raises(ConflictingMinorUnitsException):
+        minor_units.register("test_cents", 1000)
+    minor_units.register("test_cents", 100)
+
+
+def test_large_minor_amounts():
+    minor_units.register("test_cents", 100)
+    assert 100000000001 == Currency(1000000000.01, "test_cents").minor_amount
+    with pytest.raises(InexactAmountException):
+        Currency(1000000000.001, "test_cents")
+    for amount in [float("inf"), float("nan")]:
+        with pytest.raises((InexactAmountException, NegativeCurrencyException)):
+            Currency(amount, "test_cents")
+
+
+def test_whole_units():
+    minor_units.register("test_whole")
+    assert 3 == Currency(3.0, "test_whole").amount
+    assert isinstance(Currency(3.0, "test_whole").amount, int)
+    with pytest.raises(InexactAmountException):
+        Currency(2.5, "test_whole")
+
+
+def test_used_tickers_are_pinned():
+    minor_units.register("test_unused", 100)
+    minor_units.unregister("test_unused")
+    assert 0.1 == Currency(0.1, "test_unused").minor_amount
+    with pytest.raises(ConflictingMinorUnitsException):
+        minor_units.register("test_unused", 100)
+    minor_units.register("test_pinned", 100)
+    Currency.from_minor(10, "test_pinned")
+    with pytest.raises(ConflictingMinorUnitsException):
+        minor_units.unregister("test_pinned")
+    assert 100 == minor_units.scale("test_pinned")
+
+
+def test_registry_is_restored_after_each_test():
+    assert minor_units.scale("test_pinned") is None and "test_pinned" not in minor_units._pinned
+
+
+def test_value_type():
+    currency = Currency(5, "USD")
+    assert Currency(5, "USD") == currency and hash(Currency(5, "USD")) == hash(currency)
+    assert Currency(5, "SEK") != currency and Currency(4, "USD") != currency
+    assert 2 == len({currency, Currency(5, "USD"), Currency(5, "SEK")})
+    assert currency != 5
+    with pytest.raises(AttributeError):
+        currency.price = 5
+    currency.burn()
+    assert currency.burned
+
+
+def test_interned_ticker():
+    ticker = "".join(["U", "SD"])
+    assert Currency(1, ticker).ticker is Currency(1, "USD").ticker
+
+
+def test_pickle():
+    currency = Currency(5, "USD")
+    currency.burn()
+    copy = pickle.loads(pickle.dumps(currency))
+    assert copy == currency and copy.burned
@@ -0,0 +1,60 @@
+import pytest
+
+from src.agent_world.currency.currency import Wallet, Currency, Price, InsufficientBalanceException, \
+    UnsupportedCurrencyException, NegativeCurrencyException, minor_units
+from src.agent_world.currency.wallet_bank import WalletBank
+
+
+def _wallet(**balances):
+    wallet = Wallet()
+    for ticker, amount in balances.items():
+        wallet.deposit_currency(Currency(amount, ticker))
+    return wallet
+
+
+def test_price():
+    price = Price({"gold": 3, "wood": 1})
+    assert {"gold": 3, "wood": 1} == dict(price.items())
+    assert Price({"gold": 3, "wood": 1}) == price and hash(Price({"gold": 3, "wood": 1})) == hash(price)
+    assert Price({"gold": 3}) != price
+    with pytest.raises(NegativeCurrencyException):
+        Price({"gold": -1})
+
+
+def test_wallet():
+    price = Price({"gold": 3, "wood": 1})
+    rich, poor = _wallet(gold=5, wood=1), _wallet(gold=5)
+    assert rich.can_afford(price) and not poor.can_afford(price)
+    assert [True, False] == price.can_afford([rich, poor])
+    rich.subtract(price)
+    assert 2 == rich.check_balance("gold") and 0 == rich.check_balance("wood")
+    with pytest.raises(InsufficientBalanceException):
+        rich.subtract(price)
+    with pytest.raises(UnsupportedCurrencyException):
+        Wallet(["gold"]).can_afford(Price({"wood": 1}))
+    assert Wallet().can_afford(Price({"gold": 0}))
+
+
+def test_minor_units():
+    minor_units.register("test_cents", 100)
+    price = Price({"test_cents": 0.1})
+    assert (("test_cents", 10),) == price.units
+    wallet = _wallet(test_cents=0.3)
+    for _ in range(3):
+        wallet.subtract(price)
+    assert 0 == wallet.minor_balance("test_cents") and not wallet.can_afford(price)
+
+
+def test_bank():
+    bank = WalletBank(3)
+    price = Price({"gold": 3, "wood": 1})
+    bank.deposit([0, 1, 2], [5, 5, 2], "gold")
+    assert [False, False, False] == bank.can_afford([0, 1, 2], price).tolist()
+    assert not bank.wallet(0).can_afford(price)
+    # Compiled again now that the bank has a column for wood
+    bank.deposit([0, 2], 1, "wood")
+    assert [True, False, False] == bank.can_afford([0, 1, 2], price).tolist()
+    assert bank.wallet(0).can_afford(price) and not bank.wallet(1).can_afford(price)
+    bank.wallet(0).subtract(price)
+    bank.subtract([2], Price({"gold": 2}))
+    assert [2, 5, 0] == bank.balances("gold").tolist() and [0, 0, 1] == bank.balances("wood").tolist()
@@ -0,0 +1,87 @@
+import pytest
+
+from src.agent_world.currency.currency import Wallet, Currency, InsufficientBalanceException, \
+    UnsupportedCurrencyException, NegativeCurrencyException, minor_units
+from src.agent_world.currency.transaction import Transaction, transfer
+from src.agent_world.currency.wallet_bank import WalletBank
+
+
+def _wallet(**balances):
+    wallet = Wallet()
+    for ticker, amount in balances.items():
+        wallet.deposit_currency(Currency(amount, ticker))
+    return wallet
+
+
+def test_transfer():
+    alice, bob = _wallet(gold=10), Wallet()
+    transfer(alice, bob, "gold", 4)
+    assert 6 == alice.check_balance("gold") and 4 == bob.check_balance("gold")
+    with pytest.raises(InsufficientBalanceException):
+        transfer(alice, bob, "gold", 7)
+    with pytest.raises(NegativeCurrencyException):
+        transfer(alice, bob, "gold", -1)
+
+
+def test_all_or_nothing():
+    alice, bob, carol = _wallet(gold=10), _wallet(wood=5), Wallet(["gold"])
+    transaction = Transaction([(alice, bob, "gold", 5), (bob, alice, "wood", 6)])
+    with pytest.raises(InsufficientBalanceException):
+        transaction.commit()
+    assert 2 == len(transaction)
+    with pytest.raises(UnsupportedCurrencyException):
+        Transaction().transfer(bob, carol, "wood", 1).commit()
+    assert 10 == alice.check_balance("gold") and 5 == bob.check_balance("wood")
+    transaction.legs.pop()
+    transaction.transfer(bob, alice, "wood", 5).commit()
+    assert 0 == len(transaction)
+    assert 5 == alice.check_balance("gold") and 5 == alice.check_balance("wood")
+    assert 5 == bob.check_balance("gold") and 0 == bob.check_balance("wood")
+
+
+def test_legs_are_netted():
+    alice, bob, carol = _wallet(gold=3), Wallet(), Wallet()
+    Transaction().transfer(alice, bob, "gold", 3).transfer(bob, carol, "gold", 2).commit()
+    assert [0, 1, 2] == [wallet.check_balance("gold") for wallet in [alice, bob, carol]]
+
+
+def test_views_of_one_agent_are_netted():
+    bank = WalletBank(2)
+    bank.deposit([0], 10, "gold")
+    transaction = Transaction().transfer(bank.wallet(0), bank.wallet(1), "gold", 10)
+    transaction.transfer(bank.wallet(0), bank.wallet(1), "gold", 10)
+    with pytest.raises(InsufficientBalanceException):
+        transaction.commit()
+    assert [10, 0] == bank.balances("gold").tolist()
+
+
+def test_minor_units():
+    minor_units.register("test_cents", 100)
+    alice, bob = _wallet(test_cents=0.3), Wallet()
+    transaction = Transaction()
+    for _ in range(3):
+        transaction.transfer(alice, bob, "test_cents", 0.1)
+    transaction.commit()
+    assert 0 == alice.minor_balance("test_cents") and 30 == bob.minor_balance("test_cents")
+
+
+def test_minor_units_in_bank():
+    minor_units.register("test_cents", 100)
+    view = WalletBank(1).wallet(0)
+    view.deposit_currency(Currency(0.7, "test_cents"))
+    view.deposit_currency(Currency(0.1, "test_cents"))
+    wallet = Wallet()
+    transfer(view, wallet, "test_cents", 0.8)
+    assert 0 == view.minor_balance("test_cents") and 0 == view.check_balance("test_cents")
+    assert 80 == wallet.minor_balance("test_cents")
+    with pytest.raises(InsufficientBalanceException):
+        transfer(view, wallet, "test_cents", 0.01)
+
+
+def test_wallet_views():
+    bank = WalletBank(2)
+    bank.deposit([0], 5, "gold")
+    wallet = _wallet(gold=1)
+    Transaction().transfer(bank.wallet(0), bank.wallet(1), "gold", 2).transfer(wallet, bank.wallet(1), "gold", 1) \
+        .commit()
+    assert [3, 3] == bank.balances("gold").tolist() and 0 == wallet.check_balance("gold")
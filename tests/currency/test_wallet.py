@@ -1,6 +1,6 @@
 import pytest
 
-from src.agent_world.currency.currency import Wallet, Currency, UnsupportedCurrencyException, \
+from src.agent_world.currency.currency import Wallet, Currency, UnsupportedCurrencyException, minor_units, \
     InsufficientBalanceException
 
 
@@ -96,3 +96,30 @@ def test_withdraw_all():
     my_dollars = wallet.withdraw_all("USD")
     assert my_dollars.ticker == "USD" and my_dollars.amount == 10
     assert wallet.check_balance("USD") == 0
+
+
+def test_fork():
+    wallet = Wallet()
+    wallet.deposit_currency(Currency(10, "USD"))
+    fork = wallet.fork()
+    fork.deposit_currency(Currency(5, "USD"))
+    wallet.withdraw(3, "USD")
+    assert 7 == wallet.check_balance("USD")
+    assert 15 == fork.check_balance("USD")
+    assert 15 == fork.withdraw_all_currencies()[0].amount
+    assert 7 == wallet.check_balance("USD")
+
+
+def test_minor_units_are_exact():
+    minor_units.register("test_cents", 100)
+    wallet = Wallet()
+    for _ in range(1000):
+        wallet.deposit_currency(Currency(0.1, "test_cents"))
+    assert 100 == wallet.check_balance("test_cents")
+    for _ in range(999):
+        wallet.withdraw(0.1, "test_cents")
+    assert wallet.can_afford({"test_cents": 0.1})
+    assert not wallet.can_afford({"test_cents": 0.11})
+    assert Currency(0.1, "test_cents") == wallet.withdraw_all("test_cents")
+    wallet.deposit_currency(Currency(2.5, "test_cents"))
+    assert [Currency(2.5, "test_cents")] == wallet.withdraw_all_currencies()
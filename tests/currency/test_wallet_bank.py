@@ -0,0 +1,149 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.agent_world.currency.currency import Currency, UnsupportedCurrencyException, InsufficientBalanceException, \
+    NegativeCurrencyException, InexactAmountException, Price, minor_units
+from src.agent_world.currency.wallet_bank import WalletBank, UnknownAgentException
+
+
+def test_deposit_and_withdraw():
+    bank = WalletBank(4)
+    bank.deposit([0, 1, 1, 3], [10, 5, 5, 2], "USD")
+    assert [10, 10, 0, 2] == bank.balances("USD").tolist()
+    bank.withdraw([1, 3], 2, "USD")
+    assert [8, 10, 0] == bank.balance([1, 0, 3], "USD").tolist()
+    with pytest.raises(InsufficientBalanceException):
+        bank.withdraw([0, 0], [6, 6], "USD")
+    assert 10 == bank.balance(0, "USD")[0]
+    with pytest.raises(InsufficientBalanceException):
+        bank.withdraw([0], 1, "SEK")
+    with pytest.raises(NegativeCurrencyException):
+        bank.deposit([0], -1, "USD")
+    with pytest.raises(UnknownAgentException):
+        bank.deposit([4], 1, "USD")
+    with pytest.raises(NegativeCurrencyException):
+        bank.deposit([1], np.nan, "USD")
+    with pytest.raises(NegativeCurrencyException):
+        bank.can_afford([1], {"USD": np.nan})
+    assert [10, 8] == bank.balance([0, 1], "USD").tolist()
+
+
+def test_whitelist():
+    bank = WalletBank(2, ["USD", "SEK"])
+    assert ["USD", "SEK"] == bank.tickers()
+    with pytest.raises(UnsupportedCurrencyException):
+        bank.deposit([0], 1, "EUR")
+    with pytest.raises(UnsupportedCurrencyException):
+        bank.wallet(0).check_balance("EUR")
+
+
+def test_grows():
+    bank = WalletBank()
+    first = bank.add_agents(3)
+    for ticker in range(5):
+        bank.deposit(first, 1, ticker)
+    second = bank.add_agents(10)
+    bank.deposit(second, 2, "gold")
+    assert [0, 1, 2] == first.tolist() and 13 == bank.size() == len(bank)
+    assert [0] * 3 + [2] * 10 == bank.balances("gold").tolist()
+    assert [1] * 3 + [0] * 10 == bank.balances(4).tolist()
+
+
+def test_can_afford_and_subtract():
+    bank = WalletBank(3)
+    bank.deposit([0, 1, 2], [10, 3, 10], "gold")
+    bank.deposit([0, 1, 2], [1, 1, 0], "wood")
+    price = {"gold": 3, "wood": 1}
+    assert [True, True, False] == bank.can_afford([0, 1, 2], price).tolist()
+    vector = bank.price_vector(price)
+    assert [3, 1] == vector.tolist()
+    assert [True, True, False] == bank.can_afford([0, 1, 2], vector).tolist()
+    assert [False] == bank.can_afford([0], {"stone": 1}).tolist()
+    assert [True] == bank.can_afford([0], {"stone": 0}).tolist()
+    with pytest.raises(InsufficientBalanceException):
+        bank.subtract([0, 1, 1], price)
+    bank.subtract([0, 1], price)
+    assert [7, 0, 10] == bank.balances("gold").tolist()
+    assert [0, 0, 0] == bank.balances("wood").tolist()
+
+
+def test_wallet_view():
+    bank = WalletBank(2)
+    wallet = bank.wallet(1)
+    wallet.deposit_currency(Currency(10, "USD"))
+    wallet.deposit_currency(Currency(4, "SEK"))
+    assert 10 == wallet.check_balance("USD") and 0 == wallet.check_balance("EUR")
+    assert Currency(3, "USD") == wallet.withdraw(3, "USD")
+    assert wallet.can_afford({"USD": 7, "SEK": 4}) and not wallet.can_afford({"EUR": 1})
+    wallet.subtract({"USD": 2})
+    with pytest.raises(InsufficientBalanceException):
+        wallet.subtract({"USD": 6})
+    assert Currency(5, "USD") == wallet.withdraw_all("USD")
+    assert [Currency(4, "SEK")] == wallet.withdraw_all_currencies()
+    assert [0, 0] == bank.balances("USD").tolist()
+    with pytest.raises(UnknownAgentException):
+        bank.wallet(2)
+
+
+def test_fork_and_pickle():
+    bank = WalletBank(2)
+    bank.deposit([0, 1], 5, "gold")
+    fork = bank.wallet(0).fork().bank
+    fork.deposit([0], 1, "gold")
+    fork.deposit([1], 1, "wood")
+    assert [5, 5] == bank.balances("gold").tolist() and ["gold"] == bank.tickers()
+    assert [6, 5] == fork.balances("gold").tolist()
+    restored = pickle.loads(pickle.dumps(fork))
+    restored.add_agents(1)
+    restored.deposit([2], 1, "stone")
+    assert [6, 5, 0] == restored.balances("gold").tolist()
+    assert [0, 1, 0] == restored.balances("wood").tolist()
+    assert np.array_equal([0, 0, 1], restored.balances("stone"))
+
+
+def test_transact():
+    bank = WalletBank(3)
+    bank.deposit([0, 1], [10, 1], "gold")
+    bank.transact([0, 1, 2], [1, 2, 0], "gold", [3, 4, 2])
+    assert [9, 0, 2] == bank.balances("gold").tolist()
+    with pytest.raises(InsufficientBalanceException):
+        bank.transact([0, 1], [1, 2], ["gold", "wood"], [1, 1])
+    assert [9, 0, 2] == bank.balances("gold").tolist()
+    bank.deposit([1], 1, "wood")
+    bank.transact([0, 1], [1, 2], ["gold", "wood"], [1, 1])
+    assert [8, 1, 2] == bank.balances("gold").tolist() and [0, 0, 1] == bank.balances("wood").tolist()
+
+
+def test_trade():
+    bank = WalletBank(4)
+    bank.deposit([0, 1], 100, "gold")
+    bank.deposit([2, 3], 5, "wood")
+    with pytest.raises(InsufficientBalanceException):
+        bank.trade([0, 1, 0], [2, 3, 3], "wood", [2, 3, 3], "gold", [20, 30, 30])
+    bank.trade([0, 1, 0], [2, 3, 3], "wood", [2, 3, 2], "gold", [20, 30, 20])
+    assert [60, 70, 20, 50] == bank.balances("gold").tolist()
+    assert [4, 3, 3, 0] == bank.balances("wood").tolist()
+
+
+def test_minor_units_are_exact():
+    minor_units.register("test_cents", 100)
+    bank = WalletBank(2)
+    wallet = bank.wallet(0)
+    wallet.deposit_currency(Currency(0.7, "test_cents"))
+    wallet.deposit_currency(Currency(0.1, "test_cents"))
+    assert 80 == wallet.minor_balance("test_cents") and 0.8 == wallet.check_balance("test_cents")
+    assert Currency(0.8, "test_cents") == wallet.withdraw(0.8, "test_cents")
+    bank.deposit([0, 1, 1], 0.1, "test_cents")
+    bank.transact([1], [0], "test_cents", 0.2)
+    assert [0.3, 0] == bank.balances("test_cents").tolist()
+    assert [True, False] == bank.can_afford([0, 1], Price({"test_cents": 0.3, "gold": 0})).tolist()
+    bank.deposit([1], 1000000000.01, "test_cents")
+    assert [1000000000.01] == bank.balance([1], "test_cents").tolist()
+    bank.withdraw([1], 1000000000.01, "test_cents")
+    for amount in [0.001, np.nan, np.inf, 1e300]:
+        with pytest.raises((InexactAmountException, NegativeCurrencyException)):
+            bank.deposit([0], amount, "test_cents")
+    restored = pickle.loads(pickle.dumps(bank))
+    assert [Currency(0.3, "test_cents")] == restored.wallet(0).withdraw_all_currencies()
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.agent_world.clock.clock import Clock
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.async_scheduler import AsyncScheduler, AwaitableInRunningLoopException
+from tests.clock.test_clock import ToySubscriber
+
+
+def test_events_from_other_threads():
+    scheduler = AsyncScheduler()
+    executed = []
+
+    def feed(offset):
+        for i in range(500):
+            scheduler.schedule_event(ScheduledEvent(lambda i=i: executed.append(i), 1 + i, (offset, i)))
+        scheduler.cancel_event((offset, 0))
+
+    threads = [threading.Thread(target=feed, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Cancellations in the inbox are not applied until the scheduler is advanced, so the cancelled events still count
+    assert 1 == scheduler.next_event_time()
+    scheduler.set_time(1000)
+    assert [i for i in range(1, 500) for _ in range(4)] == executed
+
+
+def test_next_event_time_leaves_the_inbox():
+    scheduler = AsyncScheduler(current_time=10)
+    scheduler.schedule_event(ScheduledEvent(lambda: None, 50))
+    seen = []
+
+    def feed(events):
+        thread = threading.Thread(target=scheduler.schedule_events, args=(events,))
+        thread.start()
+        thread.join()
+
+    def ask():
+        seen.append((scheduler.next_event_time(), len(scheduler._inbox)))
+
+    def event():
+        feed([ScheduledEvent(lambda: None, 30)])
+        thread = threading.Thread(target=ask)
+        thread.start()
+        thread.join()
+        ask()
+
+    feed([ScheduledEvent(event, 20), ScheduledEvent(lambda: None, 5), PeriodicEvent(lambda: None, 7, 0, count=1)])
+    ask()
+    scheduler.set_time(20)
+    # Other threads leave the inbox alone, the executing thread applies it
+    assert [(14, 2), (30, 1), (30, 0)] == seen
+
+
+def test_cancel_and_schedule_from_events_apply_immediately():
+    scheduler = AsyncScheduler()
+    executed = []
+    scheduler.schedule_events([ScheduledEvent(lambda: scheduler.cancel_event("b"), 5),
+                               ScheduledEvent(lambda: executed.append("b"), 5, "b"),
+                               ScheduledEvent(lambda: scheduler.schedule_event(
+                                   ScheduledEvent(lambda: executed.append("c"), 5)), 5)])
+    scheduler.set_time(5)
+    assert ["c"] == executed
+
+
+def test_awaitable_callbacks():
+    clock = Clock()
+    scheduler = AsyncScheduler()
+    clock.subscribe(scheduler)
+    clock.subscribe(ToySubscriber())
+    executed = []
+
+    async def slow(label):
+        await asyncio.sleep(0)
+        executed.append(label)
+        if label == "first":
+            scheduler.schedule_event(ScheduledEvent(lambda: executed.append("later"), 20))
+
+    scheduler.schedule_event(ScheduledEvent(lambda: slow("first"), 10))
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append("second"), 10))
+    scheduler.schedule_event(PeriodicEvent(lambda: slow("tick"), 15, phase=15))
+    asyncio.run(clock.set_time_to_async(20))
+    assert ["first", "second", "tick", "later"] == executed
+    assert 30 == scheduler.next_event_time()
+    scheduler.set_time(30)
+    assert "tick" == executed[-1]
+
+
+def test_set_time_inside_running_loop():
+    scheduler = AsyncScheduler()
+
+    async def callback():
+        pass
+
+    scheduler.schedule_event(ScheduledEvent(callback, 1))
+
+    async def drive():
+        scheduler.set_time(1)
+
+    with pytest.raises(AwaitableInRunningLoopException):
+        asyncio.run(drive())
+    assert scheduler._bucket is None
+
+
+def test_concurrent_worlds():
+    async def world(executed):
+        clock = Clock()
+        scheduler = AsyncScheduler()
+        clock.subscribe(scheduler)
+
+        async def step(i):
+            await asyncio.sleep(0)
+            executed.append(i)
+
+        scheduler.schedule_events([ScheduledEvent(lambda i=i: step(i), i) for i in range(1, 20)])
+        for _ in range(19):
+            await clock.advance_time_by_async(1)
+
+    async def main():
+        logs = [[] for _ in range(5)]
+        await asyncio.gather(*(world(log) for log in logs))
+        return logs
+
+    assert [list(range(1, 20))] * 5 == asyncio.run(main())
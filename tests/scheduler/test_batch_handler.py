@@ -0,0 +1,76 @@
+import pytest
+
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler, _HeapSchedulerQueue, _SchedulerQueue
+from src.agent_world.scheduler.timing_wheel import _TimingWheelQueue
+
+
+def _tick(kind, time, payload, identifier=None):
+    return ScheduledEvent(None, time, identifier, kind=kind, payload=payload)
+
+
+@pytest.mark.parametrize("queue_type", [_HeapSchedulerQueue, _SchedulerQueue, _TimingWheelQueue])
+def test_batches_per_timestamp(queue_type):
+    executed = []
+    scheduler = Scheduler(queue=queue_type())
+    scheduler.schedule_batch_handler("grow", lambda payloads: executed.append(payloads))
+    scheduler.schedule_events([
+        ScheduledEvent(lambda: executed.append("first"), 1),
+        _tick("grow", 1, "a"),
+        ScheduledEvent(lambda: executed.append("second"), 1),
+        _tick("grow", 1, "b"),
+        _tick("grow", 2, "c"),
+    ])
+    scheduler.set_time(2)
+    assert ["first", ["a", "b"], "second", ["c"]] == executed
+
+
+def test_pop_bucket():
+    queue = _HeapSchedulerQueue()
+    queue.add_all(ScheduledEvent(None, time, str(i)) for i, time in enumerate([2, 1, 1, 3]))
+    queue.remove_event("2")
+    assert [] == queue.pop_bucket(0)
+    assert ["1"] == [event.identifier for event in queue.pop_bucket(5)]
+    assert ["0"] == [event.identifier for event in queue.pop_bucket(5)]
+    assert 1 == queue.size()
+
+
+def test_unhandled_kinds_are_executed():
+    executed = []
+    scheduler = Scheduler()
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(1), 1, kind="grow"))
+    scheduler.set_time(1)
+    assert [1] == executed
+    scheduler.schedule_batch_handler("grow", executed.append)
+    scheduler.remove_batch_handler("grow")
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(2), 2, kind="grow"))
+    scheduler.set_time(2)
+    assert [1, 2] == executed
+
+
+def test_cancel_within_timestamp():
+    executed = []
+    scheduler = Scheduler()
+    scheduler.schedule_batch_handler("grow", lambda payloads: executed.append(payloads))
+    scheduler.schedule_events([
+        ScheduledEvent(lambda: scheduler.cancel_event("b"), 1),
+        ScheduledEvent(lambda: scheduler.cancel_event("later"), 1, "later"),
+        _tick("grow", 1, "a"),
+        _tick("grow", 1, "b", identifier="b"),
+        ScheduledEvent(lambda: executed.append("later"), 2, "later"),
+    ])
+    scheduler.set_time(2)
+    assert [["a"]] == executed
+
+
+def test_batched_periodic_events():
+    executed = []
+    scheduler = Scheduler()
+    scheduler.schedule_batch_handler("farm", lambda payloads: executed.append(sorted(payloads)))
+    for farm in range(3):
+        scheduler.schedule_event(PeriodicEvent(None, 10, phase=10, identifier=farm, kind="farm", payload=farm))
+    scheduler.set_time(20)
+    scheduler.cancel_event(1)
+    scheduler.set_time(30)
+    assert [[0, 1, 2], [0, 1, 2], [0, 2]] == executed
+    assert 2 == scheduler._queue.size()
@@ -0,0 +1,181 @@
+import pytest
+from src.agent_world.scheduler.scheduler import _HeapSchedulerQueue, Scheduler, _SchedulerQueue
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from tests.scheduler.scheduler_test_helpers import _generate_sequential_events, _empty_function
+
+
+def test_add():
+    event = ScheduledEvent(None, 0, "0")
+    queue = _HeapSchedulerQueue()
+    queue.add_event(event)
+    assert queue.is_not_empty()
+    assert 1 == queue.size()
+
+
+def test_out_of_order_add():
+    events = _generate_sequential_events(5)
+    queue = _HeapSchedulerQueue()
+    queue.add_all(reversed(events))
+    res_str = ""
+    for event in queue:
+        res_str += event.identifier
+    assert "01234" == res_str
+
+
+def test_equal_times_are_fifo():
+    queue = _HeapSchedulerQueue()
+    queue.add_event(ScheduledEvent(_empty_function, 1, "b"))
+    for identifier in "cde":
+        queue.add_event(ScheduledEvent(_empty_function, 0, identifier))
+    queue.add_event(ScheduledEvent(_empty_function, 1, "f"))
+    res_str = ""
+    while queue.is_not_empty():
+        res_str += queue.pop().identifier
+    assert "cdebf" == res_str
+
+
+def test_remove():
+    events = _generate_sequential_events(5)
+    queue = _HeapSchedulerQueue()
+    queue.add_all(events)
+    queue.remove_event("2")
+    res_str = ""
+    for event in queue:
+        res_str += event.identifier
+    assert "0134" == res_str
+
+
+def test_remove_first_occurrence():
+    queue = _HeapSchedulerQueue()
+    queue.add_event(ScheduledEvent(_empty_function, 2, "x"))
+    queue.add_event(ScheduledEvent(_empty_function, 1, "x"))
+    queue.add_event(ScheduledEvent(_empty_function, 0, "y"))
+    queue.remove_event("x")
+    assert [0, 2] == [event.scheduled_time for event in queue]
+
+
+def test_timed_iterator():
+    events = _generate_sequential_events(5)
+    queue = _HeapSchedulerQueue()
+    queue.add_all(events)
+    res_str = ""
+    for event in queue.timed_iter(3):
+        res_str += event.identifier
+    assert "0123" == res_str
+    assert 1 == queue.size()
+
+
+def test_pop_empty():
+    queue = _HeapSchedulerQueue()
+    assert queue.pop() is None
+    assert queue.peak_first() is None
+
+
+@pytest.mark.parametrize("queue_type", [_HeapSchedulerQueue, _SchedulerQueue])
+def test_scheduler_backends(queue_type):
+    executed = []
+    scheduler = Scheduler(current_time=-1, queue=queue_type())
+    for i in [3, 1, 2, 1, 0]:
+        scheduler.schedule_event(ScheduledEvent(lambda i=i: executed.append(i), i))
+    scheduler.set_time(2)
+    assert [0, 1, 1, 2] == executed
+    assert 1 == scheduler._queue.size()
+
+
+def test_remove_duplicates_in_queue_order():
+    queue = _HeapSchedulerQueue()
+    for time in [5, 3, 4]:
+        queue.add_event(ScheduledEvent(_empty_function, time, "x"))
+    queue.remove_event("x")
+    assert [4, 5] == [event.scheduled_time for event in queue]
+    queue.remove_event("x")
+    assert [5] == [event.scheduled_time for event in queue]
+    assert "x" == queue.pop().identifier
+    queue.remove_event("x")
+    assert queue.is_empty()
+
+
+def test_duplicate_identifier_added_and_popped():
+    queue = _HeapSchedulerQueue()
+    queue.add_event(ScheduledEvent(_empty_function, 5, "x"))
+    queue.add_event(ScheduledEvent(_empty_function, 3, "x"))
+    assert 3 == queue.pop().scheduled_time
+    queue.add_event(ScheduledEvent(_empty_function, 1, "x"))
+    queue.remove_event("x")
+    assert [5] == [event.scheduled_time for event in queue]
+    queue.remove_event("x")
+    assert queue.is_empty()
+    assert queue._index.first("x") is None
+
+
+def test_remove_unknown_identifier():
+    queue = _HeapSchedulerQueue()
+    queue.add_all(_generate_sequential_events(3))
+    queue.remove_event("10")
+    assert 3 == queue.size()
+
+
+def test_tombstones_are_skipped():
+    queue = _HeapSchedulerQueue(compaction_threshold=1)
+    queue.add_all(_generate_sequential_events(5))
+    queue.remove_event("0")
+    queue.remove_event("3")
+    assert 3 == queue.size()
+    assert 5 == len(queue._heap)
+    assert "1" == queue.peak_first().identifier
+    assert ["1", "2", "4"] == [event.identifier for event in queue.timed_iter(10)]
+    assert queue.is_empty()
+    assert 0 == len(queue._removed)
+
+
+def test_compaction():
+    queue = _HeapSchedulerQueue(compaction_threshold=0.5)
+    queue.add_all(_generate_sequential_events(10))
+    for i in range(5):
+        queue.remove_event(str(i))
+    assert 10 == len(queue._heap)
+    queue.remove_event("5")
+    assert 4 == len(queue._heap)
+    assert 0 == len(queue._removed)
+    assert ["6", "7", "8", "9"] == [event.identifier for event in queue]
+
+
+def test_unhashable_identifiers():
+    queue = _HeapSchedulerQueue()
+    queue.add_event(ScheduledEvent(_empty_function, 1, ["a"]))
+    queue.add_event(ScheduledEvent(_empty_function, 0, ["a"]))
+    queue.add_event(ScheduledEvent(_empty_function, 2, "b"))
+    queue.remove_event(["a"])
+    assert [1, 2] == [event.scheduled_time for event in queue]
+    assert ["a"] == queue.pop().identifier
+    queue.remove_event(["a"])
+    assert 1 == queue.size()
+
+
+def test_cancel_through_scheduler():
+    executed = []
+    scheduler = Scheduler()
+    for i in range(5):
+        scheduler.schedule_event(ScheduledEvent(lambda i=i: executed.append(i), i + 1, i))
+    scheduler.cancel_event(2)
+    scheduler.cancel_event(4)
+    scheduler.set_time(10)
+    assert [0, 1, 3] == executed
+
+
+def test_remove_without_identifier():
+    queue = _HeapSchedulerQueue()
+    queue.add_event(ScheduledEvent(_empty_function, 2))
+    queue.add_event(ScheduledEvent(_empty_function, 1, "a"))
+    queue.add_event(ScheduledEvent(_empty_function, 3))
+    queue.remove_event(None)
+    assert [1, 3] == [event.scheduled_time for event in queue]
+
+
+def test_events_without_identifier_are_not_indexed():
+    # Indexing them under None made every pop scan all of them, so draining n of them was quadratic
+    queue = _HeapSchedulerQueue()
+    queue.add_all([ScheduledEvent(_empty_function, time % 7) for time in range(1000)])
+    assert {} == queue._index._entries and [] == queue._index._unhashable
+    times = [queue.pop().scheduled_time for _ in range(1000)]
+    assert sorted(times) == times and queue.is_empty()
@@ -0,0 +1,104 @@
+import pytest
+
+from src.agent_world.scheduler.IScheduler import PeriodicEvent, ScheduledEvent, InvalidPeriodException
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.scheduler.timing_wheel import TimingWheelScheduler
+
+
+def test_invalid_period():
+    with pytest.raises(InvalidPeriodException):
+        PeriodicEvent(None, 0)
+
+
+def test_align_to():
+    event = PeriodicEvent(None, 10, phase=3)
+    event.align_to(25)
+    assert 33 == event.scheduled_time
+    event.align_to(33)
+    assert 33 == event.scheduled_time
+
+
+@pytest.mark.parametrize("scheduler_type", [Scheduler, TimingWheelScheduler])
+def test_periodic_execution(scheduler_type):
+    executed = []
+    scheduler = scheduler_type(current_time=0)
+    event = PeriodicEvent(lambda: executed.append(scheduler.current_time()), 10, phase=5)
+    scheduler.schedule_event(event)
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append("other"), 20))
+    scheduler.set_time(30)
+    assert [30, 30, "other", 30] == executed
+    assert 35 == event.scheduled_time
+    scheduler.set_time(35)
+    assert 4 == executed.count(30) + executed.count(35)
+    assert 1 == scheduler._queue.size()
+
+
+def test_phase_in_the_past():
+    executed = []
+    scheduler = Scheduler(current_time=100)
+    scheduler.schedule_events([PeriodicEvent(lambda: executed.append(1), 30, phase=10)])
+    assert 100 == scheduler._queue.peak_first().scheduled_time
+
+
+def test_count_and_end_time():
+    counted, ended = [], []
+    scheduler = Scheduler(current_time=0)
+    scheduler.schedule_event(PeriodicEvent(lambda: counted.append(1), 1, phase=1, count=3))
+    scheduler.schedule_event(PeriodicEvent(lambda: ended.append(1), 2, phase=2, end_time=7))
+    scheduler.set_time(100)
+    assert 3 == len(counted)
+    assert 3 == len(ended)
+    assert scheduler._queue.is_empty()
+
+
+def test_exhausted_events_are_not_scheduled():
+    scheduler = Scheduler(current_time=10)
+    scheduler.schedule_event(PeriodicEvent(lambda: None, 1, count=0))
+    scheduler.schedule_event(PeriodicEvent(lambda: None, 3, end_time=5))
+    assert scheduler._queue.is_empty()
+
+
+def test_aggregated_execution():
+    yields = []
+    scheduler = Scheduler(current_time=0)
+    scheduler.schedule_event(PeriodicEvent(lambda periods: yields.append(periods), 10, phase=10, aggregate=True))
+    scheduler.set_time(5)
+    scheduler.set_time(10)
+    scheduler.set_time(1000)
+    assert [1, 99] == yields
+    assert 1010 == scheduler._queue.peak_first().scheduled_time
+
+
+def test_aggregated_execution_respects_count():
+    yields = []
+    scheduler = Scheduler(current_time=0)
+    scheduler.schedule_event(PeriodicEvent(lambda periods: yields.append(periods), 10, count=5, aggregate=True))
+    scheduler.set_time(1000)
+    assert [5] == yields
+    assert scheduler._queue.is_empty()
+
+
+def test_cancel_while_executing():
+    executed = []
+    scheduler = Scheduler(current_time=0)
+
+    def tick():
+        executed.append(scheduler.current_time())
+        if len(executed) == 2:
+            scheduler.cancel_event("tick")
+
+    scheduler.schedule_event(PeriodicEvent(tick, 1, phase=1, identifier="tick"))
+    for time in range(1, 5):
+        scheduler.set_time(time)
+    assert [1, 2] == executed
+    assert scheduler._queue.is_empty()
+
+
+def test_cancel_between_executions():
+    executed = []
+    scheduler = Scheduler(current_time=0)
+    scheduler.schedule_event(PeriodicEvent(lambda: executed.append(1), 1, phase=1, identifier="tick"))
+    scheduler.set_time(2)
+    scheduler.cancel_event("tick")
+    scheduler.set_time(5)
+    assert 2 == len(executed)
@@ -1,7 +1,9 @@
 import pytest
 
-from src.agent_world.scheduler.IScheduler import ScheduledEvent
-from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler, _HeapSchedulerQueue, _SchedulerQueue, \
+    ForkDuringExecutionException
+from src.agent_world.scheduler.timing_wheel import _TimingWheelQueue
 from tests.scheduler.scheduler_test_helpers import _load_scheduler, _generate_sequential_events
 
 
@@ -59,3 +61,91 @@ class _StringBuilderTestHelper:
 
     def add_number(self, i):
         self.res_str += str(i)
+
+
+@pytest.mark.parametrize("queue_type", [_HeapSchedulerQueue, _SchedulerQueue, _TimingWheelQueue])
+def test_schedule_events_merges_batch(queue_type):
+    executed = []
+    scheduler = Scheduler(current_time=0, queue=queue_type())
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append("existing"), 2))
+    scheduler.schedule_events([ScheduledEvent(lambda i=i: executed.append(i), time)
+                               for i, time in enumerate([3, 2, -1, 1, 2, 0])])
+    scheduler.set_time(5)
+    assert [5, 3, "existing", 1, 4, 0] == executed
+
+
+def test_schedule_events_into_large_queue():
+    scheduler = Scheduler(current_time=-1)
+    scheduler.schedule_events(_generate_sequential_events(100))
+    scheduler.schedule_events(_generate_sequential_events(3))
+    scheduler.schedule_events(_generate_sequential_events(100))
+    times = [event.scheduled_time for event in scheduler._queue]
+    assert sorted(times) == times and 203 == scheduler._queue.size()
+
+
+@pytest.mark.parametrize("queue_type", [_HeapSchedulerQueue, _SchedulerQueue, _TimingWheelQueue])
+def test_fork(queue_type):
+    executed = []
+    scheduler = Scheduler(current_time=0, queue=queue_type())
+    scheduler.schedule_events([ScheduledEvent(lambda i=i: executed.append(i), i * 10, i) for i in range(1, 6)])
+    scheduler.schedule_event(PeriodicEvent(lambda: executed.append("tick"), 15, phase=15, identifier="tick"))
+    scheduler.cancel_event(2)
+    fork = scheduler.fork()
+    assert fork._queue is scheduler._queue
+    fork.set_time(5)
+    assert fork._queue is scheduler._queue
+    fork.cancel_event(3)
+    fork.schedule_event(ScheduledEvent(lambda: executed.append("fork"), 25))
+    fork.set_time(50)
+    assert [1, "tick", "fork", "tick", 4, "tick", 5] == executed
+    executed.clear()
+    scheduler.set_time(50)
+    assert [1, "tick", 3, "tick", 4, "tick", 5] == executed
+    assert 60 == scheduler.next_event_time() == fork.next_event_time()
+
+
+def test_fork_during_execution():
+    scheduler = Scheduler()
+    scheduler.schedule_event(ScheduledEvent(lambda: scheduler.fork(), 1))
+    with pytest.raises(ForkDuringExecutionException):
+        scheduler.set_time(1)
+
+
+@pytest.mark.parametrize("queue_type", [_HeapSchedulerQueue, _SchedulerQueue, _TimingWheelQueue])
+def test_bucket_survives_raising_event(queue_type):
+    executed = []
+
+    def fail():
+        executed.append("fail")
+        scheduler.schedule_event(ScheduledEvent(lambda: executed.append("late"), 5))
+        raise RuntimeError
+
+    scheduler = Scheduler(current_time=0, queue=queue_type())
+    scheduler.schedule_event(PeriodicEvent(lambda: executed.append("tick"), 10, 5))
+    scheduler.schedule_event(ScheduledEvent(fail, 5))
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append("after"), 5))
+    with pytest.raises(RuntimeError):
+        scheduler.set_time(5)
+    assert ["tick", "fail"] == executed
+    scheduler.set_time(15)
+    assert ["tick", "fail", "after", "late", "tick"] == executed
+
+
+def test_periodic_event_rearmed_when_raising():
+    def fail():
+        raise RuntimeError
+
+    scheduler = Scheduler(current_time=0)
+    scheduler.schedule_event(PeriodicEvent(fail, 10, 5))
+    with pytest.raises(RuntimeError):
+        scheduler.set_time(5)
+    assert 15 == scheduler.next_event_time()
+
+
+def test_cancel_within_large_bucket():
+    executed = []
+    scheduler = Scheduler(current_time=0)
+    scheduler.schedule_event(ScheduledEvent(lambda: [scheduler.cancel_event(i) for i in range(1, 1000, 2)], 1, 0))
+    scheduler.schedule_events([ScheduledEvent(lambda i=i: executed.append(i), 1, i) for i in range(1, 1000)])
+    scheduler.set_time(1)
+    assert list(range(2, 1000, 2)) == executed
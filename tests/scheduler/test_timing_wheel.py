@@ -0,0 +1,87 @@
+import random
+
+from src.agent_world.global_params import second, minute, hour, day
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.scheduler.timing_wheel import TimingWheelScheduler, _TimingWheelQueue
+from tests.scheduler.scheduler_test_helpers import _generate_sequential_events, _empty_function
+
+
+def _record(executed, scheduler, label):
+    return lambda: executed.append((scheduler.current_time(), label))
+
+
+def test_matches_heap_scheduler():
+    rng = random.Random(3)
+    times = [rng.choice([0, 1, 999, second, minute, hour, day, 3 * day]) + rng.randrange(2 * hour) for _ in range(500)]
+    results = []
+    for scheduler in [Scheduler(), TimingWheelScheduler()]:
+        executed = []
+        for label, time in enumerate(times):
+            scheduler.schedule_event(ScheduledEvent(lambda label=label: executed.append(label), time, label))
+        for label in range(0, 500, 7):
+            scheduler.cancel_event(label)
+        for time in [0, 500, second, 37 * second, hour, day, 2 * day + 5, 5 * day]:
+            scheduler.set_time(time)
+            executed.append("tick")
+        results.append(executed)
+    assert results[0] == results[1]
+    assert len(results[0]) > 400
+
+
+def test_equal_times_are_fifo():
+    queue = _TimingWheelQueue()
+    queue.add_event(ScheduledEvent(_empty_function, day + 1, "b"))
+    queue.add_event(ScheduledEvent(_empty_function, hour, "c"))
+    assert "c" == queue.pop().identifier
+    queue.add_event(ScheduledEvent(_empty_function, day + 1, "d"))
+    assert ["b", "d"] == [event.identifier for event in queue.timed_iter(2 * day)]
+
+
+def test_day_jumps():
+    executed = []
+    scheduler = TimingWheelScheduler()
+    for i in range(1, 4):
+        scheduler.schedule_event(ScheduledEvent(lambda i=i: executed.append(i), i * 100 * day + 5))
+    scheduler.set_time(200 * day)
+    assert [1] == executed
+    scheduler.set_time(200 * day + 5)
+    assert [1, 2] == executed
+    assert 1 == scheduler._queue.size()
+
+
+def test_events_scheduled_during_execution():
+    executed = []
+    scheduler = TimingWheelScheduler()
+
+    def reschedule():
+        executed.append(scheduler.current_time())
+        scheduler.schedule_event(ScheduledEvent(lambda: executed.append("same"), scheduler.current_time()))
+        scheduler.schedule_event(ScheduledEvent(lambda: executed.append("later"), scheduler.current_time() + minute))
+
+    scheduler.schedule_event(ScheduledEvent(reschedule, 10))
+    scheduler.set_time(hour)
+    assert [hour, "same"] == executed
+    scheduler.set_time(hour + minute)
+    assert [hour, "same", "later"] == executed
+
+
+def test_peak_and_pop():
+    queue = _TimingWheelQueue()
+    assert queue.peak_first() is None and queue.pop() is None
+    queue.add_all(reversed(_generate_sequential_events(5)))
+    queue.add_event(ScheduledEvent(_empty_function, 2 * day, "day"))
+    queue.remove_event("0")
+    assert "1" == queue.peak_first().identifier
+    assert ["1", "2", "3", "4", "day"] == [queue.pop().identifier for _ in range(5)]
+    assert queue.is_empty()
+
+
+def test_compaction():
+    queue = _TimingWheelQueue(compaction_threshold=0.5)
+    queue.add_all(ScheduledEvent(_empty_function, i * hour, i) for i in range(10))
+    for i in range(6):
+        queue.remove_event(i)
+    assert 0 == len(queue._removed)
+    assert [6, 7, 8, 9] == [event.identifier for event in queue]
+    assert [6, 7, 8, 9] == [event.identifier for event in queue.timed_iter(day)]
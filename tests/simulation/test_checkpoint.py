@@ -0,0 +1,138 @@
+import pytest
+
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+from src.agent_world.clock.clock import Clock
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.global_params import day, hour
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler, _SchedulerQueue
+from src.agent_world.scheduler.timing_wheel import TimingWheelScheduler
+from src.agent_world.simulation.actions import Action, action_registry, UnknownActionException, \
+    ActionAlreadyRegisteredException
+from src.agent_world.simulation.checkpoint import save_checkpoint, load_checkpoint, write_checkpoint, \
+    read_checkpoint, UnserializableStateException, InvalidCheckpointException
+from src.agent_world.simulation.driver import SimulationDriver
+from src.agent_world.simulation.world import World
+from src.agent_world.statistics.handler.max_statistics_handler import MaxStatisticsHandler
+
+
+@action_registry.action("test_checkpoint.pay")
+def _pay(wallet, amount, periods=1):
+    wallet.deposit_currency(Currency(amount * periods, "gold"))
+
+
+@action_registry.action("test_checkpoint.log")
+def _log(world, name):
+    world.statistics.log({"name": name, "time": world.clock.current_time()})
+
+
+def _world():
+    world = World(wallets={"alice": Wallet(["gold"]), "bob": Wallet()},
+                  boards={"map": CircleHexBoard(3)},
+                  statistics=MaxStatisticsHandler())
+    heap, wheel, linked = Scheduler(), TimingWheelScheduler(), Scheduler(queue=_SchedulerQueue())
+    for scheduler in [heap, wheel, linked]:
+        world.clock.subscribe(scheduler)
+    heap.schedule_event(PeriodicEvent(Action("test_checkpoint.pay", world.wallets["alice"], 2), hour,
+                                      identifier="salary", aggregate=True))
+    wheel.schedule_events([ScheduledEvent(Action("test_checkpoint.log", world, f"wheel {i}"), i * day) for i in range(5)])
+    linked.schedule_events([ScheduledEvent(Action("test_checkpoint.log", world, f"linked {i}"), i * day + 1, i)
+                            for i in range(5)])
+    world.boards["map"].get_coordinate(1, -1, 0).add("tree")
+    return world
+
+
+def _summary(world):
+    return (world.clock.current_time(), world.wallets["alice"].check_balance("gold"),
+            world.wallets["bob"].check_balance("gold"), world.boards["map"].get_coordinate(1, -1, 0).get_content(),
+            world.statistics.query_keys(["name"]))
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_restored_world_continues_identically(compress):
+    world = _world()
+    SimulationDriver(world.clock).run_until(2 * day)
+    checkpoint = save_checkpoint(world, compress)
+    restored = load_checkpoint(checkpoint)
+    assert _summary(world) == _summary(restored)
+    for branch in [world, restored]:
+        SimulationDriver(branch.clock).run_until(6 * day)
+    assert _summary(world) == _summary(restored)
+    assert (6 * 24 + 1) * 2 == restored.wallets["alice"].check_balance("gold")
+    assert 10 == len(restored.statistics.query_keys(["name"]))
+
+
+def test_branches_are_independent():
+    checkpoint = save_checkpoint(_world())
+    first, second = load_checkpoint(checkpoint), load_checkpoint(checkpoint)
+    first.clock.set_time_to(day)
+    first.schedulers()[0].cancel_event("salary")
+    second.wallets["bob"].deposit_currency(Currency(5, "gold"))
+    SimulationDriver(second.clock).run_until(day)
+    assert (24 + 1) * 2 == first.wallets["alice"].check_balance("gold")
+    assert 0 == first.wallets["bob"].check_balance("gold")
+    assert 5 == second.wallets["bob"].check_balance("gold")
+    assert first.schedulers()[0].next_event_time() is None
+    assert 25 * hour == second.schedulers()[0].next_event_time()
+
+
+def test_equal_times_keep_their_order():
+    world = World()
+    scheduler = TimingWheelScheduler()
+    world.clock.subscribe(scheduler)
+    world.data["log"] = []
+    scheduler.schedule_events([ScheduledEvent(Action("test_checkpoint.append", world, i), 10) for i in range(5)])
+    action_registry.register("test_checkpoint.append", lambda w, i: w.data["log"].append(i))
+    restored = load_checkpoint(save_checkpoint(world))
+    restored.clock.set_time_to(10)
+    assert [0, 1, 2, 3, 4] == restored.data["log"]
+    action_registry.unregister("test_checkpoint.append")
+
+
+def test_lambdas_can_not_be_saved():
+    world = World()
+    scheduler = Scheduler()
+    world.clock.subscribe(scheduler)
+    scheduler.schedule_event(ScheduledEvent(lambda: None, 10))
+    with pytest.raises(UnserializableStateException):
+        save_checkpoint(world)
+
+
+def test_invalid_checkpoint():
+    with pytest.raises(InvalidCheckpointException):
+        load_checkpoint(b"not a checkpoint")
+    checkpoint = save_checkpoint(World())
+    with pytest.raises(InvalidCheckpointException):
+        load_checkpoint(checkpoint[:-4])
+    # A pickle referring to a module which does not exist
+    with pytest.raises(InvalidCheckpointException):
+        load_checkpoint(checkpoint[:5] + b"\x00" + b"cnonexistent_mod\nX\n.")
+
+
+def test_checkpoint_file(tmp_path):
+    world = _world()
+    world.clock.set_time_to(3 * day)
+    path = tmp_path / "world.checkpoint"
+    write_checkpoint(world, path)
+    assert _summary(world) == _summary(read_checkpoint(path))
+
+
+def test_board_state():
+    board = CircleHexBoard(4, lazy_loading=False)
+    board.get_coordinate(0, 0, 0).add("castle")
+    restored = load_checkpoint(save_checkpoint(World(boards={"map": board}))).boards["map"]
+    assert 61 == len(list(restored))
+    assert "castle" == restored.get_coordinate(0, 0, 0).get_content()
+    lazy = CircleHexBoard(4)
+    lazy.get_coordinate(1, 1, -2)
+    restored = load_checkpoint(save_checkpoint(World(boards={"map": lazy}))).boards["map"]
+    assert 1 == len(list(restored))
+
+
+def test_action_registry():
+    with pytest.raises(UnknownActionException):
+        Action("test_checkpoint.missing")()
+    with pytest.raises(ActionAlreadyRegisteredException):
+        action_registry.register("test_checkpoint.pay", lambda: None)
+    action_registry.register("test_checkpoint.pay", _pay)
+    assert Action("test_checkpoint.pay", 1) == Action("test_checkpoint.pay", 1)
@@ -0,0 +1,79 @@
+from src.agent_world.clock.clock import Clock
+from src.agent_world.global_params import day
+from src.agent_world.scheduler.IScheduler import ScheduledEvent, PeriodicEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.driver import SimulationDriver
+from tests.clock.test_clock import ToySubscriber
+
+
+def _world(times_a, times_b):
+    executed = []
+    clock = Clock()
+    schedulers = [Scheduler(), Scheduler()]
+    for label, scheduler, times in zip("ab", schedulers, [times_a, times_b]):
+        clock.subscribe(scheduler)
+        for time in times:
+            scheduler.schedule_event(ScheduledEvent(lambda label=label: executed.append(label + str(clock.current_time())),
+                                                    time))
+    clock.subscribe(ToySubscriber())
+    return clock, executed
+
+
+def test_next_event_time():
+    clock, _ = _world([5 * day], [3 * day])
+    driver = SimulationDriver(clock)
+    assert 3 * day == driver.next_event_time()
+    assert SimulationDriver(Clock()).next_event_time() is None
+
+
+def test_run_until():
+    clock, executed = _world([10, 30], [20, 40])
+    driver = SimulationDriver(clock)
+    assert 3 == driver.run_until(35)
+    assert ["a10", "b20", "a30"] == executed
+    assert 35 == clock.current_time()
+    assert 0 == driver.run_until(38)
+    assert 38 == clock.current_time()
+
+
+def test_run_until_max_steps():
+    clock, executed = _world([10, 30], [20, 40])
+    driver = SimulationDriver(clock)
+    assert 2 == driver.run_until(35, max_steps=2)
+    assert 20 == clock.current_time()
+    assert 1 == driver.run_until(35, max_steps=2)
+    assert 35 == clock.current_time()
+
+
+def test_run_until_idle():
+    clock, executed = _world([day, 7 * day], [2 * day])
+    assert 3 == SimulationDriver(clock).run_until_idle()
+    assert ["a" + str(day), "b" + str(2 * day), "a" + str(7 * day)] == executed
+    assert 7 * day == clock.current_time()
+
+
+def test_run_until_idle_max_steps():
+    clock = Clock()
+    scheduler = Scheduler()
+    clock.subscribe(scheduler)
+    scheduler.schedule_event(PeriodicEvent(lambda: None, day, phase=day))
+    assert 10 == SimulationDriver(clock).run_until_idle(max_steps=10)
+    assert 10 * day == clock.current_time()
+
+
+def test_run_steps():
+    clock, executed = _world([1, 2], [3])
+    driver = SimulationDriver(clock)
+    assert 2 == driver.run_steps(2)
+    assert ["a1", "a2"] == executed
+    assert 1 == driver.run_steps(5)
+
+
+def test_events_at_current_time():
+    clock = Clock(starting_time=10)
+    scheduler = Scheduler(current_time=10)
+    clock.subscribe(scheduler)
+    executed = []
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(clock.current_time()), 10))
+    assert SimulationDriver(clock).step()
+    assert [11] == executed
@@ -0,0 +1,75 @@
+from src.agent_world.board.hex.hex_board import CircleHexBoard
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.global_params import hour, day
+from src.agent_world.scheduler.IScheduler import PeriodicEvent, ScheduledEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.actions import Action, action_registry
+from src.agent_world.simulation.driver import SimulationDriver
+from src.agent_world.simulation.world import World
+from src.agent_world.statistics.handler.max_statistics_handler import MaxStatisticsHandler
+
+
+@action_registry.action("test_fork.pay")
+def _pay(wallet, amount):
+    wallet.deposit_currency(Currency(amount, "gold"))
+
+
+@action_registry.action("test_fork.plant")
+def _plant(world, coordinates):
+    world.boards["map"].get_coordinate(*coordinates).add("tree")
+    world.statistics.log({"name": "planted", "time": world.clock.current_time()})
+
+
+def _world():
+    world = World(wallets={"alice": Wallet()}, boards={"map": CircleHexBoard(2, lazy_loading=False)},
+                  statistics=MaxStatisticsHandler())
+    scheduler = Scheduler()
+    world.clock.subscribe(scheduler)
+    scheduler.schedule_event(PeriodicEvent(Action("test_fork.pay", world.wallets["alice"], 1), hour, phase=hour))
+    scheduler.schedule_event(ScheduledEvent(Action("test_fork.plant", world, (0, 0, 0)), 2 * day))
+    return world
+
+
+def test_forked_world_diverges():
+    world = _world()
+    SimulationDriver(world.clock).run_until(day)
+    fork = world.fork()
+    fork.wallets["alice"].deposit_currency(Currency(100, "gold"))
+    SimulationDriver(fork.clock).run_until(3 * day)
+    assert 24 == world.wallets["alice"].check_balance("gold")
+    assert 172 == fork.wallets["alice"].check_balance("gold")
+    assert "tree" == fork.boards["map"].get_coordinate(0, 0, 0).get_content()
+    assert world.boards["map"].get_coordinate(0, 0, 0).get_content() is None
+    assert 1 == len(fork.statistics.query_keys(["name"]))
+    assert [] == world.statistics.query_keys(["name"])
+    SimulationDriver(world.clock).run_until(2 * day)
+    assert 48 == world.wallets["alice"].check_balance("gold")
+    assert "tree" == world.boards["map"].get_coordinate(0, 0, 0).get_content()
+
+
+def test_board_fork_copies_on_access():
+    board = CircleHexBoard(2, lazy_loading=False)
+    board.get_coordinate(1, 0, -1).add("rock")
+    fork = board.fork()
+    fork.get_coordinate(1, 0, -1).remove("rock")
+    fork.get_coordinate(0, 1, -1).add("tree")
+    assert "rock" == board.get_coordinate(1, 0, -1).get_content()
+    assert board.get_coordinate(0, 1, -1).get_content() is None
+    assert ["tree"] == [square.get_content() for square in fork if square.get_content() is not None]
+    assert 19 == len(list(fork)) == len(list(board))
+    second = fork.fork()
+    second.get_coordinate(0, 1, -1).remove("tree")
+    assert "tree" == fork.get_coordinate(0, 1, -1).get_content()
+
+
+def test_board_squares_got_before_fork_stay_with_source():
+    board = CircleHexBoard(2)
+    square = board.get_coordinate(0, 0, 0)
+    fork = board.fork()
+    second = fork.fork()
+    square.add("agent")
+    assert fork.get_coordinate(0, 0, 0).get_content() is None and 0 == fork.count_occupied(0, 0, 0, 2)
+    assert second.get_coordinate(0, 0, 0).get_content() is None and 0 == second.count_occupied(0, 0, 0, 2)
+    assert board.get_coordinate(0, 0, 0) is square and 1 == board.count_occupied(0, 0, 0, 2)
+    square.remove("agent")
+    assert board.get_coordinate(0, 0, 0).get_content() is None and 0 == board.count_occupied(0, 0, 0, 2)
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time as wall_clock
+
+import pytest
+
+from src.agent_world.clock.clock import Clock
+from src.agent_world.global_params import second
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from src.agent_world.scheduler.async_scheduler import AsyncScheduler
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.real_time import RealTimeDriver, InvalidSpeedException
+
+
+class _WallClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+def _setup(times, cost=0.0, scheduler_type=Scheduler):
+    wall = _WallClock()
+    clock = Clock()
+    scheduler = scheduler_type()
+    clock.subscribe(scheduler)
+    executed = []
+
+    def work():
+        executed.append((clock.current_time(), round(wall.now, 6)))
+        wall.now += cost
+
+    scheduler.schedule_events([ScheduledEvent(work, time) for time in times])
+    return wall, clock, executed
+
+
+def test_follows_wall_time():
+    wall, clock, executed = _setup([1000, 5000])
+    driver = RealTimeDriver(clock, speed=10, time_source=wall.time, sleep=wall.sleep)
+    driver.run(10000)
+    assert [0.1, 0.4, 0.5] == wall.sleeps
+    assert [(1000, 100.1), (5000, 100.5)] == executed
+    assert 10000 == clock.current_time()
+    assert 0 == driver.metrics.max and 0 == driver.metrics.behind
+
+
+def test_catches_up_in_batches():
+    wall, clock, executed = _setup(range(100, 2100, 100), cost=0.25)
+    driver = RealTimeDriver(clock, max_steps=3, time_source=wall.time, sleep=wall.sleep)
+    driver.run(2000)
+    assert 20 == len(executed)
+    assert 2000 == clock.current_time()
+    assert driver.metrics.behind > 0
+    assert driver.metrics.max >= driver.metrics.mean() > 0
+    assert [] == wall.sleeps[2:]
+
+
+def test_set_speed():
+    wall, clock, _ = _setup([])
+    driver = RealTimeDriver(clock, speed=2, time_source=wall.time, sleep=wall.sleep)
+    wall.now += 1
+    assert 2000 == driver.target_time() == driver.lag()
+    driver.set_speed(0.5)
+    wall.now += 2
+    assert 3000 == driver.target_time()
+    driver.tick()
+    assert 3000 == clock.current_time() and 0 == driver.lag()
+    with pytest.raises(InvalidSpeedException):
+        driver.set_speed(0)
+
+
+def test_run_async():
+    wall, clock, executed = _setup([1000, 5000], scheduler_type=AsyncScheduler)
+    driver = RealTimeDriver(clock, speed=10, time_source=wall.time, sleep=wall.sleep, async_sleep=wall.async_sleep)
+    asyncio.run(driver.run_async(10000))
+    assert [0.1, 0.4, 0.5] == wall.sleeps
+    assert [(1000, 100.1), (5000, 100.5)] == executed
+    assert 10000 == clock.current_time()
+
+
+def _schedule_from_outside(clock, scheduler, driver, executed):
+    # Due 10 world milliseconds, i.e. 10 wall microseconds, after now, long before the run ends
+    time = driver.target_time() + 10
+    scheduler.schedule_event(ScheduledEvent(lambda: executed.append(wall_clock.monotonic()), time))
+    return wall_clock.monotonic()
+
+
+def test_inbox_arrival_cuts_sleep_short():
+    clock = Clock()
+    scheduler = AsyncScheduler()
+    clock.subscribe(scheduler)
+    driver = RealTimeDriver(clock, speed=1000)
+    executed = []
+    scheduled = []
+    timer = threading.Timer(0.05, lambda: scheduled.append(_schedule_from_outside(clock, scheduler, driver, executed)))
+    timer.start()
+    # With nothing queued the driver would otherwise sleep the whole second until the end
+    driver.run(1000 * second)
+    timer.join()
+    assert 1 == len(executed)
+    assert executed[0] - scheduled[0] < 0.5
+
+
+def test_inbox_arrival_cuts_async_sleep_short():
+    clock = Clock()
+    scheduler = AsyncScheduler()
+    clock.subscribe(scheduler)
+    driver = RealTimeDriver(clock, speed=1000)
+    executed = []
+
+    async def main():
+        run = asyncio.ensure_future(driver.run_async(1000 * second))
+        await asyncio.sleep(0.05)
+        scheduled = _schedule_from_outside(clock, scheduler, driver, executed)
+        await asyncio.sleep(0.2)
+        assert 1 == len(executed) and executed[0] - scheduled < 0.2
+        await run
+
+    asyncio.run(main())
+
+
+def test_wake_listener_removed_after_run():
+    wall, clock, executed = _setup([1000])
+    driver = RealTimeDriver(clock, speed=10, time_source=wall.time, sleep=wall.sleep)
+    driver.run(2000)
+    assert [] == clock._wake_listeners
@@ -0,0 +1,59 @@
+import pytest
+
+from src.agent_world.currency.currency import Wallet, Currency
+from src.agent_world.global_params import day, hour
+from src.agent_world.scheduler.IScheduler import ScheduledEvent
+from src.agent_world.scheduler.scheduler import Scheduler
+from src.agent_world.simulation.actions import Action, action_registry
+from src.agent_world.simulation.runner import ReplicaRunner
+from src.agent_world.simulation.world import World
+from src.agent_world.statistics.handler.max_statistics_handler import MaxStatisticsHandler
+
+
+@action_registry.action("test_runner.trade")
+def _trade(world, amount):
+    world.wallets["trader"].deposit_currency(Currency(amount, "gold"))
+    world.statistics.log({"time": world.clock.current_time(), "amount": amount})
+
+
+def _world(seed, rng):
+    world = World(wallets={"trader": Wallet()}, statistics=MaxStatisticsHandler())
+    scheduler = Scheduler()
+    world.clock.subscribe(scheduler)
+    scheduler.schedule_events([ScheduledEvent(Action("test_runner.trade", world, rng.randrange(100)),
+                                              rng.randrange(day)) for _ in range(20)])
+    return world
+
+
+def _balance(world):
+    return world.wallets["trader"].check_balance("gold")
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_replicas_are_deterministic(max_workers):
+    seeds = list(range(10))
+    results = ReplicaRunner(_world, day, _balance, max_workers=max_workers, chunk_size=3).run(seeds)
+    assert seeds == [result.seed for result in results]
+    assert [day] * 10 == [result.time for result in results]
+    expected = ReplicaRunner(_world, day, _balance, max_workers=1).run(seeds)
+    assert [result.value for result in expected] == [result.value for result in results]
+    for result in results:
+        assert 20 == len(result.statistics)
+        assert result.value == result.statistics.column("amount").sum()
+    assert len({result.value for result in results}) > 1
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_repeated_seeds(max_workers):
+    seeds = [3, 1, 3, 2, 1]
+    results = ReplicaRunner(_world, hour, _balance, max_workers=max_workers, chunk_size=2).run(seeds)
+    assert seeds == [result.seed for result in results]
+    assert results[0] is not results[2]
+    assert results[0].value == results[2].value
+
+
+def test_iter_results():
+    runner = ReplicaRunner(_world, hour, max_workers=1, chunk_size=4)
+    results = list(runner.iter_results(range(5)))
+    assert [0, 1, 2, 3, 4] == sorted(result.seed for result in results)
+    assert all(result.value is None for result in results)
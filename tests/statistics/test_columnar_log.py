@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+
+from src.agent_world.statistics.columnar_log import ColumnarLog
+
+
+def test_round_trip():
+    records = [{"name": "Max", "age": 1, "rich": True},
+               {"name": "Paul", "age": 2, "height": 1.5},
+               {"age": 3, "height": 2, "rich": False}]
+    log = ColumnarLog.from_records(records)
+    assert 3 == len(log)
+    assert np.array_equal([1, 2, 3], log.column("age")) and np.int8 == log.column("age").dtype
+    assert ["Max", "Paul", None] == log.column("name")
+    assert [True, None, False] == log.column("rich")
+    assert [None, 1.5, 2] == log.column("height")
+    assert records == log.records()
+
+
+def test_recorded_none_round_trips():
+    records = [{"target": None, "step": 1}, {"step": 2}, {"target": "market", "step": 3}, {"target": None}]
+    log = ColumnarLog.from_records(records)
+    assert [None, None, "market", None] == log.column("target")
+    assert records == log.records()
+    assert records == pickle.loads(pickle.dumps(log)).records()
+
+
+def test_numeric_columns():
+    log = ColumnarLog.from_records([{"value": 1, "flag": True}, {"value": 2.5, "flag": False}])
+    assert np.float64 == log.column("value").dtype
+    assert bool == log.column("flag").dtype
+    assert [{"value": 1.0, "flag": True}, {"value": 2.5, "flag": False}] == log.records()
+    assert 0 == len(ColumnarLog.from_records([]))
+
+
+def test_repeated_values_are_encoded():
+    records = [{"trader": f"trader {i % 3}", "time": i * 100000} for i in range(30)]
+    log = ColumnarLog.from_records(records)
+    values, positions = log.columns["trader"]
+    assert ["trader 0", "trader 1", "trader 2"] == values and np.uint8 == positions.dtype
+    assert [record["trader"] for record in records] == log.column("trader")
+    assert np.int32 == log.column("time").dtype
+    assert records == log.records()
+
+
+def test_equal_values_of_different_types_are_kept():
+    records = [{"value": value} for value in [1, 1.0, True, "1", 0, False] * 4]
+    log = ColumnarLog.from_records(records)
+    assert isinstance(log.columns["value"], tuple)
+    assert [type(record["value"]) for record in records] == [type(value) for value in log.column("value")]
+    assert records == log.records()